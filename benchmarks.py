@@ -0,0 +1,464 @@
+"""
+Benchmarks for the calculation and chart paths.
+
+    python benchmarks.py                      # run, write bench_results.json, compare to baseline
+    python benchmarks.py --update-baseline    # run and store the results as the new baseline
+    python benchmarks.py -k projection        # only benchmarks whose name contains "projection"
+    python benchmarks.py -k startup           # cold-start import time of the core and the app
+
+Each benchmark reports the best per-call time over several repeats. A run
+fails (exit code 1) when any benchmark is slower than its baseline by more
+than --threshold percent.
+"""
+import argparse
+import ast
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_THRESHOLD = 25.0  # percent slower than baseline that counts as a regression
+
+# Representative household, matching the app defaults
+DEFAULT_INPUTS = dict(
+    current_age=35,
+    retirement_age=65,
+    current_savings=50000.0,
+    current_trad_ira=50000.0,
+    current_trad_401k=50000.0,
+    annual_salary=100000.0,
+    annual_merit_increase=0.0325,
+    investment_return=0.06,
+    savings_apy=0.038,
+    roth_401k_percent=0.0,
+    trad_401k_percent=0.08,
+    employer_401k_match=0.06,
+    annual_ira_contribution=0.0,
+    monthly_expenses=4000.0,
+    filing_status="single"
+)
+
+_BENCHMARKS = {}
+
+def benchmark(name):
+    """
+    Register a benchmark. The decorated function does any setup and returns
+    the zero-argument callable to time. Setups holding resources (servers,
+    temporary files) instead yield the callable and release them after the
+    yield, which runs once timing is done.
+    """
+    def register(setup):
+        _BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def _projection_inputs(**overrides):
+    inputs = dict(DEFAULT_INPUTS)
+    inputs.update(overrides)
+    return inputs
+
+@benchmark('projection_short_horizon')
+def bench_projection_short():
+    from calculations import calculate_retirement_projections
+    inputs = _projection_inputs(current_age=60, retirement_age=65)
+    return lambda: calculate_retirement_projections(**inputs)
+
+@benchmark('projection_long_horizon')
+def bench_projection_long():
+    from calculations import calculate_retirement_projections
+    inputs = _projection_inputs(current_age=25, retirement_age=70)
+    return lambda: calculate_retirement_projections(**inputs)
+
+@benchmark('projection_no_shortfall')
+def bench_projection_no_shortfall():
+    from calculations import calculate_retirement_projections
+    inputs = _projection_inputs(monthly_expenses=2000.0, current_trad_401k=500000.0)
+    return lambda: calculate_retirement_projections(**inputs)
+
+@benchmark('projection_with_shortfall')
+def bench_projection_with_shortfall():
+    from calculations import calculate_retirement_projections
+    inputs = _projection_inputs(monthly_expenses=9000.0)
+    return lambda: calculate_retirement_projections(**inputs)
+
+@benchmark('projection_glide_path_long_horizon')
+def bench_projection_glide_path():
+    from calculations import calculate_retirement_projections
+    from glide_path import target_date_glide_path
+    inputs = _projection_inputs(current_age=25, retirement_age=67, glide_path=target_date_glide_path())
+    return lambda: calculate_retirement_projections(**inputs)
+
+@benchmark('projection_per_paycheck_long_horizon')
+def bench_projection_per_paycheck():
+    from calculations import calculate_retirement_projections
+    inputs = _projection_inputs(current_age=25, retirement_age=70)
+    return lambda: calculate_retirement_projections(**inputs, steps_per_year=26)
+
+@benchmark('projection_incremental_retirement_edit')
+def bench_projection_incremental():
+    from calculations import IncrementalProjection
+    projector = IncrementalProjection()
+    edits = [
+        _projection_inputs(current_age=25, retirement_age=70, retirement_monthly_expenses=expenses)
+        for expenses in (3000.0, 3500.0)
+    ]
+    projector.project(**edits[0])
+    state = {'next': 1}
+    def edit():
+        # Alternate between two retirement spending levels, as a user would
+        inputs = edits[state['next']]
+        state['next'] = 1 - state['next']
+        return projector.project(**inputs)
+    return edit
+
+@benchmark('tax_scalar_income_sweep')
+def bench_tax_scalar_sweep():
+    from calculations import estimate_tax_impact
+    incomes = [float(income) for income in np.linspace(0, 1_000_000, 2000)]
+    return lambda: [estimate_tax_impact(income, "single") for income in incomes]
+
+@benchmark('tax_array_income_sweep')
+def bench_tax_array_sweep():
+    from calculations import estimate_tax_impact_array
+    incomes = np.linspace(0, 1_000_000, 100_000)
+    return lambda: estimate_tax_impact_array(incomes, "single")
+
+@benchmark('batch_1000_scenarios')
+def bench_batch():
+    from calculations import calculate_retirement_projections_batch
+    rng = np.random.default_rng(0)
+    inputs = _projection_inputs(
+        retirement_age=rng.integers(55, 71, 1000),
+        investment_return=rng.uniform(0.03, 0.10, 1000),
+        trad_401k_percent=rng.uniform(0.0, 0.20, 1000)
+    )
+    return lambda: calculate_retirement_projections_batch(**inputs)
+
+@benchmark('scenario_projections_30')
+def bench_scenarios():
+    from calculations import calculate_scenario_projections
+    from glide_path import target_date_glide_path
+    # Retirement ages and contribution rates as a user might save them, half
+    # with a glide path: two batched projections
+    scenarios = [
+        _projection_inputs(
+            retirement_age=60 + i % 10,
+            trad_401k_percent=0.04 + 0.02 * (i % 5),
+            glide_path=target_date_glide_path() if i % 2 else None
+        )
+        for i in range(30)
+    ]
+    return lambda: calculate_scenario_projections(scenarios)
+
+@benchmark('monte_carlo_10k_paths')
+def bench_monte_carlo():
+    from monte_carlo import run_monte_carlo_simulation
+    inputs = _projection_inputs(current_age=25, retirement_age=65)
+    return lambda: run_monte_carlo_simulation(**inputs, n_paths=10_000, seed=0)
+
+@benchmark('monte_carlo_10k_paths_glide_path')
+def bench_monte_carlo_glide_path():
+    from glide_path import target_date_glide_path
+    from monte_carlo import run_monte_carlo_simulation
+    inputs = _projection_inputs(current_age=25, retirement_age=65, glide_path=target_date_glide_path())
+    return lambda: run_monte_carlo_simulation(**inputs, n_paths=10_000, seed=0)
+
+@benchmark('monte_carlo_10k_paths_historical')
+def bench_monte_carlo_historical():
+    import tempfile
+    from historical import write_dataset
+    from monte_carlo import run_monte_carlo_simulation
+    # Synthetic monthly history; only the cost of resampling it matters here
+    rng = np.random.default_rng(0)
+    n_months = 100 * 12
+    inputs = _projection_inputs(current_age=25, retirement_age=65)
+    with tempfile.TemporaryDirectory(prefix='historical_bench_') as path:
+        write_dataset(
+            path,
+            year=np.repeat(np.arange(1925, 2025), 12),
+            stocks=rng.normal(0.008, 0.045, n_months),
+            bonds=rng.normal(0.004, 0.02, n_months),
+            cash=rng.normal(0.003, 0.001, n_months),
+            inflation=rng.normal(0.0025, 0.003, n_months),
+            periods_per_year=12
+        )
+        yield lambda: run_monte_carlo_simulation(**inputs, n_paths=10_000, seed=0, historical=path)
+
+@benchmark('roth_conversion_plan_40_years')
+def bench_roth_conversions():
+    from roth_conversion import optimize_roth_conversions
+    # 40 years to retirement plus 30 in it
+    inputs = _projection_inputs(current_age=25, retirement_age=65)
+    return lambda: optimize_roth_conversions(**inputs)
+
+@benchmark('withdrawal_strategy_search_30')
+def bench_withdrawal_search():
+    from withdrawals import search_withdrawal_strategies
+    # 6 shares x (no fill + 4 bracket tops)
+    inputs = _projection_inputs(current_age=25, retirement_age=65)
+    return lambda: search_withdrawal_strategies(**inputs)
+
+@benchmark('service_64_concurrent_projections')
+def bench_service():
+    import threading
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+    from service import ProjectionService
+    server = ProjectionService(port=0)
+    serving = threading.Thread(target=server.serve_forever, daemon=True)
+    serving.start()
+    rng = np.random.default_rng(0)
+    bodies = [
+        json.dumps(_projection_inputs(retirement_age=int(age), investment_return=float(rate))).encode()
+        for age, rate in zip(rng.integers(55, 71, 64), rng.uniform(0.03, 0.10, 64))
+    ]
+
+    def post(body):
+        request = urllib.request.Request(server.url + '/projections', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            return response.read()
+    try:
+        with ThreadPoolExecutor(max_workers=len(bodies)) as clients:
+            yield lambda: list(clients.map(post, bodies))
+    finally:
+        server.shutdown()
+        serving.join()
+        server.server_close()
+
+@benchmark('result_store_hit_projection')
+def bench_result_store_hit():
+    import tempfile
+    from cache import ResultStore
+    from calculations import calculate_retirement_projections
+    with tempfile.TemporaryDirectory(prefix='result_store_bench_') as directory:
+        store = ResultStore(os.path.join(directory, 'results.sqlite'))
+        inputs = _projection_inputs(current_age=25, retirement_age=65)
+        key = ('projection', 'calculate_retirement_projections', inputs)
+        store.put(key, calculate_retirement_projections(**inputs))
+        try:
+            yield lambda: store.get(key)
+        finally:
+            store.close()
+
+@benchmark('chart_retirement_projection')
+def bench_projection_chart():
+    from calculations import calculate_retirement_projections
+    from visualizations import create_retirement_projection_chart
+    projection_data = calculate_retirement_projections(**DEFAULT_INPUTS)
+    return lambda: create_retirement_projection_chart(projection_data)
+
+@benchmark('chart_tax_impact')
+def bench_tax_chart():
+    from calculations import calculate_retirement_projections
+    from visualizations import create_tax_impact_chart
+    projection_data = calculate_retirement_projections(**DEFAULT_INPUTS)
+    retirement_year = DEFAULT_INPUTS['retirement_age'] - DEFAULT_INPUTS['current_age']
+    return lambda: create_tax_impact_chart(projection_data, retirement_year)
+
+@benchmark('chart_allocation_pie')
+def bench_allocation_chart():
+    from visualizations import create_allocation_pie_chart
+    allocation = {
+        "High-Yield Savings": 50000.0,
+        "Traditional IRA": 50000.0,
+        "Traditional 401k": 50000.0
+    }
+    return lambda: create_allocation_pie_chart(allocation)
+
+@benchmark('chart_savings_milestone')
+def bench_milestone_chart():
+    from visualizations import create_savings_milestone_chart
+    milestones = {'25%': 500000, '50%': 1000000, '75%': 1500000, 'Target': 2000000}
+    return lambda: create_savings_milestone_chart(milestones, 150000)
+
+@benchmark('chart_percentile_fan')
+def bench_fan_chart():
+    from monte_carlo import run_monte_carlo_simulation
+    from visualizations import create_percentile_fan_chart
+    result = run_monte_carlo_simulation(**DEFAULT_INPUTS, n_paths=10_000, seed=0, keep_paths=True)
+    return lambda: create_percentile_fan_chart(result.years, result.percentiles, result.total_balance)
+
+def _table_render_prep(projection_data):
+    """What the detailed table costs before reaching the browser: column config and Arrow serialization"""
+    import pyarrow as pa
+    from styles import projection_table_column_config
+    return lambda: (
+        projection_table_column_config(projection_data.columns),
+        pa.Table.from_pandas(projection_data)
+    )
+
+@benchmark('table_render_prep')
+def bench_table_render_prep():
+    from calculations import calculate_retirement_projections
+    return _table_render_prep(calculate_retirement_projections(**_projection_inputs(current_age=25, retirement_age=70)).to_frame())
+
+@benchmark('table_render_prep_200_scenarios')
+def bench_table_render_prep_scenarios():
+    import pandas as pd
+    from calculations import calculate_retirement_projections_batch
+    batch = calculate_retirement_projections_batch(
+        **_projection_inputs(investment_return=np.linspace(0.03, 0.10, 200))
+    )
+    return _table_render_prep(pd.concat([batch.to_frame(i) for i in range(len(batch))], ignore_index=True))
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+CORE_IMPORTS = "import calculations"
+
+def app_imports(path=APP_FILE):
+    """Statement importing every module main.py imports before it draws anything"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        modules.extend(name for name in names if name not in modules)
+    return "import " + ", ".join(modules)
+
+def _import_in_fresh_interpreter(statement):
+    """Callable that runs statement in a new Python process, as a cold start does"""
+    command = [sys.executable, '-c', statement]
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    return lambda: subprocess.run(command, cwd=cwd, check=True)
+
+@benchmark('startup_interpreter')
+def bench_startup_interpreter():
+    return _import_in_fresh_interpreter("pass")
+
+@benchmark('startup_import_core')
+def bench_startup_core():
+    return _import_in_fresh_interpreter(CORE_IMPORTS)
+
+@benchmark('startup_import_app')
+def bench_startup_app():
+    return _import_in_fresh_interpreter(app_imports())
+
+def time_callable(func, repeat=5, min_time=0.2):
+    """
+    Best per-call time of func in seconds. The call count per repeat is
+    doubled until one repeat runs for at least min_time.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time and number < 1_000_000:
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {'seconds': best, 'number': number, 'repeat': repeat}
+
+def run_benchmarks(selected=None, repeat=5, min_time=0.2):
+    """Run registered benchmarks whose name contains any of selected"""
+    results = {}
+    for name, setup in _BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        bench = setup()
+        if inspect.isgenerator(bench):
+            with closing(bench):
+                results[name] = time_callable(next(bench), repeat=repeat, min_time=min_time)
+        else:
+            results[name] = time_callable(bench, repeat=repeat, min_time=min_time)
+    return results
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with baseline results. Returns per-benchmark change in
+    percent and the names that regressed past threshold.
+    """
+    changes = {}
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base_seconds = baseline[name]['seconds']
+        change = (result['seconds'] - base_seconds) / base_seconds * 100
+        changes[name] = change
+        if change > threshold:
+            regressions.append(name)
+    return changes, regressions
+
+def environment_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark calculation and chart paths")
+    parser.add_argument('-k', dest='selected', action='append',
+                        help="only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument('--output', default='bench_results.json',
+                        help="where to write this run's results as JSON")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline results to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="percent slowdown versus baseline that fails the run")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="minimum seconds per repeat")
+    parser.add_argument('--list', action='store_true', help="list benchmark names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(_BENCHMARKS))
+        return 0
+
+    results = run_benchmarks(args.selected, repeat=args.repeat, min_time=args.min_time)
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline_report = report
+        if os.path.exists(args.baseline):
+            # Keep baseline entries for benchmarks that were not run this time
+            with open(args.baseline) as f:
+                baseline_report = json.load(f)
+            baseline_report.update(created=report['created'], environment=report['environment'])
+            baseline_report['results'].update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline_report, f, indent=2)
+            f.write("\n")
+
+    baseline = {}
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    changes, regressions = compare_to_baseline(results, baseline, args.threshold)
+
+    width = max(len(name) for name in results) if results else 0
+    for name, result in results.items():
+        line = f"{name:<{width}}  {result['seconds'] * 1000:10.3f} ms"
+        if name in changes:
+            line += f"  {changes[name]:+7.1f}% vs baseline"
+            if name in regressions:
+                line += "  REGRESSION"
+        print(line)
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0f}%: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,510 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+from constants import (
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    CURRENT_YEAR,
+    RESULT_STORE_MAX_BYTES,
+    RESULT_STORE_PATH
+)
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by both entry count and an
+    approximate memory budget in bytes
+    """
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key, default=None):
+        """Return the cached value for key, marking it most recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, size=None):
+        """Store value under key, evicting least recently used entries as needed"""
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            # Values bigger than the whole budget are not worth keeping
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, size=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value, size)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current usage"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+def estimate_size(value):
+    """Approximate memory held by a cached value, in bytes"""
+    if hasattr(value, 'memory_usage'):  # pandas DataFrame
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, 'nbytes'):  # NumPy array
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if hasattr(value, '__dict__'):  # Result objects holding arrays
+        return sys.getsizeof(value) + sum(
+            estimate_size(item) for item in vars(value).values() if hasattr(item, 'nbytes'))
+    return sys.getsizeof(value)
+
+def normalize_inputs(inputs):
+    """
+    Build a hashable cache key from a dict of inputs. Floats are rounded so that
+    values differing only by floating-point noise share an entry.
+    """
+    def normalize(value):
+        if isinstance(value, float):
+            return round(value, 8)
+        if isinstance(value, dict):
+            return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(normalize(v) for v in value)
+        return value
+    return normalize(inputs)
+
+# Modules whose source determines results; editing any of them (e.g. the tax
+# tables in constants) gives every stored result a new key
+ENGINE_MODULES = (
+    'constants',
+    'calculations',
+    'glide_path',
+    'withdrawals',
+    'monte_carlo',
+    'historical',
+    'roth_conversion',
+    'sensitivity',
+    'solver',
+    'parallel'
+)
+
+@lru_cache(maxsize=1)
+def engine_version():
+    """Hash of the engine modules' source and the projection start year"""
+    digest = hashlib.sha256(str(CURRENT_YEAR).encode())
+    for name in ENGINE_MODULES:
+        spec = importlib.util.find_spec(name)
+        with open(spec.origin, 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+_SCALAR_TYPES = (type(None), bool, int, float, str, bytes)
+
+def _encode_key(value, digest):
+    """Feed a stable encoding of value to digest; arrays are hashed by content, not repr"""
+    if isinstance(value, _SCALAR_TYPES):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, dict):
+        digest.update(b'dict{')
+        for item in sorted(value.items(), key=lambda item: repr(item[0])):
+            _encode_key(item, digest)
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)) and all(type(item) in _SCALAR_TYPES for item in value):
+        # The repr of plain scalars is exact, so one repr call covers them all
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'seq[')
+        for item in value:
+            _encode_key(item, digest)
+        digest.update(b']')
+    elif hasattr(value, 'dtype') and hasattr(value, 'tobytes'):  # NumPy array or scalar
+        digest.update(f"array:{value.dtype.str}:{getattr(value, 'shape', ())};".encode())
+        digest.update(value.tobytes())
+    else:
+        # Objects with a value-based repr (e.g. GlidePath); an identity-based
+        # repr only ever misses
+        digest.update(f"{type(value).__qualname__}:{value!r};".encode())
+
+def content_key(key, version=None):
+    """Hex digest addressing key's result under an engine version"""
+    digest = hashlib.sha256((version or engine_version()).encode())
+    _encode_key(key, digest)
+    return digest.hexdigest()
+
+# Hits, misses and access times a ResultStore keeps in memory before writing
+# them: after this many lookups or seconds, whichever comes first
+ACCESS_FLUSH_SIZE = 256
+ACCESS_FLUSH_SECONDS = 5.0
+
+class ResultStore:
+    """
+    Results on disk, addressed by a hash of their key and the engine version
+    and shared by every process that opens the same path. Entries live in an
+    SQLite database in WAL mode and values are pickled and zlib-compressed.
+
+    Lookups are plain reads and never take the write lock: hit and miss
+    counts and access times are kept in memory and written in batches (and by
+    flush() and close()), and a batch is put off while another process is
+    writing; a process that exits in between loses its last batch. Stores take the lock,
+    keep a running total of stored bytes and evict the least recently used
+    entries (by the access times written so far) only once the total exceeds
+    max_bytes.
+
+    Values are unpickled on read, so only open stores this user writes.
+    """
+    def __init__(self, path=RESULT_STORE_PATH, max_bytes=RESULT_STORE_MAX_BYTES, version=None, timeout=30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version or engine_version()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # Lookups by this process; stats() reports those of every process
+        self.hits = 0
+        self.misses = 0
+        # Not yet written: address -> last access time, and lookup counts
+        self._pending_access = {}
+        self._pending_counts = {'hits': 0, 'misses': 0}
+        self._last_flush = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with self._write(connection):
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed, size)")
+            connection.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            connection.execute(
+                "INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('evictions', 0)"
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO counters SELECT 'bytes', CAST(total(size) AS INTEGER) FROM entries"
+            )
+
+    def _connection(self):
+        """This thread's connection; threads and forked processes each open their own"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _write(self, connection, wait=True):
+        """
+        Write transaction that takes the lock up front rather than upgrading a
+        read into a deadlock; with wait=False it raises sqlite3.OperationalError
+        at once if another connection holds the lock
+        """
+        if not wait:
+            connection.execute("PRAGMA busy_timeout = 0")
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        finally:
+            if not wait:
+                connection.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _take_pending(self):
+        with self._lock:
+            pending = self._pending_access, self._pending_counts
+            self._pending_access, self._pending_counts = {}, {'hits': 0, 'misses': 0}
+            self._last_flush = time.monotonic()
+        return pending
+
+    def _restore_pending(self, access, counts):
+        with self._lock:
+            for address, accessed in access.items():
+                self._pending_access[address] = max(accessed, self._pending_access.get(address, accessed))
+            for name, count in counts.items():
+                self._pending_counts[name] += count
+
+    @staticmethod
+    def _write_pending(connection, access, counts):
+        connection.executemany(
+            "UPDATE entries SET accessed = max(accessed, ?) WHERE key = ?",
+            [(accessed, address) for address, accessed in access.items()]
+        )
+        connection.executemany(
+            "UPDATE counters SET value = value + ? WHERE name = ?",
+            [(count, name) for name, count in counts.items() if count]
+        )
+
+    def flush(self, wait=True):
+        """
+        Write pending access times and counts. With wait=False nothing waits
+        for another writer: they stay pending and False is returned.
+        """
+        access, counts = self._take_pending()
+        if not access and not any(counts.values()):
+            return True
+        connection = self._connection()
+        try:
+            with self._write(connection, wait):
+                self._write_pending(connection, access, counts)
+        except sqlite3.OperationalError:
+            self._restore_pending(access, counts)
+            if wait:
+                raise
+            return False
+        return True
+
+    def key(self, key):
+        return content_key(key, self.version)
+
+    def __len__(self):
+        return self._connection().execute("SELECT count(*) FROM entries").fetchone()[0]
+
+    def __contains__(self, key):
+        return self._connection().execute(
+            "SELECT 1 FROM entries WHERE key = ?", (self.key(key),)
+        ).fetchone() is not None
+
+    def get(self, key, default=None):
+        """Return the stored value for key, marking it most recently used"""
+        address = self.key(key)
+        row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (address,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                self._pending_counts['misses'] += 1
+            else:
+                self.hits += 1
+                self._pending_counts['hits'] += 1
+                self._pending_access[address] = time.time()
+            due = (sum(self._pending_counts.values()) >= ACCESS_FLUSH_SIZE
+                   or time.monotonic() - self._last_flush >= ACCESS_FLUSH_SECONDS)
+        if due:
+            self.flush(wait=False)
+        if row is None:
+            return default
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value):
+        """Store value under key, evicting least recently used entries as needed"""
+        blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        # Values bigger than the whole budget are not worth keeping
+        if len(blob) > self.max_bytes:
+            return
+        address = self.key(key)
+        connection = self._connection()
+        # Pending access times go in first, so eviction sees them
+        access, counts = self._take_pending()
+        try:
+            with self._write(connection):
+                self._write_pending(connection, access, counts)
+                replaced = connection.execute("SELECT size FROM entries WHERE key = ?", (address,)).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (address, blob, len(blob), time.time())
+                )
+                connection.execute(
+                    "UPDATE counters SET value = value + ? WHERE name = 'bytes'",
+                    (len(blob) - (replaced[0] if replaced else 0),)
+                )
+                (total,) = connection.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()
+                if total > self.max_bytes:
+                    self._evict(connection, total)
+        except BaseException:
+            self._restore_pending(access, counts)
+            raise
+
+    def _evict(self, connection, total):
+        """Delete the least recently used entries until total bytes fit in max_bytes"""
+        evicted = []
+        for address, size in connection.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((address,))
+            total -= size
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        connection.execute("UPDATE counters SET value = ? WHERE name = 'bytes'", (total,))
+        connection.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (len(evicted),))
+
+    def get_or_compute(self, key, compute):
+        """Return the stored value for key, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._take_pending()
+        connection = self._connection()
+        with self._write(connection):
+            connection.execute("DELETE FROM entries")
+            connection.execute("UPDATE counters SET value = 0")
+        connection.execute("VACUUM")
+
+    def close(self):
+        """Write what is pending if no other process is writing, and close every connection"""
+        self.flush(wait=False)
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def stats(self):
+        """Hit/miss counters of every process using the store, and current usage"""
+        self.flush()
+        connection = self._connection()
+        (entries,) = connection.execute("SELECT count(*) FROM entries").fetchone()
+        counters = dict(connection.execute("SELECT name, value FROM counters"))
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'entries': entries,
+            'bytes': counters['bytes'],
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'evictions': counters['evictions'],
+            'hit_rate': counters['hits'] / lookups if lookups else 0.0,
+            'path': self.path,
+            'version': self.version
+        }
+
+# One cache per server process; Streamlit keeps imported modules alive across
+# reruns and sessions, so every session shares these entries
+_app_cache = LRUCache()
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+def get_app_cache():
+    """Return the process-wide cache shared by all app sessions"""
+    return _app_cache
+
+def get_result_store():
+    """
+    Return the process-wide ResultStore at RESULT_STORE_PATH, or None when it
+    is turned off or cannot be opened (e.g. a read-only directory)
+    """
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            store = False
+            if RESULT_STORE_PATH:
+                try:
+                    store = ResultStore()
+                except (OSError, sqlite3.Error):
+                    pass
+            _result_store = store
+    return None if _result_store is False else _result_store
+
+def _projection_key(compute, inputs, depends_on=None):
+    """Cache key of compute(**inputs); functions of the same name in different modules get different keys"""
+    name = getattr(compute, '__name__', repr(compute))
+    key = ('projection', getattr(compute, '__module__', None), name, normalize_inputs(inputs))
+    return key if depends_on is None else key + (normalize_inputs(depends_on),)
+
+def cached_projection(compute, inputs, cache=None, store=None, depends_on=None):
+    """
+    Return projection results for inputs, computing them with compute(**inputs)
+    on a miss. Misses in the in-process cache are looked up in the on-disk
+    store (by default get_result_store()) before computing, so other processes
+    and restarts reuse results. depends_on is anything else the result depends
+    on, such as a fingerprint of a file compute reads; it is part of the key
+    but not passed to compute. Cached results are shared, so callers must not
+    modify them.
+    """
+    cache = _app_cache if cache is None else cache
+    store = get_result_store() if store is None else store
+    key = _projection_key(compute, inputs, depends_on)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        compute_inputs = lambda: compute(**inputs)
+        value = compute_inputs() if store is None else store.get_or_compute(key, compute_inputs)
+        cache.put(key, value)
+    return value
+
+def cached_figure(name, inputs, build, cache=None):
+    """
+    Return the figure built by build() for inputs. Figures are stored as their
+    JSON serialization and restored without re-running plotly's validation,
+    which is much cheaper than rebuilding them.
+    """
+    import plotly.graph_objects as go
+
+    cache = _app_cache if cache is None else cache
+    key = ('figure', name, normalize_inputs(inputs))
+    figure_json = cache.get(key)
+    if figure_json is None:
+        figure = build()
+        cache.put(key, figure.to_json())
+        return figure
+    return go.Figure(json.loads(figure_json), _validate=False)
@@ -1,14 +1,30 @@
-import pandas as pd
+from bisect import bisect_left
+from functools import lru_cache
+
 import numpy as np
 from constants import (
     CURRENT_YEAR,
     CURRENT_401K_LIMIT,
     CURRENT_HSA_LIMIT,
     CURRENT_IRA_LIMIT,
+    BRACKET_ROUNDING,
     INFLATION_RATE,
+    IRA_PHASEOUT_END,
+    IRA_PHASEOUT_ROUNDING,
+    IRA_PHASEOUT_START,
+    LIMIT_ROUNDING,
     TAX_BRACKETS_FEDERAL,
     TAX_BRACKETS_NY
 )
+from glide_path import (
+    DEFAULT_BOND_RETURN,
+    RETIREMENT_RETURN_CUT,
+    asset_returns,
+    investment_returns,
+    portfolio_returns,
+    step_down_multipliers
+)
+from profiling import timed
 
 def calculate_years_to_retirement(current_age, retirement_age):
     """Calculate years until retirement"""
@@ -22,6 +38,140 @@ def calculate_total_current_savings(
         current_savings + current_trad_ira + current_trad_401k
     )
 
+# Output columns of calculate_retirement_projections, in display order
+PROJECTION_COLUMNS = [
+    'Age', 'Year', 'Salary', 'High-Yield Savings', 'Traditional IRA',
+    'Traditional 401k', 'Monthly Expenses', 'Annual Expenses', 'Total Balance',
+    'Taxes Paid', 'After-Tax Income', 'Disposable Income', '401k Contribution',
+    'Employer 401k Match', 'IRA Contribution', 'Bonus', 'RSU',
+    'Retirement Shortfall'
+]
+
+# Columns rounded to cents in the final projection
+CURRENCY_COLUMNS = [
+    'Salary', 'High-Yield Savings', 'Traditional IRA', 'Traditional 401k',
+    'Total Balance', '401k Contribution', 'Employer 401k Match',
+    'IRA Contribution', 'Monthly Expenses',
+    'Annual Expenses', 'Taxes Paid', 'After-Tax Income',
+    'Disposable Income', 'Retirement Shortfall'
+]
+
+# Inputs every projection needs
+PROJECTION_REQUIRED_INPUTS = (
+    'current_age',
+    'retirement_age',
+    'current_savings',
+    'current_trad_ira',
+    'current_trad_401k',
+    'annual_salary',
+    'annual_merit_increase',
+    'investment_return',
+    'savings_apy',
+    'roth_401k_percent',
+    'trad_401k_percent',
+    'employer_401k_match',
+    'annual_ira_contribution'
+)
+
+FILING_STATUSES = ('single', 'married')
+
+# Defaults of the optional projection inputs
+PROJECTION_INPUT_DEFAULTS = {
+    'monthly_expenses': 0.0,
+    'filing_status': "single",
+    'retirement_monthly_expenses': None,
+    'steps_per_year': 1,
+    'withdrawal_share': 0.0,
+    'fill_income': 0.0,
+    'glide_path': None,
+    'bond_return': DEFAULT_BOND_RETURN,
+    'cash_return': None
+}
+
+# Running state carried from one projection year to the next, checkpointed
+# after every year so a projection can resume part way through
+PROJECTION_STATE = (
+    'salary', 'high_yield_savings', 'trad_ira', 'trad_401k', 'monthly_expenses'
+)
+
+# Inputs that set the starting balances and year-0 row
+INITIAL_STATE_INPUTS = (
+    'current_age', 'current_savings', 'current_trad_ira', 'current_trad_401k',
+    'annual_salary', 'monthly_expenses'
+)
+
+# Inputs that are only used once retired
+RETIREMENT_PHASE_INPUTS = ('retirement_monthly_expenses', 'withdrawal_share', 'fill_income')
+
+class ProjectionResult:
+    """
+    Result of calculate_retirement_projections: one (year x field) float64
+    array in a fixed field order, with constant-time lookups by age and year.
+    The array is column-major, so each field is contiguous and to_frame()
+    hands pandas one block without copying.
+    Fields that do not apply to a phase (e.g. 'Retirement Shortfall' while
+    working) are NaN.
+    """
+    def __init__(self, values, current_age, retirement_age, fields=PROJECTION_COLUMNS, start_year=CURRENT_YEAR):
+        self.values = values
+        self.fields = list(fields)
+        self.current_age = current_age
+        self.retirement_age = retirement_age
+        self.start_year = start_year
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+    
+    def __len__(self):
+        return self.values.shape[0]
+    
+    def __contains__(self, field):
+        return field in self._field_index
+    
+    def __getitem__(self, field):
+        """One field for every year, as a view into the result"""
+        return self.values[:, self._field_index[field]]
+    
+    @property
+    def columns(self):
+        return self.fields
+    
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+    
+    @property
+    def retirement_index(self):
+        """Row of the first retirement year, or None if it is past the horizon"""
+        index = int(self.retirement_age - self.current_age)
+        return index if 0 <= index < len(self) else None
+    
+    def index_of_age(self, age):
+        index = int(age - self.current_age)
+        if not 0 <= index < len(self):
+            raise KeyError(f"age {age} is outside the projection")
+        return index
+    
+    def index_of_year(self, year):
+        index = int(year - self.start_year)
+        if not 0 <= index < len(self):
+            raise KeyError(f"year {year} is outside the projection")
+        return index
+    
+    def value_at_age(self, field, age):
+        return float(self.values[self.index_of_age(age), self._field_index[field]])
+    
+    def value_at_year(self, field, year):
+        return float(self.values[self.index_of_year(year), self._field_index[field]])
+    
+    def total(self, field, start=None, stop=None):
+        """Sum of field over rows start to stop, ignoring NaN"""
+        return float(np.nansum(self[field][start:stop]))
+    
+    def to_frame(self):
+        """The result as a DataFrame sharing this result's memory"""
+        import pandas as pd
+        return pd.DataFrame(self.values, columns=self.fields, copy=False)
+
+@timed()
 def calculate_retirement_projections(
     current_age,
     retirement_age,
@@ -37,36 +187,165 @@ def calculate_retirement_projections(
     employer_401k_match,
     annual_ira_contribution,
     monthly_expenses=0.0,
-    filing_status="single"
+    filing_status="single",
+    retirement_monthly_expenses=None,
+    steps_per_year=1,
+    withdrawal_share=0.0,
+    fill_income=0.0,
+    glide_path=None,
+    bond_return=DEFAULT_BOND_RETURN,
+    cash_return=None
 ):
     """
     Calculate retirement savings projections considering multiple income sources,
-    investment vehicles, economic factors, taxes, and expenses
-    """
-    years_to_retirement = retirement_age - current_age
-    
-    # Initialize projections dataframe
-    projections = pd.DataFrame(index=range(years_to_retirement + 40))  # +40 years for post-retirement projections
-    
-    # Initialize starting values
-    projections.loc[0, 'Age'] = current_age
-    projections.loc[0, 'Year'] = CURRENT_YEAR
-    projections.loc[0, 'Salary'] = annual_salary
-    projections.loc[0, 'High-Yield Savings'] = current_savings
-    projections.loc[0, 'Traditional IRA'] = current_trad_ira
-    projections.loc[0, 'Traditional 401k'] = current_trad_401k
-    projections.loc[0, 'Monthly Expenses'] = monthly_expenses
-    projections.loc[0, 'Annual Expenses'] = monthly_expenses * 12
-    projections.loc[0, 'Total Balance'] = calculate_total_current_savings(
-        current_savings, current_trad_ira, current_trad_401k
+    investment vehicles, economic factors, taxes, and expenses.
+
+    retirement_monthly_expenses, in today's dollars, replaces the inflated
+    current expenses from retirement on; None keeps current expenses.
+    steps_per_year above 1 (e.g. 26 paychecks or 12 months) moves money
+    within each year in that many steps: 401k contributions and the employer
+    match stop once the annual limit is reached, and contributions, savings
+    deposits and retirement withdrawals happen through the year instead of
+    at its end. Rows are still one per year. Returns a ProjectionResult.
+
+    Retirement spending is drawn by the withdrawal strategy: withdrawal_share
+    of it from the traditional accounts first (None for their share of all
+    balances), the rest from savings, and from the traditional accounts
+    again once savings run out. Traditional withdrawals are also topped up
+    to fill_income of taxable income (today's dollars) every year to fill
+    the low brackets, with what spending does not need going to savings.
+    The default draws savings first; other strategies are applied once a
+    year whatever steps_per_year is.
+
+    glide_path, a glide_path.GlidePath, invests the retirement accounts in
+    its stock/bond/cash mix for each year: stocks earn investment_return,
+    bonds bond_return and cash cash_return (None for savings_apy). Without
+    one, investment_return steps down toward and into retirement.
+    """
+    if int(steps_per_year) != steps_per_year or steps_per_year < 1:
+        raise ValueError(f"steps_per_year must be a positive whole number, got {steps_per_year}")
+    inputs = dict(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase,
+        investment_return=investment_return,
+        savings_apy=savings_apy,
+        roth_401k_percent=roth_401k_percent,
+        trad_401k_percent=trad_401k_percent,
+        employer_401k_match=employer_401k_match,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        filing_status=filing_status,
+        retirement_monthly_expenses=retirement_monthly_expenses,
+        steps_per_year=int(steps_per_year),
+        withdrawal_share=withdrawal_share,
+        fill_income=fill_income,
+        glide_path=glide_path,
+        bond_return=bond_return,
+        cash_return=cash_return
     )
+    values = np.full((max(retirement_age - current_age + 30, 0), len(PROJECTION_COLUMNS)), np.nan, order='F')
+    _project_years(inputs, values, 0)
+    _round_currency(values)
+    return ProjectionResult(values, current_age, retirement_age)
+
+# Positions of CURRENCY_COLUMNS in PROJECTION_COLUMNS
+_CURRENCY_INDEX = [PROJECTION_COLUMNS.index(col) for col in CURRENCY_COLUMNS]
+
+def _round_currency(values):
+    """Round the currency fields of a (year x field) projection array to cents, in place"""
+    values[:, _CURRENCY_INDEX] = np.round(values[:, _CURRENCY_INDEX], 2)
+
+def _project_years(inputs, values, start_year, states=None, start_state=None):
+    """
+    Fill values, a preallocated (year x field) array in PROJECTION_COLUMNS
+    order, from start_year to the end of the horizon.
+
+    start_year 0 starts from the inputs; otherwise start_state is the
+    PROJECTION_STATE at the end of year start_year - 1 and earlier rows of
+    values are left as they are. When states is given, the state at the end
+    of every computed year is written to states[year].
+    """
+    current_age = inputs['current_age']
+    retirement_age = inputs['retirement_age']
+    annual_merit_increase = inputs['annual_merit_increase']
+    savings_apy = inputs['savings_apy']
+    roth_401k_percent = inputs['roth_401k_percent']
+    trad_401k_percent = inputs['trad_401k_percent']
+    employer_401k_match = inputs['employer_401k_match']
+    annual_ira_contribution = inputs['annual_ira_contribution']
+    monthly_expenses = inputs['monthly_expenses']
+    filing_status = inputs['filing_status']
+    retirement_monthly_expenses = inputs['retirement_monthly_expenses']
+    steps_per_year = inputs['steps_per_year']
+    withdrawal_share = inputs['withdrawal_share']
+    fill_income = inputs['fill_income']
+    savings_first = withdrawal_share == 0 and fill_income == 0
     
-    # Set up contribution limits with annual increases
-    contribution_limits = {
-        '401k': CURRENT_401K_LIMIT,
-        'HSA': CURRENT_HSA_LIMIT,
-        'IRA': CURRENT_IRA_LIMIT
-    }
+    # Only the pre-retirement years plus 30 years after are reported, and each
+    # year depends only on the previous one, so nothing beyond that is simulated
+    n_years = len(values)
+    
+    # One view per field; values that do not apply to a phase (e.g.
+    # 'Retirement Shortfall' before retirement) stay NaN
+    columns = {col: values[:, i] for i, col in enumerate(PROJECTION_COLUMNS)}
+    age_col = columns['Age']
+    year_col = columns['Year']
+    salary_col = columns['Salary']
+    savings_col = columns['High-Yield Savings']
+    ira_col = columns['Traditional IRA']
+    trad_401k_col = columns['Traditional 401k']
+    monthly_expenses_col = columns['Monthly Expenses']
+    annual_expenses_col = columns['Annual Expenses']
+    total_col = columns['Total Balance']
+    taxes_col = columns['Taxes Paid']
+    after_tax_col = columns['After-Tax Income']
+    disposable_col = columns['Disposable Income']
+    contribution_401k_col = columns['401k Contribution']
+    match_col = columns['Employer 401k Match']
+    ira_contribution_col = columns['IRA Contribution']
+    bonus_col = columns['Bonus']
+    rsu_col = columns['RSU']
+    shortfall_col = columns['Retirement Shortfall']
+    
+    # Contribution limits, IRA phase-out and tax brackets of every year
+    tables = year_tables(INFLATION_RATE, filing_status, n_years)
+    limits_401k = tables.limit_401k.tolist()
+    limits_ira = tables.limit_ira.tolist()
+    phaseout_starts = tables.ira_phaseout_start.tolist()
+    phaseout_ends = tables.ira_phaseout_end.tolist()
+    price_index = tables.price_index.tolist()
+    
+    if start_year == 0:
+        # Running per-account state is kept in plain floats through the year loop
+        salary = float(inputs['annual_salary'])
+        high_yield_savings = float(inputs['current_savings'])
+        trad_ira = float(inputs['current_trad_ira'])
+        trad_401k = float(inputs['current_trad_401k'])
+        current_monthly_expenses = float(monthly_expenses)
+        
+        # Initialize starting values
+        if n_years > 0:
+            age_col[0] = current_age
+            year_col[0] = CURRENT_YEAR
+            salary_col[0] = salary
+            savings_col[0] = high_yield_savings
+            ira_col[0] = trad_ira
+            trad_401k_col[0] = trad_401k
+            monthly_expenses_col[0] = current_monthly_expenses
+            annual_expenses_col[0] = monthly_expenses * 12
+            total_col[0] = calculate_total_current_savings(
+                inputs['current_savings'], inputs['current_trad_ira'], inputs['current_trad_401k']
+            )
+            if states is not None:
+                states[0] = (salary, high_yield_savings, trad_ira, trad_401k, current_monthly_expenses)
+        start_year = 1
+    else:
+        salary, high_yield_savings, trad_ira, trad_401k, current_monthly_expenses = start_state
     
     # Number of paychecks per year
     paychecks_per_year = 26
@@ -77,63 +356,59 @@ def calculate_retirement_projections(
     
     # Use nominal returns for projections and handle inflation separately
     # This allows for more accurate compound growth calculations
-    nominal_investment_return = investment_return
     nominal_savings_apy = savings_apy
     
-    # Adjust return rates based on portfolio age (more conservative as retirement approaches)
-    # But with less aggressive reductions to maintain growth
-    def get_adjusted_return(year, base_return):
-        years_left = max(0, retirement_age - (current_age + year))
-        if years_left > 20:
-            return base_return
-        elif years_left > 10:
-            return base_return * 0.95  # 5% reduction for moderate risk
-        elif years_left > 5:
-            return base_return * 0.90  # 10% reduction for lower risk
-        else:
-            return base_return * 0.85  # 15% reduction for conservative approach
+    # Investment returns of every year, more conservative as retirement
+    # approaches (by the glide path's mix, or stepping down the base return)
+    cash_return = savings_apy if inputs['cash_return'] is None else inputs['cash_return']
+    year_returns = _year_returns(
+        retirement_age - current_age, n_years, float(inputs['investment_return']),
+        float(inputs['bond_return']), float(cash_return), inputs['glide_path']
+    )
     
     # Project for each year
-    for year in range(1, len(projections)):
+    for year in range(start_year, n_years):
         # Update age and year
-        projections.loc[year, 'Age'] = current_age + year
-        projections.loc[year, 'Year'] = CURRENT_YEAR + year
+        age = current_age + year
+        age_col[year] = age
+        year_col[year] = CURRENT_YEAR + year
         
         # Get adjusted investment return based on years to retirement
         # Use nominal returns for more accurate growth projections
-        adjusted_return = get_adjusted_return(year, nominal_investment_return)
-        
-        # Update expenses with inflation
-        projections.loc[year, 'Monthly Expenses'] = projections.loc[year-1, 'Monthly Expenses'] * (1 + INFLATION_RATE)
-        projections.loc[year, 'Annual Expenses'] = projections.loc[year, 'Monthly Expenses'] * 12
+        adjusted_return = year_returns[year]
         
         # Determine if in retirement phase
-        is_retirement = projections.loc[year, 'Age'] >= retirement_age
+        is_retirement = age >= retirement_age
+        
+        # Update expenses with inflation
+        current_monthly_expenses = current_monthly_expenses * (1 + INFLATION_RATE)
+        if is_retirement and retirement_monthly_expenses is not None:
+            current_monthly_expenses = retirement_monthly_expenses * (1 + INFLATION_RATE) ** year
+        annual_expenses = current_monthly_expenses * 12
+        monthly_expenses_col[year] = current_monthly_expenses
+        annual_expenses_col[year] = annual_expenses
         
         # If in retirement, set income to 0
         if is_retirement:
-            projections.loc[year, 'Salary'] = 0
-            projections.loc[year, 'Bonus'] = 0
-            projections.loc[year, 'RSU'] = 0
+            salary = 0.0
+            bonus_col[year] = 0
+            rsu_col[year] = 0
         else:
-            # Adjust contribution limits for inflation
-            for account_type in contribution_limits:
-                contribution_limits[account_type] *= (1 + INFLATION_RATE)
-            
             # Calculate new salary with merit increase (capped over time to be more realistic)
             current_merit_rate = annual_merit_increase
             if year > max_merit_years:
                 current_merit_rate = reduced_merit_rate
             
-            projections.loc[year, 'Salary'] = projections.loc[year-1, 'Salary'] * (1 + current_merit_rate)
+            salary = salary * (1 + current_merit_rate)
+        salary_col[year] = salary
         
         # Current year values
-        salary = projections.loc[year, 'Salary']
-        annual_expenses = projections.loc[year, 'Annual Expenses']
         total_income = salary
         
         # PRE-RETIREMENT CALCULATIONS
         if not is_retirement:
+            limit_401k = limits_401k[year]
+            
             # Tax calculations for pre-tax contributions
             paycheck_amount = salary / paychecks_per_year
             roth_401k_contribution_per_paycheck = paycheck_amount * roth_401k_percent
@@ -143,11 +418,11 @@ def calculate_retirement_projections(
             annual_401k_contribution = (roth_401k_contribution_per_paycheck + trad_401k_contribution_per_paycheck) * paychecks_per_year
             
             # Adjust if exceeding annual limit
-            if annual_401k_contribution > contribution_limits['401k']:
-                adjustment_factor = contribution_limits['401k'] / annual_401k_contribution
+            if annual_401k_contribution > limit_401k:
+                adjustment_factor = limit_401k / annual_401k_contribution
                 roth_401k_contribution_per_paycheck *= adjustment_factor
                 trad_401k_contribution_per_paycheck *= adjustment_factor
-                annual_401k_contribution = contribution_limits['401k']
+                annual_401k_contribution = limit_401k
             
             # Calculate annual Roth and Traditional 401k contributions
             annual_roth_401k_contribution = roth_401k_contribution_per_paycheck * paychecks_per_year
@@ -157,16 +432,13 @@ def calculate_retirement_projections(
             pre_tax_income = total_income - annual_trad_401k_contribution
             
             # Calculate taxes
-            tax_amount = estimate_tax_impact(pre_tax_income, filing_status)
-            projections.loc[year, 'Taxes Paid'] = tax_amount
+            tax_amount = tables.tax(year, pre_tax_income)
             
             # Calculate after-tax income
             after_tax_income = pre_tax_income - tax_amount
-            projections.loc[year, 'After-Tax Income'] = after_tax_income
             
             # Calculate disposable income (after tax and expenses)
             disposable_income = after_tax_income - annual_expenses - annual_roth_401k_contribution
-            projections.loc[year, 'Disposable Income'] = disposable_income
             
             # Calculate employer match
             match_eligible_contribution = min(
@@ -174,6 +446,7 @@ def calculate_retirement_projections(
                 (roth_401k_contribution_per_paycheck + trad_401k_contribution_per_paycheck) * paychecks_per_year
             )
             employer_contribution = match_eligible_contribution
+            employee_trad_401k_contribution = annual_trad_401k_contribution
             
             # Add employer contribution to Traditional 401k
             annual_trad_401k_contribution += employer_contribution
@@ -182,8 +455,9 @@ def calculate_retirement_projections(
             
             # Limit IRA contribution based on IRS income limits (simplified)
             effective_ira_contribution = annual_ira_contribution
-            if pre_tax_income > 150000:  # Simplified phaseout threshold
-                reduction_factor = min(1.0, (pre_tax_income - 150000) / 30000)
+            phaseout_start = phaseout_starts[year]
+            if pre_tax_income > phaseout_start:
+                reduction_factor = min(1.0, (pre_tax_income - phaseout_start) / (phaseout_ends[year] - phaseout_start))
                 effective_ira_contribution = annual_ira_contribution * (1 - reduction_factor)
             
             # Update account balances with new contributions and returns
@@ -191,125 +465,1025 @@ def calculate_retirement_projections(
             extra_savings = max(0, disposable_income)  # Any extra money after expenses goes to savings
             
             # Allow for higher savings rate to match expected growth pattern
-            realistic_savings_rate = min(0.85, extra_savings / after_tax_income)  # Cap at 85% of after-tax income
+            # (with no after-tax income there is nothing extra to save)
+            if after_tax_income != 0:
+                realistic_savings_rate = min(0.85, extra_savings / after_tax_income)  # Cap at 85% of after-tax income
+            else:
+                realistic_savings_rate = 0.85
             realistic_extra_savings = extra_savings * realistic_savings_rate
             
-            projections.loc[year, 'High-Yield Savings'] = (
-                projections.loc[year-1, 'High-Yield Savings'] * (1 + nominal_savings_apy) + 
-                realistic_extra_savings
-            )
-            
-            # Retirement accounts with market returns - use nominal returns for compound growth
-            adjusted_return = get_adjusted_return(year, nominal_investment_return)
-            
-            projections.loc[year, 'Traditional IRA'] = (
-                projections.loc[year-1, 'Traditional IRA'] * (1 + adjusted_return)
-            )
-            
-            projections.loc[year, 'Traditional 401k'] = (
-                projections.loc[year-1, 'Traditional 401k'] * (1 + adjusted_return) + 
-                annual_trad_401k_contribution
-            )
+            if steps_per_year == 1:
+                high_yield_savings = high_yield_savings * (1 + nominal_savings_apy) + realistic_extra_savings
+                
+                # Retirement accounts with market returns - use nominal returns for compound growth
+                trad_ira = trad_ira * (1 + adjusted_return)
+                trad_401k = trad_401k * (1 + adjusted_return) + annual_trad_401k_contribution
+            else:
+                high_yield_savings, trad_ira, trad_401k, employer_contribution = _working_year_steps(
+                    steps_per_year, salary, roth_401k_percent, trad_401k_percent, employer_401k_match,
+                    limit_401k, employee_trad_401k_contribution, tax_amount,
+                    annual_expenses, disposable_income, realistic_extra_savings,
+                    high_yield_savings, trad_ira, trad_401k, nominal_savings_apy, adjusted_return
+                )
             
-            # Add annual contributions for reference
-            projections.loc[year, '401k Contribution'] = annual_401k_contribution
-            projections.loc[year, 'Employer 401k Match'] = employer_contribution
-            projections.loc[year, 'IRA Contribution'] = min(effective_ira_contribution, contribution_limits['IRA'])
+            # Record taxes, income and annual contributions for reference
+            taxes_col[year] = tax_amount
+            after_tax_col[year] = after_tax_income
+            disposable_col[year] = disposable_income
+            contribution_401k_col[year] = annual_401k_contribution
+            match_col[year] = employer_contribution
+            ira_contribution_col[year] = min(effective_ira_contribution, limits_ira[year])
             
         # RETIREMENT PHASE CALCULATIONS
         else:
             # Set contributions to 0 in retirement
-            projections.loc[year, '401k Contribution'] = 0
-            projections.loc[year, 'Employer 401k Match'] = 0
-            projections.loc[year, 'IRA Contribution'] = 0
-            
-            # Use a more conservative return rate in retirement
-            retirement_return = adjusted_return * 0.8  # More conservative in retirement
+            contribution_401k_col[year] = 0
+            match_col[year] = 0
+            ira_contribution_col[year] = 0
             
             # Calculate required withdrawals for expenses
             withdrawal_needed = annual_expenses
             
             # Apply growth to accounts first with a more balanced approach to conservative returns
             # Use nominal returns for better growth projections
-            retirement_return = adjusted_return * 0.9  # Only 10% reduction in retirement
-            
-            high_yield_savings_growth = projections.loc[year-1, 'High-Yield Savings'] * nominal_savings_apy
-            trad_ira_growth = projections.loc[year-1, 'Traditional IRA'] * retirement_return
-            trad_401k_growth = projections.loc[year-1, 'Traditional 401k'] * retirement_return
-            
-            # Apply growth to accounts
-            projections.loc[year, 'High-Yield Savings'] = projections.loc[year-1, 'High-Yield Savings'] + high_yield_savings_growth
-            projections.loc[year, 'Traditional IRA'] = projections.loc[year-1, 'Traditional IRA'] + trad_ira_growth
-            projections.loc[year, 'Traditional 401k'] = projections.loc[year-1, 'Traditional 401k'] + trad_401k_growth
-            
-            # Withdrawal strategy in order:
-            # 1. Taxable accounts (High-Yield Savings)
-            # 2. Traditional accounts (taxed on withdrawal)
-            
-            # First withdraw from High-Yield Savings
-            high_yield_withdrawal = min(withdrawal_needed, projections.loc[year, 'High-Yield Savings'])
-            projections.loc[year, 'High-Yield Savings'] -= high_yield_withdrawal
-            withdrawal_needed -= high_yield_withdrawal
-            
-            # If more needed, withdraw from Traditional accounts
-            if withdrawal_needed > 0:
-                # Calculate tax on traditional withdrawals
-                trad_withdrawal_pretax = min(
-                    withdrawal_needed * 1.25,  # Inflate the needed amount to account for taxes
-                    projections.loc[year, 'Traditional 401k'] + projections.loc[year, 'Traditional IRA']
+            retirement_return = adjusted_return  # Already includes the cut in retirement
+            
+            if steps_per_year > 1 and savings_first:
+                high_yield_savings, trad_ira, trad_401k, taxes_col[year], shortfall_col[year] = _retirement_year_steps(
+                    steps_per_year, annual_expenses, high_yield_savings, trad_ira, trad_401k,
+                    nominal_savings_apy, retirement_return, tables.schedules[year]
                 )
-                tax_on_withdrawal = estimate_tax_impact(trad_withdrawal_pretax, filing_status)
-                trad_withdrawal_actual = trad_withdrawal_pretax - tax_on_withdrawal
+            else:
+                high_yield_savings = high_yield_savings + high_yield_savings * nominal_savings_apy
+                trad_ira = trad_ira + trad_ira * retirement_return
+                trad_401k = trad_401k + trad_401k * retirement_return
+                total_trad = trad_401k + trad_ira
+                
+                # Withdrawal strategy in order:
+                # 1. Traditional accounts for their share of spending, and up to the fill income
+                # 2. Taxable accounts (High-Yield Savings)
+                # 3. Traditional accounts for whatever savings could not cover
+                # Traditional withdrawals are taxed, so the needed amount is inflated to cover it
+                trad_withdrawal_pretax = 0.0
+                if not savings_first:
+                    if withdrawal_share is None:
+                        total_balance = total_trad + high_yield_savings
+                        share = total_trad / total_balance if total_balance > 0 else 0.0
+                    else:
+                        share = withdrawal_share
+                    trad_withdrawal_pretax = min(
+                        max(withdrawal_needed * share * 1.25, fill_income * price_index[year]),
+                        total_trad
+                    )
+                    withdrawal_needed = max(withdrawal_needed - trad_withdrawal_pretax / 1.25, 0.0)
+                
+                # Withdraw from High-Yield Savings
+                high_yield_withdrawal = min(withdrawal_needed, high_yield_savings)
+                high_yield_savings -= high_yield_withdrawal
+                withdrawal_needed -= high_yield_withdrawal
                 
-                # Track taxes
-                projections.loc[year, 'Taxes Paid'] = tax_on_withdrawal
+                # If more needed, withdraw from Traditional accounts
+                if withdrawal_needed > 0:
+                    trad_withdrawal_pretax += min(
+                        withdrawal_needed * 1.25,
+                        total_trad - trad_withdrawal_pretax
+                    )
                 
-                # Apportion the withdrawal between Traditional 401k and IRA
-                total_trad = projections.loc[year, 'Traditional 401k'] + projections.loc[year, 'Traditional IRA']
-                if total_trad > 0:
-                    trad_401k_ratio = projections.loc[year, 'Traditional 401k'] / total_trad
-                    trad_ira_ratio = projections.loc[year, 'Traditional IRA'] / total_trad
+                if trad_withdrawal_pretax > 0:
+                    # Calculate tax on traditional withdrawals
+                    tax_on_withdrawal = tables.tax(year, trad_withdrawal_pretax)
+                    trad_withdrawal_actual = trad_withdrawal_pretax - tax_on_withdrawal
                     
-                    trad_401k_withdrawal = trad_withdrawal_pretax * trad_401k_ratio
-                    trad_ira_withdrawal = trad_withdrawal_pretax * trad_ira_ratio
+                    # Track taxes
+                    taxes_col[year] = tax_on_withdrawal
                     
-                    projections.loc[year, 'Traditional 401k'] -= trad_401k_withdrawal
-                    projections.loc[year, 'Traditional IRA'] -= trad_ira_withdrawal
+                    # Apportion the withdrawal between Traditional 401k and IRA
+                    trad_401k_ratio = trad_401k / total_trad
+                    trad_ira_ratio = trad_ira / total_trad
                     
-                    withdrawal_needed -= trad_withdrawal_actual
-            else:
-                projections.loc[year, 'Taxes Paid'] = 0
+                    trad_401k -= trad_withdrawal_pretax * trad_401k_ratio
+                    trad_ira -= trad_withdrawal_pretax * trad_ira_ratio
+                    
+                    withdrawal_needed = annual_expenses - high_yield_withdrawal - trad_withdrawal_actual
+                    # Under the other strategies, what the withdrawals bring in beyond
+                    # spending (tax came in under the estimate, or brackets were
+                    # filled) is saved; savings first keeps its original results
+                    if not savings_first:
+                        high_yield_savings += max(-withdrawal_needed, 0.0)
+                else:
+                    taxes_col[year] = 0
+                
+                # Roth accounts and HSA withdrawal removed
+                
+                # If still needed more than available, mark as shortfall
+                shortfall_col[year] = max(withdrawal_needed, 0)
+        
+        # Record end-of-year balances
+        savings_col[year] = high_yield_savings
+        ira_col[year] = trad_ira
+        trad_401k_col[year] = trad_401k
+        total_col[year] = high_yield_savings + trad_ira + trad_401k
+        
+        if states is not None:
+            states[year] = (salary, high_yield_savings, trad_ira, trad_401k, current_monthly_expenses)
+
+@lru_cache(maxsize=256)
+def _year_returns(years_to_retirement, n_years, investment_return, bond_return, cash_return, glide_path):
+    """
+    Investment return of each of n_years projection years as a tuple,
+    starting years_to_retirement from retirement; reruns that change
+    anything else reuse it
+    """
+    return tuple(investment_returns(
+        years_to_retirement - np.arange(n_years), investment_return, bond_return, cash_return, glide_path
+    ).tolist())
+
+def projection_investment_returns(inputs, years_to_retirement):
+    """
+    Investment return of a projection's retirement accounts with
+    years_to_retirement to go, from its inputs with defaults filled in
+    """
+    cash_return = inputs['savings_apy'] if inputs['cash_return'] is None else inputs['cash_return']
+    return investment_returns(
+        years_to_retirement, inputs['investment_return'], inputs['bond_return'],
+        cash_return, inputs['glide_path']
+    )
+
+def _growth_to_step_end(annual_rate, steps_per_year):
+    """
+    Growth factor per step compounding to 1 + annual_rate over a year, and
+    the growth from the end of each step to the end of the year
+    """
+    step_growth = (1 + annual_rate) ** (1 / steps_per_year)
+    return step_growth, step_growth ** np.arange(steps_per_year - 1, -1, -1)
+
+def _working_year_steps(
+    steps_per_year,
+    salary,
+    roth_401k_percent,
+    trad_401k_percent,
+    employer_401k_match,
+    limit_401k,
+    trad_401k_contribution,
+    tax_amount,
+    annual_expenses,
+    disposable_income,
+    savings_deposit,
+    high_yield_savings,
+    trad_ira,
+    trad_401k,
+    savings_apy,
+    investment_return
+):
+    """
+    One working year paid in steps_per_year paychecks.
+
+    Employee 401k contributions stop at the paycheck that reaches the annual
+    limit, and the employer match (per paycheck) stops with them. The year's
+    savings deposit is spread over paychecks in proportion to what each one
+    leaves after contributions, tax and expenses. Deposits grow from the
+    paycheck they are made in. Returns end-of-year (savings, IRA, 401k) and
+    the employer match.
+    """
+    paycheck = salary / steps_per_year
+    employee_percent = roth_401k_percent + trad_401k_percent
+    contributed = np.minimum(paycheck * employee_percent * np.arange(1, steps_per_year + 1), limit_401k)
+    contributions = contributed.copy()
+    contributions[1:] -= contributed[:-1]
+    trad_contributions = contributions * (trad_401k_percent / employee_percent if employee_percent > 0 else 0.0)
+    match = np.minimum(paycheck * employer_401k_match, contributions)
+    
+    # Tax is withheld in proportion to each paycheck's taxable pay
+    taxable = paycheck - trad_contributions
+    taxable_income = salary - trad_401k_contribution
+    if taxable_income != 0:
+        tax = tax_amount * taxable / taxable_income
+    else:
+        tax = np.full(steps_per_year, tax_amount / steps_per_year)
+    # Sums to disposable_income; a step leaving less than its share draws on
+    # savings and one leaving more tops them up
+    left_over = paycheck - contributions - tax - annual_expenses / steps_per_year
+    if disposable_income > 0:
+        deposits = savings_deposit * left_over / disposable_income
+    else:
+        deposits = np.zeros(steps_per_year)
+    
+    _, savings_growth = _growth_to_step_end(savings_apy, steps_per_year)
+    _, return_growth = _growth_to_step_end(investment_return, steps_per_year)
+    high_yield_savings = high_yield_savings * (1 + savings_apy) + deposits @ savings_growth
+    trad_ira = trad_ira * (1 + investment_return)
+    trad_401k = trad_401k * (1 + investment_return) + (trad_contributions + match) @ return_growth
+    return high_yield_savings, trad_ira, trad_401k, float(match.sum())
+
+def _retirement_year_steps(
+    steps_per_year,
+    annual_expenses,
+    high_yield_savings,
+    trad_ira,
+    trad_401k,
+    savings_apy,
+    retirement_return,
+    tax_schedule
+):
+    """
+    One retirement year with expenses withdrawn in steps_per_year equal
+    amounts, each after that step's growth: from savings first, then from
+    traditional accounts grossed up for tax. Tax is owed on year-to-date
+    traditional withdrawals under tax_schedule. Returns end-of-year (savings, IRA, 401k), taxes
+    paid and the shortfall.
+    """
+    steps = np.arange(1, steps_per_year + 1)
+    withdrawal = annual_expenses / steps_per_year
+    
+    # Savings after each step if they never ran out
+    savings_step_growth, _ = _growth_to_step_end(savings_apy, steps_per_year)
+    grown = savings_step_growth ** steps
+    savings_path = high_yield_savings * grown - withdrawal * np.cumsum(grown / savings_step_growth)
+    from_savings = np.full(steps_per_year, withdrawal)
+    empty = np.flatnonzero(savings_path < 0)
+    if len(empty):
+        # The step savings run out in takes what is left of them
+        step = empty[0]
+        before = high_yield_savings if step == 0 else savings_path[step - 1]
+        from_savings[step] = before * savings_step_growth
+        from_savings[step + 1:] = 0.0
+        high_yield_savings = 0.0
+    else:
+        high_yield_savings = savings_path[-1]
+    needed = withdrawal - from_savings
+    
+    # Traditional accounts grow at the same rate and are drawn pro rata, so
+    # they are followed as one balance, discounted to the start of the year
+    total_trad = trad_401k + trad_ira
+    trad_step_growth, _ = _growth_to_step_end(retirement_return, steps_per_year)
+    discount = trad_step_growth ** -steps
+    requested = needed * 1.25  # Inflate the needed amount to account for taxes
+    remaining = total_trad - np.cumsum(requested * discount)
+    pretax = requested
+    drained = np.flatnonzero(remaining < 0)
+    if len(drained):
+        step = drained[0]
+        before = total_trad if step == 0 else remaining[step - 1]
+        pretax = requested.copy()
+        pretax[step] = before / discount[step]
+        pretax[step + 1:] = 0.0
+        trad_left = 0.0
+    else:
+        trad_left = remaining[-1] * trad_step_growth ** steps_per_year
+    
+    tax_to_date = tax_schedule.tax_array(np.cumsum(pretax))
+    received = pretax - tax_to_date
+    received[1:] += tax_to_date[:-1]
+    shortfall = np.maximum(needed - received, 0.0)
+    
+    if total_trad > 0:
+        trad_401k, trad_ira = trad_left * (trad_401k / total_trad), trad_left * (trad_ira / total_trad)
+    return high_yield_savings, trad_ira, trad_401k, float(tax_to_date[-1]), float(shortfall.sum())
+
+def first_dirty_year(old_inputs, new_inputs):
+    """
+    First projection year whose values can differ between two sets of
+    projection inputs: 0 when everything must be recomputed, None when
+    nothing changed.
+
+    Starting balances dirty year 0; other working-life inputs dirty year 1;
+    retirement-phase inputs only dirty the retirement years; a new
+    retirement age dirties the first year whose return glide-down or phase
+    changes.
+    """
+    old_inputs = dict(PROJECTION_INPUT_DEFAULTS, **old_inputs)
+    new_inputs = dict(PROJECTION_INPUT_DEFAULTS, **new_inputs)
+    changed = [name for name in set(old_inputs) | set(new_inputs)
+               if old_inputs.get(name) != new_inputs.get(name)]
+    if not changed:
+        return None
+    
+    current_age = new_inputs['current_age']
+    dirty = []
+    for name in changed:
+        if name in INITIAL_STATE_INPUTS:
+            return 0
+        if name in RETIREMENT_PHASE_INPUTS:
+            first_retired = min(old_inputs['retirement_age'], new_inputs['retirement_age']) - current_age
+            dirty.append(max(1, first_retired))
+        elif name == 'retirement_age':
+            dirty.append(_first_retirement_age_change(
+                new_inputs, old_inputs['retirement_age'], new_inputs['retirement_age']
+            ))
+        else:
+            dirty.append(1)
+    return min(dirty)
+
+def _first_retirement_age_change(inputs, old_retirement_age, new_retirement_age):
+    """
+    First year in which moving the retirement age changes the projection
+    rules, past the longer horizon if it changes none
+    """
+    current_age = inputs['current_age']
+    years = np.arange(1, max(old_retirement_age, new_retirement_age) - current_age + 30)
+    ages = current_age + years
+    changed = ((ages >= old_retirement_age) != (ages >= new_retirement_age)) | (
+        projection_investment_returns(inputs, old_retirement_age - ages)
+        != projection_investment_returns(inputs, new_retirement_age - ages)
+    )
+    return int(years[np.argmax(changed)]) if changed.any() else len(years) + 1
+
+class IncrementalProjection:
+    """
+    calculate_retirement_projections that remembers its last run.
+
+    The running state after every year is checkpointed, and a new run resumes
+    from the first year first_dirty_year says the changed inputs can affect,
+    so e.g. editing retirement expenses does not replay the working years.
+    """
+    def __init__(self):
+        self.inputs = None
+        self.values = None
+        self.states = None
+        self.last_start_year = None  # year the most recent run resumed from
+    
+    @timed()
+    def project(self, **inputs):
+        """Same inputs and result as calculate_retirement_projections"""
+        inputs = dict(PROJECTION_INPUT_DEFAULTS, **inputs)
+        n_years = max(inputs['retirement_age'] - inputs['current_age'] + 30, 0)
+        
+        start_year = 0 if self.inputs is None else first_dirty_year(self.inputs, inputs)
+        if start_year is not None and self.values is not None:
+            start_year = min(start_year, len(self.values), n_years)
+        
+        if start_year is None and len(self.values) == n_years:
+            self.last_start_year = n_years
+            return self._result()
+        
+        start_year = start_year or 0
+        values = np.full((n_years, len(PROJECTION_COLUMNS)), np.nan, order='F')
+        states = np.full((n_years, len(PROJECTION_STATE)), np.nan)
+        start_state = None
+        if start_year > 0:
+            values[:start_year] = self.values[:start_year]
+            states[:start_year] = self.states[:start_year]
+            start_state = tuple(float(value) for value in states[start_year - 1])
+        
+        _project_years(inputs, values, start_year, states, start_state)
+        self.inputs, self.values, self.states = inputs, values, states
+        self.last_start_year = start_year
+        return self._result()
+    
+    def _result(self):
+        # Checkpointed values stay unrounded so resumed years match a full run
+        values = self.values.copy(order='F')
+        _round_currency(values)
+        return ProjectionResult(values, self.inputs['current_age'], self.inputs['retirement_age'])
+
+class BatchProjections:
+    """
+    Projections for many scenarios, as returned by calculate_retirement_projections_batch.
+
+    Data is stored field-major, (field x year x scenario), so each simulated
+    year is written contiguously; values exposes it as (scenario x year x field).
+    """
+    def __init__(self, data, fields, n_years):
+        self.data = data
+        self.fields = list(fields)
+        self.n_years = n_years
+
+    def __len__(self):
+        return self.data.shape[2]
+
+    @property
+    def values(self):
+        """(scenario x year x field) view of the projections"""
+        return self.data.transpose(2, 1, 0)
+
+    def field(self, name):
+        """Return a (scenario x year) array for one projection field"""
+        return self.data[self.fields.index(name)].T
+
+    def to_frame(self, scenario):
+        """
+        Return one scenario in the same DataFrame shape as
+        calculate_retirement_projections
+        """
+        import pandas as pd
+        n_years = int(self.n_years[scenario])
+        return pd.DataFrame(self.data[:, :n_years, scenario].T, columns=self.fields)
+
+def _as_scenario_arrays(**inputs):
+    """
+    Convert scalar or per-scenario inputs to one-dimensional float arrays.
+
+    Scalars stay length-1 arrays so NumPy broadcasting evaluates anything that
+    depends only on them once instead of once per scenario. Returns the arrays
+    and the number of scenarios.
+    """
+    arrays = {name: np.atleast_1d(np.asarray(value, dtype=float)) for name, value in inputs.items()}
+    if any(array.ndim != 1 for array in arrays.values()):
+        raise ValueError("Batch inputs must be scalars or one-dimensional arrays")
+    (n_scenarios,) = np.broadcast_shapes(*[array.shape for array in arrays.values()])
+    return arrays, n_scenarios
+
+@timed()
+def calculate_retirement_projections_batch(
+    current_age,
+    retirement_age,
+    current_savings,
+    current_trad_ira,
+    current_trad_401k,
+    annual_salary,
+    annual_merit_increase,
+    investment_return,
+    savings_apy,
+    roth_401k_percent,
+    trad_401k_percent,
+    employer_401k_match,
+    annual_ira_contribution,
+    monthly_expenses=0.0,
+    filing_status="single",
+    retirement_monthly_expenses=None,
+    withdrawal_share=0.0,
+    fill_income=0.0,
+    glide_path=None,
+    bond_return=DEFAULT_BOND_RETURN,
+    cash_return=None,
+    inflation_rate=INFLATION_RATE,
+    fields=None,
+    round_values=True,
+    adjust_returns=True
+):
+    """
+    Calculate retirement projections for many scenarios at once.
+
+    Every numeric input may be a scalar or an array with one entry per scenario;
+    all scenarios are stepped forward together, one vectorized operation per
+    year, using the same rules as calculate_retirement_projections. Scenarios
+    with different horizons share the longest one; BatchProjections.to_frame
+    trims each back to its own length. Pass fields to record only a subset of
+    PROJECTION_COLUMNS.
+
+    investment_return, savings_apy, bond_return, cash_return and
+    inflation_rate may also be (scenario x year) arrays covering the whole
+    horizon, giving a different rate every year. With a glide_path they are
+    the asset returns its mix earns, as in calculate_retirement_projections.
+    Without one, adjust_returns=False uses investment_return as given
+    instead of stepping it down toward retirement and cutting it in
+    retirement, e.g. for returns resampled from history.
+    round_values=False skips rounding currency fields to cents.
+    retirement_monthly_expenses may be NaN for scenarios that keep their
+    current expenses in retirement, and withdrawal_share NaN for scenarios
+    drawing in proportion to balances.
+    """
+    yearly_return = np.asarray(investment_return, dtype=float)
+    yearly_apy = np.asarray(savings_apy, dtype=float)
+    yearly_inflation = np.asarray(inflation_rate, dtype=float)
+    yearly_bond = np.asarray(bond_return, dtype=float)
+    yearly_cash = yearly_apy if cash_return is None else np.asarray(cash_return, dtype=float)
+    return_by_year = yearly_return.ndim == 2
+    apy_by_year = yearly_apy.ndim == 2
+    inflation_by_year = yearly_inflation.ndim == 2
+    
+    inputs, n_scenarios = _as_scenario_arrays(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase,
+        investment_return=yearly_return[:, 0] if return_by_year else yearly_return,
+        savings_apy=yearly_apy[:, 0] if apy_by_year else yearly_apy,
+        roth_401k_percent=roth_401k_percent,
+        trad_401k_percent=trad_401k_percent,
+        employer_401k_match=employer_401k_match,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        retirement_monthly_expenses=np.nan if retirement_monthly_expenses is None else retirement_monthly_expenses,
+        withdrawal_share=np.nan if withdrawal_share is None else withdrawal_share,
+        fill_income=fill_income,
+        bond_return=yearly_bond[:, 0] if yearly_bond.ndim == 2 else yearly_bond,
+        cash_return=yearly_cash[:, 0] if yearly_cash.ndim == 2 else yearly_cash,
+        inflation_rate=yearly_inflation[:, 0] if inflation_by_year else yearly_inflation
+    )
+    current_age = inputs['current_age']
+    retirement_age = inputs['retirement_age']
+    annual_merit_increase = inputs['annual_merit_increase']
+    investment_return = inputs['investment_return']
+    savings_apy = inputs['savings_apy']
+    roth_401k_percent = inputs['roth_401k_percent']
+    trad_401k_percent = inputs['trad_401k_percent']
+    employer_401k_match = inputs['employer_401k_match']
+    annual_ira_contribution = inputs['annual_ira_contribution']
+    inflation_rate = inputs['inflation_rate']
+    retirement_monthly_expenses = inputs['retirement_monthly_expenses']
+    sets_retirement_expenses = ~np.isnan(retirement_monthly_expenses)
+    any_retirement_expenses = bool(sets_retirement_expenses.any())
+    withdrawal_share = inputs['withdrawal_share']
+    fill_income = inputs['fill_income']
+    shares_by_balance = np.isnan(withdrawal_share)
+    # Scenarios not drawing savings first, per scenario since a batch may mix strategies
+    saves_surplus = shares_by_balance | (withdrawal_share != 0) | (fill_income != 0)
+    savings_first = not saves_surplus.any()
+    
+    n_years = np.broadcast_to(
+        np.maximum(retirement_age - current_age + 30, 0).astype(int), (n_scenarios,)
+    )
+    horizon = int(n_years.max()) if n_scenarios else 0
+    
+    for name, rates, by_year in [
+        ('investment_return', yearly_return, return_by_year),
+        ('savings_apy', yearly_apy, apy_by_year),
+        ('bond_return', yearly_bond, yearly_bond.ndim == 2),
+        ('cash_return', yearly_cash, yearly_cash.ndim == 2),
+        ('inflation_rate', yearly_inflation, inflation_by_year)
+    ]:
+        if by_year and rates.shape[1] < horizon:
+            raise ValueError(f"{name} must cover {horizon} years, got {rates.shape[1]}")
+    
+    if glide_path is not None:
+        # Every scenario's mix for every year earning its asset returns, in
+        # one operation; year-major like the other yearly rates
+        def year_major(rates):
+            return rates[:, :horizon].T if rates.ndim == 2 else np.atleast_1d(rates)[None, :]
+        ages = current_age[:, None] + np.arange(horizon)
+        weights = glide_path.weights((retirement_age[:, None] - ages).T)
+        returns = asset_returns(*[year_major(rates) for rates in (yearly_return, yearly_bond, yearly_cash)])
+        yearly_return = portfolio_returns(weights, returns).T
+        return_by_year = True
+    
+    fields = list(PROJECTION_COLUMNS if fields is None else fields)
+    field_index = {name: i for i, name in enumerate(fields)}
+    values = np.full((len(fields), horizon, n_scenarios), np.nan)
+    
+    def record(year, name, data):
+        if name in field_index:
+            values[field_index[name], year] = data
+    
+    # Running per-account state; arrays widen to one entry per scenario as
+    # soon as a per-scenario input touches them
+    salary = inputs['annual_salary']
+    high_yield_savings = inputs['current_savings']
+    trad_ira = inputs['current_trad_ira']
+    trad_401k = inputs['current_trad_401k']
+    current_monthly_expenses = inputs['monthly_expenses']
+    price_level = 1.0  # cumulative inflation since year 0, for yearly inflation rates
+    
+    # One inflation rate for every scenario and year shares the cached year
+    # tables; otherwise limits and brackets follow each scenario's price level
+    shared_inflation = yearly_inflation.size > 0 and bool((yearly_inflation == yearly_inflation.flat[0]).all())
+    if shared_inflation:
+        tables = year_tables(float(yearly_inflation.flat[0]), filing_status, horizon)
+    
+    if horizon > 0:
+        record(0, 'Age', current_age)
+        record(0, 'Year', CURRENT_YEAR)
+        record(0, 'Salary', salary)
+        record(0, 'High-Yield Savings', high_yield_savings)
+        record(0, 'Traditional IRA', trad_ira)
+        record(0, 'Traditional 401k', trad_401k)
+        record(0, 'Monthly Expenses', current_monthly_expenses)
+        record(0, 'Annual Expenses', current_monthly_expenses * 12)
+        record(0, 'Total Balance', calculate_total_current_savings(
+            high_yield_savings, trad_ira, trad_401k
+        ))
+    
+    paychecks_per_year = 26
+    max_merit_years = 15
+    reduced_merit_rate = annual_merit_increase * 0.5
+    
+    for year in range(1, horizon):
+        age = current_age + year
+        is_retirement = age >= retirement_age
+        working = ~is_retirement
+        any_working = bool(working.any())
+        any_retired = bool(is_retirement.any())
+        
+        def by_phase(working_value, retired_value):
+            # Only mix the two phases when scenarios are actually split between them
+            if not any_retired:
+                return working_value
+            if not any_working:
+                return retired_value
+            return np.where(working, working_value, retired_value)
+        
+        def record_phases(name, working_value, retired_value):
+            if name in field_index:
+                record(year, name, by_phase(working_value, retired_value))
+        
+        base_return = yearly_return[:, year] if return_by_year else investment_return
+        year_apy = yearly_apy[:, year] if apy_by_year else savings_apy
+        
+        if adjust_returns and glide_path is None:
+            # Same step-down of returns as the scalar engine
+            adjusted_return = base_return * step_down_multipliers(retirement_age - age)
+        else:
+            adjusted_return = base_return
+        
+        year_inflation = yearly_inflation[:, year] if inflation_by_year else inflation_rate
+        if inflation_by_year:
+            price_level = price_level * (1 + year_inflation)
+        price_index = price_level if inflation_by_year else (1 + inflation_rate) ** year
+        current_monthly_expenses = current_monthly_expenses * (1 + year_inflation)
+        if any_retirement_expenses and any_retired:
+            current_monthly_expenses = np.where(
+                is_retirement & sets_retirement_expenses,
+                retirement_monthly_expenses * price_index,
+                current_monthly_expenses
+            )
+        annual_expenses = current_monthly_expenses * 12
+        
+        if shared_inflation:
+            limit_401k = tables.limit_401k[year]
+            limit_ira = tables.limit_ira[year]
+            phaseout_start = tables.ira_phaseout_start[year]
+            phaseout_end = tables.ira_phaseout_end[year]
+            year_tax = tables.schedules[year].tax_array
+        else:
+            limit_401k = index_amount(CURRENT_401K_LIMIT, price_index, LIMIT_ROUNDING['401k'])
+            limit_ira = index_amount(CURRENT_IRA_LIMIT, price_index, LIMIT_ROUNDING['IRA'])
+            phaseout_start = index_amount(IRA_PHASEOUT_START, price_index, IRA_PHASEOUT_ROUNDING)
+            phaseout_end = index_amount(IRA_PHASEOUT_END, price_index, IRA_PHASEOUT_ROUNDING)
+            year_tax = IndexedTaxTables(filing_status, price_index).tax_array
+        
+        current_merit_rate = annual_merit_increase if year <= max_merit_years else reduced_merit_rate
+        salary = by_phase(salary * (1 + current_merit_rate), 0.0)
+        
+        # PRE-RETIREMENT CALCULATIONS
+        tax_amount = after_tax_income = disposable_income = None
+        annual_401k_contribution = employer_contribution = ira_contribution = None
+        working_savings = working_trad_ira = working_trad_401k = None
+        if any_working:
+            paycheck_amount = salary / paychecks_per_year
+            roth_401k_contribution_per_paycheck = paycheck_amount * roth_401k_percent
+            trad_401k_contribution_per_paycheck = paycheck_amount * trad_401k_percent
+            annual_401k_contribution = (roth_401k_contribution_per_paycheck + trad_401k_contribution_per_paycheck) * paychecks_per_year
+            
+            over_limit = annual_401k_contribution > limit_401k
+            adjustment_factor = limit_401k / np.where(over_limit, annual_401k_contribution, 1.0)
+            roth_401k_contribution_per_paycheck = np.where(
+                over_limit, roth_401k_contribution_per_paycheck * adjustment_factor, roth_401k_contribution_per_paycheck
+            )
+            trad_401k_contribution_per_paycheck = np.where(
+                over_limit, trad_401k_contribution_per_paycheck * adjustment_factor, trad_401k_contribution_per_paycheck
+            )
+            annual_401k_contribution = np.where(over_limit, limit_401k, annual_401k_contribution)
             
-            # Roth accounts and HSA withdrawal removed
+            annual_roth_401k_contribution = roth_401k_contribution_per_paycheck * paychecks_per_year
+            annual_trad_401k_contribution = trad_401k_contribution_per_paycheck * paychecks_per_year
+            
+            pre_tax_income = salary - annual_trad_401k_contribution
+            tax_amount = year_tax(pre_tax_income)
+            after_tax_income = pre_tax_income - tax_amount
+            disposable_income = after_tax_income - annual_expenses - annual_roth_401k_contribution
             
-            # If still needed more than available, mark as shortfall
-            if withdrawal_needed > 0:
-                projections.loc[year, 'Retirement Shortfall'] = withdrawal_needed
+            employer_contribution = np.minimum(
+                paycheck_amount * employer_401k_match * paychecks_per_year,
+                (roth_401k_contribution_per_paycheck + trad_401k_contribution_per_paycheck) * paychecks_per_year
+            )
+            annual_trad_401k_contribution = annual_trad_401k_contribution + employer_contribution
+            
+            reduction_factor = np.minimum(1.0, (pre_tax_income - phaseout_start) / (phaseout_end - phaseout_start))
+            effective_ira_contribution = np.where(
+                pre_tax_income > phaseout_start,
+                annual_ira_contribution * (1 - reduction_factor),
+                annual_ira_contribution
+            )
+            ira_contribution = np.minimum(effective_ira_contribution, limit_ira)
+            
+            extra_savings = np.maximum(0, disposable_income)
+            has_income = after_tax_income != 0
+            realistic_savings_rate = np.where(
+                has_income,
+                np.minimum(0.85, extra_savings / np.where(has_income, after_tax_income, 1.0)),
+                0.85
+            )
+            working_savings = high_yield_savings * (1 + year_apy) + extra_savings * realistic_savings_rate
+            working_trad_ira = trad_ira * (1 + adjusted_return)
+            working_trad_401k = trad_401k * (1 + adjusted_return) + annual_trad_401k_contribution
+        
+        # RETIREMENT PHASE CALCULATIONS
+        tax_on_withdrawal = withdrawal_needed = None
+        retired_savings = retired_trad_ira = retired_trad_401k = None
+        if any_retired:
+            if adjust_returns and glide_path is None:
+                retirement_return = adjusted_return * RETIREMENT_RETURN_CUT
             else:
-                projections.loc[year, 'Retirement Shortfall'] = 0
+                retirement_return = adjusted_return
+            retired_savings = high_yield_savings + high_yield_savings * year_apy
+            retired_trad_ira = trad_ira + trad_ira * retirement_return
+            retired_trad_401k = trad_401k + trad_401k * retirement_return
+            
+            total_trad = retired_trad_401k + retired_trad_ira
+            withdrawal_needed = annual_expenses
+            trad_withdrawal_pretax = 0.0
+            
+            # 1. Traditional accounts for their share of spending, and up to the fill income
+            if not savings_first:
+                total_balance = total_trad + retired_savings
+                share = np.where(
+                    shares_by_balance,
+                    total_trad / np.where(total_balance > 0, total_balance, 1.0) * (total_balance > 0),
+                    np.nan_to_num(withdrawal_share)
+                )
+                trad_withdrawal_pretax = np.minimum(
+                    np.maximum(withdrawal_needed * share * 1.25, fill_income * price_index), total_trad
+                )
+                withdrawal_needed = np.maximum(withdrawal_needed - trad_withdrawal_pretax / 1.25, 0.0)
+            
+            # 2. Taxable accounts (High-Yield Savings)
+            high_yield_withdrawal = np.minimum(withdrawal_needed, retired_savings)
+            retired_savings = retired_savings - high_yield_withdrawal
+            withdrawal_needed = withdrawal_needed - high_yield_withdrawal
+            
+            # 3. Traditional accounts (taxed on withdrawal), pro-rata between 401k and IRA
+            trad_withdrawal_pretax = trad_withdrawal_pretax + np.where(
+                withdrawal_needed > 0, np.minimum(withdrawal_needed * 1.25, total_trad - trad_withdrawal_pretax), 0.0
+            )
+            draws_trad = trad_withdrawal_pretax > 0
+            tax_on_withdrawal = np.where(draws_trad, year_tax(trad_withdrawal_pretax), 0.0)
+            trad_withdrawal_actual = trad_withdrawal_pretax - tax_on_withdrawal
+            
+            safe_total_trad = np.where(draws_trad, total_trad, 1.0)
+            retired_trad_401k = np.where(
+                draws_trad, retired_trad_401k - trad_withdrawal_pretax * (retired_trad_401k / safe_total_trad), retired_trad_401k
+            )
+            retired_trad_ira = np.where(
+                draws_trad, retired_trad_ira - trad_withdrawal_pretax * (retired_trad_ira / safe_total_trad), retired_trad_ira
+            )
+            withdrawal_needed = np.where(
+                draws_trad, annual_expenses - high_yield_withdrawal - trad_withdrawal_actual, withdrawal_needed
+            )
+            # Under the other strategies, what the withdrawals bring in beyond
+            # spending is saved, as in the scalar engine
+            if not savings_first:
+                retired_savings = retired_savings + np.where(saves_surplus, np.maximum(-withdrawal_needed, 0.0), 0.0)
+            withdrawal_needed = np.maximum(withdrawal_needed, 0.0)
         
-        # Calculate total balance
-        projections.loc[year, 'Total Balance'] = (
-            projections.loc[year, 'High-Yield Savings'] +
-            projections.loc[year, 'Traditional IRA'] +
-            projections.loc[year, 'Traditional 401k']
-        )
+        high_yield_savings = by_phase(working_savings, retired_savings)
+        trad_ira = by_phase(working_trad_ira, retired_trad_ira)
+        trad_401k = by_phase(working_trad_401k, retired_trad_401k)
+        
+        record(year, 'Age', age)
+        record(year, 'Year', CURRENT_YEAR + year)
+        record(year, 'Salary', salary)
+        record(year, 'High-Yield Savings', high_yield_savings)
+        record(year, 'Traditional IRA', trad_ira)
+        record(year, 'Traditional 401k', trad_401k)
+        record(year, 'Monthly Expenses', current_monthly_expenses)
+        record(year, 'Annual Expenses', annual_expenses)
+        record(year, 'Total Balance', high_yield_savings + trad_ira + trad_401k)
+        record_phases('Taxes Paid', tax_amount, tax_on_withdrawal)
+        record_phases('After-Tax Income', after_tax_income, np.nan)
+        record_phases('Disposable Income', disposable_income, np.nan)
+        record_phases('401k Contribution', annual_401k_contribution, 0.0)
+        record_phases('Employer 401k Match', employer_contribution, 0.0)
+        record_phases('IRA Contribution', ira_contribution, 0.0)
+        record_phases('Bonus', np.nan, 0.0)
+        record_phases('RSU', np.nan, 0.0)
+        record_phases('Retirement Shortfall', np.nan, withdrawal_needed)
     
     # Format currency columns
-    for col in [
-        'Salary', 'High-Yield Savings', 'Traditional IRA', 'Traditional 401k', 
-        'Total Balance', '401k Contribution', 'Employer 401k Match',
-        'IRA Contribution', 'Monthly Expenses',
-        'Annual Expenses', 'Taxes Paid', 'After-Tax Income', 
-        'Disposable Income', 'Retirement Shortfall'
-    ]:
-        if col in projections.columns:
-            projections[col] = projections[col].round(2)
+    if round_values:
+        for col in CURRENCY_COLUMNS:
+            if col in field_index:
+                np.round(values[field_index[col]], 2, out=values[field_index[col]])
     
-    # Truncate to focus on relevant years (pre-retirement + 30 years after)
-    projections = projections.iloc[:years_to_retirement + 30]
+    return BatchProjections(values, fields, n_years)
+
+# Inputs that are not per-scenario numbers in calculate_retirement_projections_batch
+_SCENARIO_GROUP_INPUTS = ('filing_status', 'glide_path', 'steps_per_year', 'cash_return')
+
+@timed()
+def calculate_scenario_projections(scenarios):
+    """
+    calculate_retirement_projections for each dict of inputs in scenarios, in
+    order, with one batched projection per filing status and glide path.
+    Scenarios with more than one step per year are projected one at a time.
+    Returns a list of ProjectionResult, each equal to projecting its
+    scenario on its own.
+    """
+    scenarios = [dict(PROJECTION_INPUT_DEFAULTS, **inputs) for inputs in scenarios]
+    results = [None] * len(scenarios)
+    groups = {}
+    for i, inputs in enumerate(scenarios):
+        if inputs['steps_per_year'] > 1:
+            results[i] = calculate_retirement_projections(**inputs)
+        else:
+            groups.setdefault((inputs['filing_status'], inputs['glide_path']), []).append(i)
     
-    return projections
+    for (filing_status, glide_path), positions in groups.items():
+        group = [scenarios[i] for i in positions]
+        # None (current expenses, drawing by balance) is NaN in the batch;
+        # a cash return of None is the savings APY
+        batch_inputs = {
+            name: np.array([np.nan if inputs[name] is None else inputs[name] for inputs in group], dtype=float)
+            for name in group[0] if name not in _SCENARIO_GROUP_INPUTS
+        }
+        batch_inputs['cash_return'] = np.array([
+            inputs['savings_apy'] if inputs['cash_return'] is None else inputs['cash_return'] for inputs in group
+        ], dtype=float)
+        batch = calculate_retirement_projections_batch(
+            **batch_inputs, filing_status=filing_status, glide_path=glide_path
+        )
+        for j, i in enumerate(positions):
+            values = np.asfortranarray(batch.data[:, :int(batch.n_years[j]), j].T)
+            results[i] = ProjectionResult(values, scenarios[i]['current_age'], scenarios[i]['retirement_age'])
+    return results
+
+class TaxTable:
+    """
+    Tax brackets compiled for lookup: bracket i taxes income between lower[i]
+    and upper[i] at rates[i], and cumulative[i] is the tax owed on all income
+    below lower[i]. Array forms serve np.searchsorted, list forms serve bisect.
+    """
+    def __init__(self, brackets):
+        lower = []
+        cumulative = []
+        tax = 0
+        prev_threshold = 0
+        # Accumulate full brackets in the same order calculate_tax_from_brackets
+        # adds them, so lookups reproduce its results exactly
+        for threshold, rate in brackets:
+            lower.append(prev_threshold)
+            cumulative.append(tax)
+            tax += (threshold - prev_threshold) * rate
+            prev_threshold = threshold
+        
+        # Income above the last threshold is not taxed further
+        self.lower_list = lower + [prev_threshold]
+        self.upper_list = [threshold for threshold, _ in brackets]
+        self.rates_list = [rate for _, rate in brackets] + [0.0]
+        self.cumulative_list = cumulative + [tax]
+        
+        self.lower = np.array(self.lower_list, dtype=float)
+        self.upper = np.array(self.upper_list, dtype=float)
+        self.rates = np.array(self.rates_list, dtype=float)
+        self.cumulative = np.array(self.cumulative_list, dtype=float)
+
+    def tax(self, income):
+        """Tax owed on a single income"""
+        if income <= 0:
+            return 0
+        i = bisect_left(self.upper_list, income)
+        return self.cumulative_list[i] + (income - self.lower_list[i]) * self.rates_list[i]
+
+    def tax_array(self, incomes):
+        """Tax owed on each of an array of incomes, via one searchsorted lookup"""
+        incomes = np.asarray(incomes, dtype=float)
+        i = np.searchsorted(self.upper, incomes, side='left')
+        tax = self.cumulative[i] + (incomes - self.lower[i]) * self.rates[i]
+        return np.where(incomes > 0, tax, 0.0)
+
+class TaxSchedule:
+    """
+    Several TaxTables (e.g. federal and state) evaluated with a single lookup
+    over their merged thresholds; the per-table taxes are added in order
+    """
+    def __init__(self, tables):
+        self.upper = np.unique(np.concatenate([table.upper for table in tables]))
+        self.segments = []
+        for table in tables:
+            # Within each merged segment every table stays in one bracket
+            index = np.append(np.searchsorted(table.upper, self.upper, side='left'), len(table.upper))
+            self.segments.append((table.cumulative[index], table.lower[index], table.rates[index]))
+
+    def tax_array(self, incomes):
+        """Total tax owed on each of an array of incomes"""
+        incomes = np.asarray(incomes, dtype=float)
+        i = np.searchsorted(self.upper, incomes, side='left')
+        tax = None
+        for cumulative, lower, rates in self.segments:
+            table_tax = cumulative[i] + (incomes - lower[i]) * rates[i]
+            tax = table_tax if tax is None else tax + table_tax
+        return np.where(incomes > 0, tax, 0.0)
+
+def compile_tax_brackets(brackets):
+    """Compile a list of (threshold, rate) brackets into a TaxTable"""
+    return TaxTable(brackets)
+
+# Bracket tables from constants.py, compiled once at import
+COMPILED_TAX_BRACKETS_FEDERAL = {
+    status: compile_tax_brackets(brackets) for status, brackets in TAX_BRACKETS_FEDERAL.items()
+}
+COMPILED_TAX_BRACKETS_NY = {
+    status: compile_tax_brackets(brackets) for status, brackets in TAX_BRACKETS_NY.items()
+}
+
+# Federal plus NY tax per filing status, for estimate_tax_impact_array
+COMPILED_TAX_SCHEDULES = {
+    status: TaxSchedule([COMPILED_TAX_BRACKETS_FEDERAL[status], COMPILED_TAX_BRACKETS_NY[status]])
+    for status in TAX_BRACKETS_FEDERAL
+}
+
+# Years every YearTables covers at least, enough for any projection horizon
+# the app allows so a single table serves them all
+MIN_TABLE_YEARS = 128
+
+def index_amount(amount, price_index, increment):
+    """amount grown by price_index, rounded down to a multiple of increment as the IRS does"""
+    return np.floor(amount * price_index / increment) * increment
+
+class YearTables:
+    """
+    Inflation-indexed contribution limits, IRA phase-out range and federal
+    tax brackets for every projection year, so the engines look year t up
+    instead of growing them as they go. NY brackets are not indexed.
+    """
+    def __init__(self, inflation_rate, filing_status, n_years):
+        self.inflation_rate = inflation_rate
+        self.filing_status = filing_status
+        self.n_years = n_years
+        self.price_index = (1 + inflation_rate) ** np.arange(n_years)
+        
+        self.limit_401k = index_amount(CURRENT_401K_LIMIT, self.price_index, LIMIT_ROUNDING['401k'])
+        self.limit_hsa = index_amount(CURRENT_HSA_LIMIT, self.price_index, LIMIT_ROUNDING['HSA'])
+        self.limit_ira = index_amount(CURRENT_IRA_LIMIT, self.price_index, LIMIT_ROUNDING['IRA'])
+        self.ira_phaseout_start = index_amount(IRA_PHASEOUT_START, self.price_index, IRA_PHASEOUT_ROUNDING)
+        self.ira_phaseout_end = index_amount(IRA_PHASEOUT_END, self.price_index, IRA_PHASEOUT_ROUNDING)
+        
+        # (year x bracket) federal thresholds
+        brackets = TAX_BRACKETS_FEDERAL[filing_status]
+        rates = [rate for _, rate in brackets]
+        self.federal_thresholds = index_amount(
+            np.array([threshold for threshold, _ in brackets], dtype=float),
+            self.price_index[:, None],
+            BRACKET_ROUNDING[filing_status]
+        )
+        self.ny = COMPILED_TAX_BRACKETS_NY[filing_status]
+        self.federal = [TaxTable(list(zip(thresholds, rates))) for thresholds in self.federal_thresholds.tolist()]
+        self.schedules = [TaxSchedule([federal, self.ny]) for federal in self.federal]
+
+    def tax(self, year, income):
+        """Federal and NY tax on a single income in the given projection year"""
+        return self.federal[year].tax(income) + self.ny.tax(income)
+
+    def tax_array(self, year, incomes):
+        """Federal and NY tax on an array of incomes in the given projection year"""
+        return self.schedules[year].tax_array(incomes)
+
+_YEAR_TABLES = {}
+
+def year_tables(inflation_rate=INFLATION_RATE, filing_status="single", n_years=MIN_TABLE_YEARS):
+    """
+    YearTables for an inflation rate and filing status covering at least
+    n_years, built once per process and shared by every projection
+    """
+    key = (float(inflation_rate), filing_status)
+    tables = _YEAR_TABLES.get(key)
+    if tables is None or tables.n_years < n_years:
+        tables = YearTables(float(inflation_rate), filing_status, max(n_years, MIN_TABLE_YEARS))
+        _YEAR_TABLES[key] = tables
+    return tables
+
+class IndexedTaxTables:
+    """
+    Federal and NY tax with federal brackets indexed to one price level per
+    income. Thresholds are rounded per price level and the tax accumulated in
+    the same order as YearTables, so each income is taxed exactly as a
+    scalar projection at that price level would tax it. Built once per
+    projection year and evaluated for every tax owed that year.
+    """
+    def __init__(self, filing_status, price_index):
+        brackets = TAX_BRACKETS_FEDERAL[filing_status]
+        self.ny = COMPILED_TAX_BRACKETS_NY[filing_status]
+        self.price_index = np.asarray(price_index, dtype=float)
+        levels = self.price_index.reshape(-1)
+        # (bracket x price level) rows of every price level's TaxTable, one
+        # bracket at a time like TaxTable accumulates them
+        n_brackets = len(brackets)
+        self.upper = np.empty((n_brackets, len(levels)))
+        self.lower = np.zeros((n_brackets + 1, len(levels)))
+        self.cumulative = np.zeros((n_brackets + 1, len(levels)))
+        self.rates = np.array([rate for _, rate in brackets] + [0.0])
+        for j, (threshold, rate) in enumerate(brackets):
+            self.upper[j] = index_amount(threshold, levels, BRACKET_ROUNDING[filing_status])
+            self.lower[j + 1] = self.upper[j]
+            self.cumulative[j + 1] = self.cumulative[j] + (self.upper[j] - self.lower[j]) * rate
+
+    def tax_array(self, incomes):
+        """Tax on incomes, one per price level (or any number with a single price level)"""
+        incomes = np.asarray(incomes, dtype=float)
+        if self.price_index.ndim == 0:
+            shape = incomes.shape
+            incomes = incomes.reshape(-1)
+            column = 0
+        else:
+            incomes = np.broadcast_to(incomes, self.price_index.shape)
+            shape = incomes.shape
+            column = np.arange(incomes.size)
+        # searchsorted(side='left') of every price level at once, as flat
+        # positions into the (bracket x price level) rows
+        bracket = (self.upper < incomes).sum(axis=0)
+        i = bracket * self.upper.shape[1] + column
+        federal = self.cumulative.reshape(-1)[i] + (incomes - self.lower.reshape(-1)[i]) * self.rates[bracket]
+        federal = np.where(incomes > 0, federal, 0.0).reshape(shape)
+        return federal + self.ny.tax_array(incomes.reshape(shape))
+
+def indexed_tax_array(incomes, filing_status, price_index):
+    """
+    Federal and NY tax on an array of incomes, with federal brackets indexed
+    to each income's own price_index (one entry per income, or one for all)
+    """
+    return IndexedTaxTables(filing_status, price_index).tax_array(incomes)
 
 def estimate_tax_impact(income, filing_status="single"):
     """
@@ -326,13 +1500,20 @@ def estimate_tax_impact(income, filing_status="single"):
 
 def calculate_federal_tax(income, filing_status):
     """Calculate federal income tax based on income and filing status"""
-    brackets = TAX_BRACKETS_FEDERAL[filing_status]
-    return calculate_tax_from_brackets(income, brackets)
+    return COMPILED_TAX_BRACKETS_FEDERAL[filing_status].tax(income)
 
 def calculate_ny_tax(income, filing_status):
     """Calculate NY state income tax based on income and filing status"""
-    brackets = TAX_BRACKETS_NY[filing_status]
-    return calculate_tax_from_brackets(income, brackets)
+    return COMPILED_TAX_BRACKETS_NY[filing_status].tax(income)
+
+@timed()
+def estimate_tax_impact_array(incomes, filing_status="single"):
+    """Estimate federal and NY state taxes for an array of incomes"""
+    return COMPILED_TAX_SCHEDULES[filing_status].tax_array(incomes)
+
+def calculate_tax_from_brackets_array(incomes, brackets):
+    """Calculate tax for an array of incomes given tax brackets"""
+    return compile_tax_brackets(brackets).tax_array(incomes)
 
 def calculate_tax_from_brackets(income, brackets):
     """Calculate tax given income and tax brackets"""
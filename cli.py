@@ -0,0 +1,281 @@
+"""
+Headless retirement projections for a CSV file of household profiles.
+
+    python cli.py profiles.csv                        # one summary row per profile, CSV on stdout
+    python cli.py profiles.csv -o results.jsonl       # JSON lines, format taken from the extension
+    python cli.py profiles.csv -o years.csv --per-year  # every projected year of every profile
+    python cli.py profiles.csv --store                # reuse results of earlier runs from disk
+
+Input columns are the arguments of calculate_retirement_projections;
+monthly_expenses (default 0) and filing_status (default single) are optional,
+as is an id column used to label output rows. Profiles are read and
+projected in chunks, so memory use does not grow with the file size.
+Throughput is reported on stderr.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+from cache import get_result_store
+from calculations import (
+    FILING_STATUSES,
+    PROJECTION_COLUMNS,
+    PROJECTION_REQUIRED_INPUTS,
+    calculate_retirement_projections_batch
+)
+from solver import total_shortfall
+
+# Every profile row has a column per required projection input
+REQUIRED_COLUMNS = PROJECTION_REQUIRED_INPUTS
+OPTIONAL_COLUMNS = {'monthly_expenses': 0.0}
+
+# Profiles projected together in one batch
+DEFAULT_CHUNK_SIZE = 2000
+
+SUMMARY_COLUMNS = [
+    'id',
+    'filing_status',
+    'retirement_year',
+    'balance_at_retirement',
+    'final_age',
+    'final_balance',
+    'total_taxes_paid',
+    'total_shortfall',
+    'depletion_age'
+]
+SUMMARY_FIELDS = ['Age', 'Year', 'Total Balance', 'Taxes Paid', 'Retirement Shortfall']
+
+def parse_profile(row, line_number, id_column='id'):
+    """Convert one CSV row to projection inputs, raising ValueError on bad data"""
+    inputs = {}
+    for name in REQUIRED_COLUMNS:
+        value = (row.get(name) or '').strip()
+        if not value:
+            raise ValueError(f"line {line_number}: missing value for '{name}'")
+        inputs[name] = value
+    for name, default in OPTIONAL_COLUMNS.items():
+        inputs[name] = (row.get(name) or '').strip() or default
+    try:
+        inputs = {name: float(value) for name, value in inputs.items()}
+    except ValueError as e:
+        raise ValueError(f"line {line_number}: {e}") from None
+
+    filing_status = (row.get('filing_status') or '').strip().lower() or 'single'
+    if filing_status not in FILING_STATUSES:
+        raise ValueError(f"line {line_number}: unknown filing_status '{filing_status}'")
+    inputs['filing_status'] = filing_status
+
+    profile_id = (row.get(id_column) or '').strip() or str(line_number - 1)
+    return profile_id, inputs
+
+def read_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE, id_column='id'):
+    """Yield lists of (id, inputs) of at most chunk_size profiles"""
+    # Line 1 is the header
+    numbered = enumerate(rows, start=2)
+    while True:
+        chunk = [parse_profile(row, line_number, id_column)
+                 for line_number, row in islice(numbered, chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+
+def project_chunk(chunk, per_year=False):
+    """
+    Project a chunk of profiles, one batch per filing status, and yield
+    output rows in input order
+    """
+    fields = PROJECTION_COLUMNS if per_year else SUMMARY_FIELDS
+    results = [None] * len(chunk)
+
+    for filing_status in FILING_STATUSES:
+        positions = [i for i, (_, inputs) in enumerate(chunk) if inputs['filing_status'] == filing_status]
+        if not positions:
+            continue
+        batch_inputs = {
+            name: np.array([chunk[i][1][name] for i in positions])
+            for name in REQUIRED_COLUMNS + tuple(OPTIONAL_COLUMNS)
+        }
+        batch = calculate_retirement_projections_batch(
+            **batch_inputs, filing_status=filing_status, fields=fields
+        )
+        if per_year:
+            for j, i in enumerate(positions):
+                results[i] = _yearly_rows(chunk[i][0], filing_status, batch, j)
+        else:
+            for j, values in enumerate(_summary_values(batch_inputs, batch)):
+                i = positions[j]
+                results[i] = [[chunk[i][0], filing_status] + values]
+
+    for rows in results:
+        yield from rows
+
+def _summary_values(inputs, batch):
+    """Summary values, in SUMMARY_COLUMNS order after id and filing status, per scenario"""
+    scenarios = np.arange(len(batch))
+    n_years = batch.n_years
+    has_years = n_years > 0
+    last = np.maximum(n_years - 1, 0)
+    retirement_index = np.clip(inputs['retirement_age'] - inputs['current_age'], 0, last).astype(int)
+
+    balance = batch.field('Total Balance')
+    shortfall = np.nan_to_num(batch.field('Retirement Shortfall'))
+    in_horizon = np.arange(balance.shape[1]) < n_years[:, None]
+    short = (shortfall > 0) & in_horizon
+    ever_short = short.any(axis=1)
+
+    columns = np.column_stack([
+        np.where(has_years, batch.field('Year')[scenarios, retirement_index], np.nan),
+        np.where(has_years, balance[scenarios, retirement_index], np.nan),
+        np.where(has_years, batch.field('Age')[scenarios, last], np.nan),
+        np.where(has_years, balance[scenarios, last], np.nan),
+        (np.nan_to_num(batch.field('Taxes Paid')) * in_horizon).sum(axis=1),
+        total_shortfall(batch),
+        np.where(ever_short, inputs['current_age'] + np.argmax(short, axis=1), np.nan)
+    ])
+    for values in columns.tolist():
+        yield [_to_output(value) for value in values]
+
+# Columns written as whole numbers in per-year output
+_INTEGER_FIELDS = [PROJECTION_COLUMNS.index(name) for name in ('Age', 'Year')]
+
+def _yearly_rows(profile_id, filing_status, batch, scenario):
+    """
+    One row per projected year of one scenario; values are already rounded
+    to cents, and fields the engine leaves unset (NaN) are written as missing
+    """
+    rows = batch.data[:, :int(batch.n_years[scenario]), scenario].T.tolist()
+    for row in rows:
+        for k in _INTEGER_FIELDS:
+            row[k] = int(row[k])
+    return [[profile_id, filing_status] + [None if value != value else value for value in row]
+            for row in rows]
+
+def _to_output(value):
+    """Plain Python number for writing, None for missing values"""
+    if math.isnan(value):
+        return None
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    return round(value, 2)
+
+class CSVWriter:
+    def __init__(self, stream, columns):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(columns)
+
+    def write_rows(self, rows):
+        # csv writes None as an empty field
+        self.writer.writerows(rows)
+
+class JSONLWriter:
+    def __init__(self, stream, columns):
+        self.stream = stream
+        self.columns = columns
+
+    def write_rows(self, rows):
+        columns = self.columns
+        self.stream.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+WRITERS = {'csv': CSVWriter, 'jsonl': JSONLWriter}
+
+def output_format(path, requested=None):
+    """Output format from an explicit choice or the output file extension"""
+    if requested:
+        return requested
+    if path and path.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+def _chunk_key(chunk, per_year):
+    """Result store key of a chunk's output: its ids and inputs column by column"""
+    columns = {name: [inputs[name] for _, inputs in chunk] for name in chunk[0][1]}
+    return ('cli_chunk', per_year, [profile_id for profile_id, _ in chunk], columns)
+
+def run(input_stream, output_stream, fmt='csv', per_year=False,
+        chunk_size=DEFAULT_CHUNK_SIZE, id_column='id', progress=None, store=None):
+    """
+    Project every profile in input_stream and write the results to
+    output_stream. Returns the number of profiles processed.
+    With a ResultStore, the rows of each chunk are stored and a chunk seen
+    before (same profiles, same engine) is not projected again.
+    """
+    reader = csv.DictReader(input_stream)
+    missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"input is missing columns: {', '.join(missing)}")
+
+    columns = ['id', 'filing_status'] + list(PROJECTION_COLUMNS) if per_year else SUMMARY_COLUMNS
+    writer = WRITERS[fmt](output_stream, columns)
+
+    n_profiles = 0
+    for chunk in read_chunks(reader, chunk_size, id_column):
+        if store is None:
+            writer.write_rows(project_chunk(chunk, per_year))
+        else:
+            writer.write_rows(store.get_or_compute(
+                _chunk_key(chunk, per_year), lambda: list(project_chunk(chunk, per_year))
+            ))
+        output_stream.flush()
+        n_profiles += len(chunk)
+        if progress is not None:
+            progress(n_profiles)
+    return n_profiles
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project retirement savings for a CSV of household profiles")
+    parser.add_argument('input', help="CSV of profiles, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file, or - for stdout (default)")
+    parser.add_argument('--format', choices=sorted(WRITERS),
+                        help="output format (default: from the output extension, else csv)")
+    parser.add_argument('--per-year', action='store_true',
+                        help="write every projected year instead of one summary row per profile")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="profiles projected per batch")
+    parser.add_argument('--id-column', default='id', help="input column used to label output rows")
+    parser.add_argument('--store', action='store_true',
+                        help="reuse and keep results in the on-disk result store (RETIREMENT_RESULT_STORE)")
+    parser.add_argument('--quiet', action='store_true', help="do not report progress on stderr")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    store = None
+    if args.store:
+        store = get_result_store()
+        if store is None:
+            print("error: the result store is turned off or cannot be opened", file=sys.stderr)
+            return 2
+
+    fmt = output_format(None if args.output == '-' else args.output, args.format)
+    input_stream = sys.stdin if args.input == '-' else open(args.input, newline='')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+
+    start = time.perf_counter()
+    def report(n_profiles, end="\r"):
+        elapsed = time.perf_counter() - start
+        rate = n_profiles / elapsed if elapsed > 0 else 0.0
+        print(f"{n_profiles} profiles in {elapsed:.2f} s ({rate:,.0f} profiles/s)", end=end, file=sys.stderr)
+
+    try:
+        n_profiles = run(input_stream, output_stream, fmt, args.per_year, args.chunk_size,
+                         args.id_column, progress=None if args.quiet else report, store=store)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    if not args.quiet:
+        report(n_profiles, end="\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
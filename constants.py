@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 
 # Current year
@@ -8,9 +9,40 @@ CURRENT_401K_LIMIT = 23500  # 2025 limit
 CURRENT_HSA_LIMIT = 3300  # 2025 limit
 CURRENT_IRA_LIMIT = 7000  # 2025 limit
 
+# Increments the IRS rounds inflation-adjusted limits down to
+LIMIT_ROUNDING = {
+    "401k": 500,
+    "HSA": 50,
+    "IRA": 500
+}
+
+# Income range over which IRA contributions phase out (simplified)
+IRA_PHASEOUT_START = 150000
+IRA_PHASEOUT_END = 180000
+IRA_PHASEOUT_ROUNDING = 1000
+
 # Economic constants
 INFLATION_RATE = 0.02  # 2% annual inflation
 
+# In-process cache for projections and figures shared by all app sessions
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+# On-disk result store shared by app processes, the CLI and the service (see
+# cache.ResultStore); set the variable to an empty string to turn it off
+RESULT_STORE_PATH = os.environ.get(
+    "RETIREMENT_RESULT_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "results.sqlite")
+)
+RESULT_STORE_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# Historical returns dataset for simulations (see historical.py); none ships
+# with the app, so convert one into this directory or point the variable elsewhere
+HISTORICAL_DATA_DIR = os.environ.get(
+    "RETIREMENT_HISTORICAL_DATA",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "historical")
+)
+
 # Tax brackets for 2023 (simplified)
 # Format: (threshold, rate)
 TAX_BRACKETS_FEDERAL = {
@@ -34,7 +66,13 @@ TAX_BRACKETS_FEDERAL = {
     ]
 }
 
-# NY State tax brackets (simplified)
+# Increments inflation-adjusted federal bracket thresholds are rounded down to
+BRACKET_ROUNDING = {
+    "single": 25,
+    "married": 50
+}
+
+# NY State tax brackets (simplified); NY does not index them for inflation
 TAX_BRACKETS_NY = {
     "single": [
         (0, 0.04),
@@ -0,0 +1,124 @@
+"""
+Asset-allocation glide paths: the stock/bond/cash mix held at each point
+relative to retirement, and the investment returns it earns.
+
+A GlidePath is a list of breakpoints, each a number of years to retirement
+(negative once retired) and the mix held then; the mix is interpolated
+linearly between breakpoints and held flat beyond the first and last.
+portfolio_returns combines the mix of every year with per-asset returns in
+a single einsum, whether those are fixed rates (the deterministic
+projection) or (path x year) draws (Monte Carlo, historical resampling),
+so every engine earns returns the same way.
+
+Without a glide path the engines keep the original step-down: the base
+investment return cut by 5/10/15% as retirement nears and by a further 10%
+once retired.
+"""
+import numpy as np
+
+ASSET_CLASSES = ('stocks', 'bonds', 'cash')
+
+# Expected bond return when a glide path is used without one
+DEFAULT_BOND_RETURN = 0.04
+
+# Step-down without a glide path: share of the base return earned with more
+# than this many years to retirement, the floor after that and the extra cut
+# once retired
+STEP_DOWN = ((20, 1.0), (10, 0.95), (5, 0.90))
+STEP_DOWN_FLOOR = 0.85
+RETIREMENT_RETURN_CUT = 0.9
+
+# STEP_DOWN as a lookup table: searchsorted over the thresholds, lowest
+# first, indexes the multipliers
+_STEP_YEARS = np.array([years for years, _ in reversed(STEP_DOWN)])
+_STEP_MULTIPLIERS = np.array([STEP_DOWN_FLOOR] + [multiplier for _, multiplier in reversed(STEP_DOWN)])
+
+class GlidePath:
+    """Stock/bond/cash mix by years to retirement"""
+    def __init__(self, breakpoints):
+        """
+        breakpoints is a sequence of (years to retirement, (stocks, bonds, cash));
+        each mix is scaled to sum to one
+        """
+        rows = sorted((float(years), tuple(float(weight) for weight in mix)) for years, mix in breakpoints)
+        if not rows:
+            raise ValueError("a glide path needs at least one breakpoint")
+        for years, mix in rows:
+            if len(mix) != len(ASSET_CLASSES):
+                raise ValueError(f"each mix needs a weight for {', '.join(ASSET_CLASSES)}")
+            if min(mix) < 0 or sum(mix) <= 0:
+                raise ValueError(f"mix at {years:g} years to retirement must be non-negative and not all zero")
+        years = [years for years, _ in rows]
+        if len(set(years)) != len(years):
+            raise ValueError("glide path breakpoints must be at different years")
+
+        self.years = np.array(years)
+        mixes = np.array([mix for _, mix in rows])
+        self.mixes = mixes / mixes.sum(axis=1, keepdims=True)
+
+    @property
+    def breakpoints(self):
+        """Breakpoints as given, latest years to retirement first, with normalized mixes"""
+        return tuple(
+            (float(years), tuple(float(weight) for weight in mix))
+            for years, mix in zip(self.years[::-1], self.mixes[::-1])
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, GlidePath) and self.breakpoints == other.breakpoints
+
+    def __hash__(self):
+        return hash(self.breakpoints)
+
+    def __repr__(self):
+        return f"GlidePath({list(self.breakpoints)!r})"
+
+    def weights(self, years_to_retirement):
+        """Mix held with years_to_retirement to go, as an (asset x ...) array"""
+        years = np.asarray(years_to_retirement, dtype=float)
+        return np.stack([np.interp(years, self.years, self.mixes[:, i]) for i in range(len(ASSET_CLASSES))])
+
+def target_date_glide_path(stocks_early=0.9, stocks_at_retirement=0.5, stocks_late=0.3,
+                           glide_years=25, landing_years=7, cash_late=0.1):
+    """
+    Target-date style glide path: stocks_early until glide_years before
+    retirement, falling to stocks_at_retirement at retirement and to
+    stocks_late landing_years after it, the rest in bonds with cash building
+    up to cash_late over the same years
+    """
+    return GlidePath([
+        (glide_years, (stocks_early, 1 - stocks_early, 0.0)),
+        (0, (stocks_at_retirement, 1 - stocks_at_retirement - cash_late / 2, cash_late / 2)),
+        (-landing_years, (stocks_late, 1 - stocks_late - cash_late, cash_late))
+    ])
+
+def asset_returns(stocks, bonds, cash):
+    """Per-asset returns broadcast against each other, stacked as (asset x ...)"""
+    rates = [np.asarray(rate, dtype=float) for rate in (stocks, bonds, cash)]
+    return np.stack(np.broadcast_arrays(*rates))
+
+def portfolio_returns(weights, returns):
+    """
+    Return earned by each mix in weights (asset x ...) on returns
+    (asset x ...); the other dimensions broadcast, e.g. (asset x year x 1)
+    mixes and (asset x year x path) returns give (year x path) portfolio
+    returns. Assets come first so each one's rates stay contiguous.
+    """
+    return np.einsum('a...,a...->...', weights, returns)
+
+def step_down_multipliers(years_to_retirement):
+    """Share of the base return earned with years_to_retirement to go, before retirement's cut"""
+    return _STEP_MULTIPLIERS[np.searchsorted(_STEP_YEARS, years_to_retirement)]
+
+def investment_returns(years_to_retirement, stock_return, bond_return=DEFAULT_BOND_RETURN,
+                       cash_return=0.0, glide_path=None):
+    """
+    Return of the investment accounts with years_to_retirement to go: the
+    glide path's mix earning the three asset returns, or without one the
+    step-down of stock_return. Rates broadcast against the years.
+    """
+    years = np.asarray(years_to_retirement, dtype=float)
+    if glide_path is None:
+        cut = np.where(years <= 0, RETIREMENT_RETURN_CUT, 1.0)
+        return stock_return * step_down_multipliers(years) * cut
+    return portfolio_returns(glide_path.weights(years), asset_returns(stock_return, bond_return, cash_return))
@@ -0,0 +1,173 @@
+"""
+Historical asset returns and inflation for simulations.
+
+A dataset is a directory with one .npy file per column (year, stocks, bonds,
+cash, inflation) and a metadata.json recording whether rows are years or
+months. Columns are memory-mapped, so every simulation, and every worker
+process, reads the same pages instead of holding its own copy.
+
+No dataset ships with the app. Convert a CSV of decimal rates with one row
+per year or month, e.g. S&P 500 total return, 10-year Treasury, T-bill and
+CPI series:
+
+    python historical.py convert returns.csv data/historical
+    python historical.py convert monthly.csv data/historical --periods-per-year 12 --percent
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+from constants import HISTORICAL_DATA_DIR
+
+COLUMNS = ('year', 'stocks', 'bonds', 'cash', 'inflation')
+RATE_COLUMNS = COLUMNS[1:]
+METADATA_FILE = 'metadata.json'
+
+# Blocks keep runs of consecutive history together, so bad years still
+# cluster the way they did (sequence-of-returns risk)
+DEFAULT_BLOCK_YEARS = 5
+DEFAULT_STOCK_ALLOCATION = 0.6
+
+class HistoricalReturns:
+    """A memory-mapped historical returns dataset"""
+    def __init__(self, path):
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        self.path = path
+        self.periods_per_year = int(metadata['periods_per_year'])
+        self._annual = {}  # compounded yearly rates of monthly columns, built on first use
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in COLUMNS
+        }
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"columns of {path} have different lengths")
+        if len(self) < self.periods_per_year:
+            raise ValueError(f"{path} holds less than one year of data")
+
+    def __len__(self):
+        return len(self.columns['year'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __reduce__(self):
+        # Worker processes reopen the files rather than receiving a pickled copy
+        return (load_historical_returns, (self.path,))
+
+    def annual_rates(self, name):
+        """
+        Rate of a column compounded over the year starting at each row,
+        wrapping around the end; the column itself for annual data
+        """
+        if self.periods_per_year == 1:
+            return self.columns[name]
+        if name not in self._annual:
+            rows = (np.arange(len(self))[:, None] + np.arange(self.periods_per_year)) % len(self)
+            self._annual[name] = np.prod(1 + self.columns[name][rows], axis=1) - 1
+        return self._annual[name]
+
+    def block_bootstrap(self, rng, n_paths, n_years, block_years=DEFAULT_BLOCK_YEARS):
+        """
+        Resample annual rates for each path and year with a circular block
+        bootstrap: each path strings together blocks of block_years
+        consecutive years of history, starting at random rows (any month for
+        monthly data) and wrapping around the end.
+
+        Returns a dict of (path x year) views of year-major arrays, one per
+        rate column, like monte_carlo.simulate_annual_rates.
+        """
+        block_length = max(int(round(block_years)), 1)
+        n_blocks = -(-n_years // block_length)
+
+        starts = rng.integers(0, len(self), size=(n_blocks, 1, n_paths), dtype=np.int64)
+        offsets = self.periods_per_year * np.arange(block_length)[:, None]
+        rows = ((starts + offsets) % len(self)).reshape(n_blocks * block_length, n_paths)[:n_years]
+        return {name: self.annual_rates(name)[rows].T for name in RATE_COLUMNS}
+
+@lru_cache(maxsize=None)
+def load_historical_returns(path=HISTORICAL_DATA_DIR):
+    """Open the dataset at path once per process"""
+    return HistoricalReturns(path)
+
+def dataset_fingerprint(path=HISTORICAL_DATA_DIR):
+    """
+    Size and modification time of every file of the dataset at path, for
+    cache keys of results computed from it; None if there is no dataset
+    """
+    try:
+        return tuple(
+            (name, stat.st_size, stat.st_mtime_ns)
+            for name in (METADATA_FILE,) + tuple(f"{column}.npy" for column in COLUMNS)
+            for stat in (os.stat(os.path.join(path, name)),)
+        )
+    except FileNotFoundError:
+        return None
+
+def bootstrap_rates(historical, rng, n_paths, n_years, stock_allocation=DEFAULT_STOCK_ALLOCATION,
+                    block_years=DEFAULT_BLOCK_YEARS):
+    """
+    Resampled (path x year) investment returns, savings APYs and inflation
+    rates. Investments are a stock/bond mix rebalanced every year; savings
+    earn the cash rate, never below zero. stock_allocation None returns the
+    stock and bond returns separately instead of the mix, e.g. for a glide
+    path: (stocks, bonds, cash, inflation).
+    """
+    sampled = historical.block_bootstrap(rng, n_paths, n_years, block_years)
+    cash = np.maximum(sampled['cash'], 0.0)
+    if stock_allocation is None:
+        return sampled['stocks'], sampled['bonds'], cash, sampled['inflation']
+    returns = stock_allocation * sampled['stocks'] + (1 - stock_allocation) * sampled['bonds']
+    return returns, cash, sampled['inflation']
+
+def write_dataset(path, year, stocks, bonds, cash, inflation, periods_per_year=1):
+    """Store columns as a dataset directory at path"""
+    columns = dict(year=year, stocks=stocks, bonds=bonds, cash=cash, inflation=inflation)
+    columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+    if len({len(values) for values in columns.values()}) != 1:
+        raise ValueError("all columns must have the same length")
+    os.makedirs(path, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), values)
+    with open(os.path.join(path, METADATA_FILE), 'w') as f:
+        json.dump({'periods_per_year': periods_per_year, 'columns': list(COLUMNS), 'rows': len(columns['year'])}, f)
+    load_historical_returns.cache_clear()
+
+def read_csv(stream, percent=False):
+    """Columns of a CSV with a header naming COLUMNS, as float arrays"""
+    reader = csv.DictReader(stream)
+    missing = [name for name in COLUMNS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"input is missing columns: {', '.join(missing)}")
+    rows = [[float(row[name]) for name in COLUMNS] for row in reader]
+    values = np.array(rows, dtype=float).reshape(-1, len(COLUMNS))
+    if percent:
+        values[:, 1:] /= 100
+    return {name: values[:, i] for i, name in enumerate(COLUMNS)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage historical return datasets")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="convert a CSV into a dataset directory")
+    convert.add_argument('input', help="CSV with columns " + ", ".join(COLUMNS))
+    convert.add_argument('output', nargs='?', default=HISTORICAL_DATA_DIR, help="dataset directory")
+    convert.add_argument('--periods-per-year', type=int, default=1, help="12 for monthly rows")
+    convert.add_argument('--percent', action='store_true', help="rates are in percent rather than decimals")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.input, newline='') as f:
+            columns = read_csv(f, args.percent)
+        write_dataset(args.output, **columns, periods_per_year=args.periods_per_year)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"wrote {len(columns['year'])} rows to {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
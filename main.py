@@ -1,28 +1,50 @@
-import streamlit as st
+import os
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
+import streamlit as st
+from contextlib import nullcontext
 from datetime import datetime
 
 from calculations import (
-    calculate_retirement_projections,
+    IncrementalProjection,
     calculate_years_to_retirement,
     calculate_total_current_savings
 )
 from visualizations import (
     create_retirement_projection_chart,
     create_allocation_pie_chart,
-    create_savings_milestone_chart
+    create_savings_milestone_chart,
+    create_tax_impact_chart,
+    create_sensitivity_tornado_chart,
+    create_percentile_fan_chart,
+    create_roth_conversion_chart,
+    create_glide_path_chart,
+    create_scenario_comparison_chart
+)
+from glide_path import DEFAULT_BOND_RETURN, GlidePath, target_date_glide_path
+from sensitivity import run_sensitivity_analysis
+from scenarios import (
+    COMPARISON_FIELDS,
+    ScenarioWorkspace,
+    scenario_curves,
+    scenario_differences,
+    scenario_summary
 )
+from historical import dataset_fingerprint
+from monte_carlo import run_monte_carlo_simulation
+from roth_conversion import DEFAULT_TERMINAL_TAX_RATE, optimize_roth_conversions
+from withdrawals import search_withdrawal_strategies, withdrawal_strategies
+from cache import cached_projection, cached_figure, get_app_cache, get_result_store
 from constants import (
     CURRENT_YEAR,
     CURRENT_401K_LIMIT,
     CURRENT_IRA_LIMIT,
     CURRENT_HSA_LIMIT,
+    HISTORICAL_DATA_DIR,
     INFLATION_RATE
 )
-from styles import apply_custom_styles
+from styles import apply_custom_styles, projection_table_column_config
+import profiling
+from profiling import span
 
 # Set page config
 st.set_page_config(
@@ -65,6 +87,32 @@ with st.sidebar.expander("Income & Growth", expanded=True):
     annual_merit_increase = st.number_input("Annual Merit Increase (%)", min_value=0.0, max_value=25.0, value=3.25, format="%.2f")
     investment_return = st.number_input("Annual Investment Return (%)", min_value=0.0, max_value=30.0, value=6.0, format="%.2f")
     savings_apy = st.number_input("Current APY on Savings (%)", min_value=0.0, max_value=20.0, value=3.8, format="%.2f")
+    
+    allocation = st.selectbox(
+        "Asset Allocation",
+        ["Step down toward retirement", "Target-date glide path", "Custom glide path"],
+        help="How the retirement accounts are invested as retirement approaches"
+    )
+    glide_path = None
+    bond_return = DEFAULT_BOND_RETURN * 100
+    if allocation != "Step down toward retirement":
+        st.caption("With a glide path the investment return above is earned on stocks; cash earns the savings APY.")
+        bond_return = st.number_input("Annual Bond Return (%)", min_value=0.0, max_value=20.0, value=bond_return, format="%.2f")
+        glide_path = target_date_glide_path()
+        if allocation == "Custom glide path":
+            breakpoints = st.data_editor(
+                pd.DataFrame(
+                    [(years, *(100 * weight for weight in mix)) for years, mix in glide_path.breakpoints],
+                    columns=["Years to Retirement", "Stocks (%)", "Bonds (%)", "Cash (%)"]
+                ),
+                num_rows="dynamic",
+                hide_index=True
+            ).dropna()
+            st.caption("Negative years are after retirement; the mix changes linearly between rows.")
+            try:
+                glide_path = GlidePath([(row[0], row[1:]) for row in breakpoints.itertuples(index=False)])
+            except ValueError as e:
+                st.error(f"Using the target-date glide path: {e}")
 
 # Contribution settings
 with st.sidebar.expander("Contributions", expanded=True):
@@ -76,219 +124,463 @@ with st.sidebar.expander("Contributions", expanded=True):
     st.markdown(f"**IRA Annual Limit: ${CURRENT_IRA_LIMIT:,.0f}**")
     annual_ira_contribution = st.number_input("Annual IRA Contribution", min_value=0.0, max_value=float(CURRENT_IRA_LIMIT), value=0.0, format="%.2f")
 
-# Main dashboard content
-total_current_savings = calculate_total_current_savings(
-    current_savings, current_trad_ira, current_trad_401k
-)
+# Retirement spending
+with st.sidebar.expander("Retirement Spending", expanded=False):
+    retirement_monthly_expenses = None
+    if st.checkbox("Different monthly expenses in retirement"):
+        retirement_monthly_expenses = st.number_input("Monthly Expenses in Retirement (today's dollars)", min_value=0.0, value=monthly_expenses, format="%.2f")
+    strategies = withdrawal_strategies("single")
+    withdrawal_strategy = st.selectbox(
+        "Withdrawal Strategy", list(strategies),
+        help="Which accounts retirement spending is drawn from first"
+    )
 
-# Current financial snapshot
-st.header("Current Financial Snapshot")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Total Current Savings", f"${total_current_savings:,.0f}")
-with col2:
-    annual_expenses = monthly_expenses * 12
-    st.metric("Annual Expenses", f"${annual_expenses:,.0f}")
-with col3:
-    annual_total_income = annual_salary
-    st.metric("Annual Income", f"${annual_total_income:,.0f}")
-
-# Retirement projections
-st.header("Retirement Projections")
-
-# Add tax and expenses tab
-projection_tabs = st.tabs(["Growth Projections", "Tax & Expense Impact"])
-
-with projection_tabs[0]:
-    # Calculate projections
-    projection_data = calculate_retirement_projections(
-    current_age=current_age,
-    retirement_age=retirement_age,
-    current_savings=current_savings,
-    current_trad_ira=current_trad_ira,
-    current_trad_401k=current_trad_401k,
-    annual_salary=annual_salary,
-    annual_merit_increase=annual_merit_increase/100,
-    investment_return=investment_return/100,
-    savings_apy=savings_apy/100,
-    roth_401k_percent=roth_401k_percent/100,
-    trad_401k_percent=trad_401k_percent/100,
-    employer_401k_match=employer_401k_match/100,
-    annual_ira_contribution=annual_ira_contribution,
-    monthly_expenses=monthly_expenses,
-    filing_status="single"
-)
+# Timing of this rerun's phases, shown at the bottom of the sidebar
+debug_panel = st.sidebar.expander("Debug", expanded=False)
+record_timings = debug_panel.checkbox("Record phase timings")
 
-# Display projection chart
-    st.plotly_chart(create_retirement_projection_chart(projection_data), use_container_width=True)
+# Spans recorded while rendering the page; recording stops even when a rerun
+# or an error cuts the script short
+with profiling.recording() if record_timings else nullcontext() as profile:
+    # Main dashboard content
+    total_current_savings = calculate_total_current_savings(
+        current_savings, current_trad_ira, current_trad_401k
+    )
 
-with projection_tabs[1]:
-    # Create a dataframe for tax and expense visualization
-    retirement_year = projection_data[projection_data['Age'] == retirement_age].index[0]
-    
-    # Tax impact chart
-    if 'Taxes Paid' in projection_data.columns:
-        tax_fig = go.Figure()
-        
-        tax_fig.add_trace(go.Bar(
-            x=projection_data['Year'],
-            y=projection_data['Taxes Paid'],
-            name='Taxes Paid',
-            marker_color='#FF5252'
-        ))
-        
-        # Add annual expenses line
-        tax_fig.add_trace(go.Scatter(
-            x=projection_data['Year'],
-            y=projection_data['Annual Expenses'],
-            name='Annual Expenses',
-            line=dict(color='#FFB74D', width=2, dash='dot')
-        ))
-        
-        # Add vertical line at retirement
-        tax_fig.add_vline(
-            x=projection_data.loc[retirement_year, 'Year'],
-            line_width=2,
-            line_dash="dash",
-            line_color="#2E5E82",
-            annotation_text="Retirement"
-        )
-        
-        tax_fig.update_layout(
-            title='Tax Impact and Expenses Over Time',
-            xaxis_title='Year',
-            yaxis_title='Amount ($)',
-            barmode='stack',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            plot_bgcolor='#F5F7FA',
-            paper_bgcolor='#F5F7FA',
-            yaxis=dict(gridcolor='#E0E0E0', tickformat='$,.0f', title_font=dict(color='#333333'), tickfont=dict(color='#333333')),
-            xaxis=dict(title_font=dict(color='#333333'), tickfont=dict(color='#333333')),
-            title_font=dict(color='#333333'),
-            legend_font=dict(color='#333333'),
-            font=dict(color='#333333'),
-            height=500
-        )
-        
-        st.plotly_chart(tax_fig, use_container_width=True)
-        
-        # Show tax efficiency metrics
-        tax_metrics_cols = st.columns(3)
-        
-        with tax_metrics_cols[0]:
-            pre_retirement_taxes = projection_data.loc[:retirement_year, 'Taxes Paid'].sum()
-            st.metric("Pre-Retirement Tax Total", f"${pre_retirement_taxes:,.0f}")
-            
-        with tax_metrics_cols[1]:
-            post_retirement_taxes = projection_data.loc[retirement_year+1:, 'Taxes Paid'].sum()
-            st.metric("Post-Retirement Tax Total", f"${post_retirement_taxes:,.0f}")
-            
-        with tax_metrics_cols[2]:
-            total_taxes = projection_data['Taxes Paid'].sum()
-            st.metric("Lifetime Tax Estimate", f"${total_taxes:,.0f}")
-        
-        st.info("""
+    # Current financial snapshot
+    st.header("Current Financial Snapshot")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Current Savings", f"${total_current_savings:,.0f}")
+    with col2:
+        annual_expenses = monthly_expenses * 12
+        st.metric("Annual Expenses", f"${annual_expenses:,.0f}")
+    with col3:
+        annual_total_income = annual_salary
+        st.metric("Annual Income", f"${annual_total_income:,.0f}")
+
+    # Retirement projections
+    st.header("Retirement Projections")
+
+    # Add tax and expenses tab. Switching tabs reruns the page and only the open
+    # tab does its work, so the Roth optimizer, sensitivity analysis, Monte
+    # Carlo and scenario comparison run only when someone looks at them.
+    projection_tabs = st.tabs(
+        ["Growth Projections", "Tax & Expense Impact", "Sensitivity", "Market Uncertainty", "Compare Scenarios"],
+        key="projection_tab",
+        on_change="rerun"
+    )
+    # Widgets in closed tabs are not drawn; reassigning their values keeps
+    # them from being reset while another tab is open
+    for widget_key in ("use_history", "scenario_baseline", "scenario_field"):
+        if widget_key in st.session_state:
+            st.session_state[widget_key] = st.session_state[widget_key]
+
+    # Inputs that determine the projection; also the cache key for it and its charts
+    projection_inputs = dict(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase/100,
+        investment_return=investment_return/100,
+        savings_apy=savings_apy/100,
+        roth_401k_percent=roth_401k_percent/100,
+        trad_401k_percent=trad_401k_percent/100,
+        employer_401k_match=employer_401k_match/100,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        filing_status="single",
+        retirement_monthly_expenses=retirement_monthly_expenses,
+        **strategies[withdrawal_strategy],
+        glide_path=glide_path,
+        bond_return=bond_return/100
+    )
+
+    # Each session keeps its last projection, so an edit only recomputes the years
+    # it can affect (e.g. retirement spending leaves the working years alone)
+    if 'projector' not in st.session_state:
+        st.session_state.projector = IncrementalProjection()
+
+    # Calculate projections (served from the shared cache when inputs are unchanged)
+    with span("main.projection"):
+        projection_data = cached_projection(st.session_state.projector.project, projection_inputs)
+
+    with projection_tabs[0]:
+        # Display projection chart
+        with span("main.figure.retirement_projection"):
+            figure = cached_figure(
+                'retirement_projection', projection_inputs,
+                lambda: create_retirement_projection_chart(projection_data)
+            )
+        with span("main.render.retirement_projection"):
+            st.plotly_chart(figure, use_container_width=True)
+
+        if glide_path is not None:
+            with span("main.figure.glide_path"):
+                figure = cached_figure(
+                    'glide_path', projection_inputs,
+                    lambda: create_glide_path_chart(glide_path, current_age, retirement_age)
+                )
+            with span("main.render.glide_path"):
+                st.plotly_chart(figure, use_container_width=True)
+
+    with projection_tabs[1]:
+        if projection_tabs[1].open:
+            # Row of the first retirement year
+            retirement_year = projection_data.retirement_index
+
+            # Tax impact chart
+            if 'Taxes Paid' in projection_data.columns:
+                with span("main.figure.tax_impact"):
+                    figure = cached_figure(
+                        'tax_impact', projection_inputs,
+                        lambda: create_tax_impact_chart(projection_data, retirement_year)
+                    )
+                with span("main.render.tax_impact"):
+                    st.plotly_chart(figure, use_container_width=True)
+
+                # Show tax efficiency metrics
+                tax_metrics_cols = st.columns(3)
+
+                with tax_metrics_cols[0]:
+                    pre_retirement_taxes = projection_data.total('Taxes Paid', stop=retirement_year + 1)
+                    st.metric("Pre-Retirement Tax Total", f"${pre_retirement_taxes:,.0f}")
+
+                with tax_metrics_cols[1]:
+                    post_retirement_taxes = projection_data.total('Taxes Paid', start=retirement_year + 1)
+                    st.metric("Post-Retirement Tax Total", f"${post_retirement_taxes:,.0f}")
+
+                with tax_metrics_cols[2]:
+                    total_taxes = projection_data.total('Taxes Paid')
+                    st.metric("Lifetime Tax Estimate", f"${total_taxes:,.0f}")
+
+                st.info("""
         **Tax Efficiency Tips:**
         - Consider tax-diversification strategies (mix of pre-tax and Roth accounts)
         - In high-income years, prioritize pre-tax contributions
         - In lower-income years, prioritize Roth contributions
         - Consider Roth conversions during low-income years after retirement
         """)
-    else:
-        st.warning("Tax data is not available in the projections.")
-
-# Current allocation
-st.subheader("Current Retirement Allocation")
-current_allocation = {
-    "High-Yield Savings": current_savings,
-    "Traditional IRA": current_trad_ira,
-    "Traditional 401k": current_trad_401k
-}
-st.plotly_chart(create_allocation_pie_chart(current_allocation), use_container_width=True)
-
-# Detailed projections table
-st.header("Detailed Projection Table")
-
-# Format numeric columns with commas
-formatted_projection_data = projection_data.copy()
-numeric_columns = formatted_projection_data.select_dtypes(include=['float64', 'int64']).columns
-for col in numeric_columns:
-    # Skip Age and Year columns for dollar sign formatting
-    if col not in ['Age', 'Year']:
-        formatted_projection_data[col] = formatted_projection_data[col].map(lambda x: f"${x:,.0f}" if pd.notnull(x) else x)
-
-st.dataframe(formatted_projection_data)
-
-# Insights and recommendations
-st.header("Insights & Recommendations")
-
-# Calculate some basic insights
-current_year = datetime.now().year
-retirement_year = current_year + years_to_retirement
-final_balance = projection_data.iloc[-1]['Total Balance']
-monthly_retirement_income = final_balance * 0.04 / 12  # 4% withdrawal rate
-
-insights_col1, insights_col2 = st.columns(2)
-
-with insights_col1:
-    st.subheader("Retirement Summary")
-    st.markdown(f"* **Retirement Year:** {retirement_year}")
-    
-    # Get both inflation-adjusted and nominal values for comparison
-    years_in_projection = len(projection_data) - 1
-    inflation_adjusted_balance = final_balance / ((1 + INFLATION_RATE) ** years_in_projection)
-    
-    st.markdown(f"* **Projected Final Balance (Future Value):** ${final_balance:,.0f}")
-    st.markdown(f"* **Projected Final Balance (Present Value):** ${inflation_adjusted_balance:,.0f}")
-    st.markdown(f"* **Estimated Monthly Income:** ${monthly_retirement_income:,.0f}")
-    
-    # Calculate inflation-adjusted monthly income
-    inflation_adjusted_monthly_income = inflation_adjusted_balance * 0.04 / 12
-    st.markdown(f"* **Present Value of Monthly Income:** ${inflation_adjusted_monthly_income:,.0f}")
-    
-    # Calculate income ratio for use in the other column
-    income_ratio = monthly_retirement_income / projection_data.iloc[-1]['Monthly Expenses']
 
-with insights_col2:
-    st.subheader("Optimization Opportunities")
-    
-    # Contribution gap analysis
-    total_401k_percent = roth_401k_percent + trad_401k_percent
-    if total_401k_percent < employer_401k_match:
-        st.warning(f"You're not maximizing your employer match. Consider increasing your 401k contribution by at least {(employer_401k_match - total_401k_percent):.1f}%")
-    
-    # IRA recommendation
-    if annual_ira_contribution < CURRENT_IRA_LIMIT:
-        st.info(f"You can contribute up to ${CURRENT_IRA_LIMIT - annual_ira_contribution:,.0f} more to your IRA this year")
-    
-    # Savings rate analysis
-    annual_savings = (annual_salary * (roth_401k_percent + trad_401k_percent) / 100) + annual_ira_contribution
-    savings_rate = annual_savings / annual_salary * 100
-    if savings_rate < 15:
-        st.warning(f"Your current savings rate is {savings_rate:.1f}%. Financial experts often recommend saving at least 15% of income for retirement.")
-    else:
-        st.success(f"Your current savings rate is {savings_rate:.1f}%, which meets or exceeds expert recommendations.")
-    
-    # Tax efficiency analysis
-    if trad_401k_percent < roth_401k_percent and annual_salary > 100000:
-        st.info("Given your income level, you might benefit from increasing pre-tax (Traditional) contributions to reduce current tax burden.")
-    elif trad_401k_percent > roth_401k_percent and annual_salary < 80000:
-        st.info("At your income level, you might benefit from more Roth contributions for tax-free growth.")
-    
-    # Expense inflation awareness
-    retirement_year_expenses = projection_data.loc[projection_data['Age'] == retirement_age, 'Annual Expenses'].values[0]
-    st.info(f"Your current monthly expenses will grow to approximately ${retirement_year_expenses/12:,.0f} per month by retirement due to inflation.")
-    
-    # Show expense coverage ratio
-    if income_ratio >= 1:
-        st.success(f"Projected monthly income covers {income_ratio:.1f}x your future expenses")
-    else:
-        st.warning(f"Projected monthly income covers only {income_ratio:.1f}x your future expenses")
-
-# Footer
-st.markdown("---")
-st.markdown("""
+                # Conversion schedule that minimizes lifetime tax
+                roth_expander = st.expander("Roth Conversion Plan", key="roth_plan", on_change="rerun")
+                with roth_expander:
+                    if roth_expander.open:
+                        with span("main.roth_conversions"):
+                            roth_plan = cached_projection(optimize_roth_conversions, projection_inputs)
+                        with span("main.figure.roth_conversions"):
+                            figure = cached_figure(
+                                'roth_conversions', projection_inputs,
+                                lambda: create_roth_conversion_chart(roth_plan, CURRENT_YEAR + years_to_retirement)
+                            )
+                        with span("main.render.roth_conversions"):
+                            st.plotly_chart(figure, use_container_width=True)
+
+                        roth_cols = st.columns(3)
+                        with roth_cols[0]:
+                            st.metric("Total Converted", f"${roth_plan.total_converted:,.0f}")
+                        with roth_cols[1]:
+                            st.metric("Lifetime Tax with Conversions", f"${roth_plan.lifetime_tax:,.0f}")
+                        with roth_cols[2]:
+                            st.metric("Tax Saved", f"${roth_plan.tax_savings:,.0f}")
+                        st.caption(
+                            "Conversions are chosen to minimize lifetime federal and NY tax, discounted at your savings APY. "
+                            "Conversion taxes are assumed paid from savings, and any traditional balance left at the end "
+                            f"is taxed at {DEFAULT_TERMINAL_TAX_RATE:.0%}."
+                        )
+
+                # Every withdrawal strategy in one batched projection, best first
+                strategy_expander = st.expander("Withdrawal Strategies", key="withdrawal_strategies", on_change="rerun")
+                with strategy_expander:
+                    if strategy_expander.open:
+                        with span("main.withdrawal_search"):
+                            strategy_ranking = cached_projection(search_withdrawal_strategies, projection_inputs)
+                        with span("main.render.withdrawal_search"):
+                            st.dataframe(
+                                strategy_ranking[['Strategy', 'Depletion Age', 'Lifetime Tax', 'Final Balance']].head(10),
+                                column_config={
+                                    'Depletion Age': st.column_config.NumberColumn(format="%d"),
+                                    'Lifetime Tax': st.column_config.NumberColumn(format="$%.0f"),
+                                    'Final Balance': st.column_config.NumberColumn(format="$%.0f")
+                                },
+                                hide_index=True,
+                                use_container_width=True
+                            )
+                        st.caption(
+                            "Strategies are ranked by how long savings last (blank: they never run out), then by lifetime tax. "
+                            "Filling a bracket draws traditional accounts up to that taxable income every year and saves what spending does not need."
+                        )
+            else:
+                st.warning("Tax data is not available in the projections.")
+
+    with projection_tabs[2]:
+        if projection_tabs[2].open:
+            # All perturbed scenarios are evaluated in one batched projection
+            with span("main.sensitivity"):
+                sensitivity_data = cached_projection(run_sensitivity_analysis, projection_inputs)
+            with span("main.figure.sensitivity_tornado"):
+                figure = cached_figure(
+                    'sensitivity_tornado', projection_inputs,
+                    lambda: create_sensitivity_tornado_chart(sensitivity_data)
+                )
+            with span("main.render.sensitivity_tornado"):
+                st.plotly_chart(figure, use_container_width=True)
+            st.caption(
+                "Each input is moved down and up on its own while everything else stays fixed. "
+                "Rates move by a fixed number of percentage points; monthly expenses move by 10%."
+            )
+
+    with projection_tabs[3]:
+        if projection_tabs[3].open:
+            use_history = st.toggle(
+                "Resample historical returns",
+                key="use_history",
+                disabled=not os.path.isdir(HISTORICAL_DATA_DIR),
+                help=f"Needs a dataset converted with historical.py in {HISTORICAL_DATA_DIR}"
+            )
+
+            # Fixed seed so the bands do not move between reruns with the same inputs
+            monte_carlo_inputs = dict(projection_inputs, n_paths=5000, seed=0, keep_paths=True)
+            # Results from a dataset depend on its files, not just where they are
+            dataset = None
+            if use_history:
+                monte_carlo_inputs['historical'] = HISTORICAL_DATA_DIR
+                dataset = dataset_fingerprint(HISTORICAL_DATA_DIR)
+            with span("main.monte_carlo"):
+                monte_carlo = cached_projection(run_monte_carlo_simulation, monte_carlo_inputs, depends_on=dataset)
+            with span("main.figure.percentile_fan"):
+                figure = cached_figure(
+                    'percentile_fan', dict(monte_carlo_inputs, dataset=dataset),
+                    lambda: create_percentile_fan_chart(
+                        monte_carlo.years, monte_carlo.percentiles,
+                        sample_paths=monte_carlo.total_balance,
+                        retirement_year=CURRENT_YEAR + years_to_retirement
+                    )
+                )
+            with span("main.render.percentile_fan"):
+                st.plotly_chart(figure, use_container_width=True)
+
+            uncertainty_cols = st.columns(2)
+            with uncertainty_cols[0]:
+                st.metric("Chance of a Retirement Shortfall", f"{monte_carlo.probability_of_shortfall:.0%}")
+            with uncertainty_cols[1]:
+                depletion_age = monte_carlo.median_depletion_age
+                st.metric("Median Age Savings Run Out", "Never" if depletion_age is None else f"{depletion_age:.0f}")
+            if use_history:
+                mix = "your glide path" if glide_path is not None else "a 60/40 stock/bond mix"
+                market_description = ("5,000 simulated markets built from 5-year blocks of history, "
+                                      f"with {mix} and historical inflation. ")
+            else:
+                market_description = "5,000 simulated markets with returns varying around your assumptions. "
+            st.caption(
+                market_description +
+                "Bands show the 5th-95th and 25th-75th percentiles of total balance."
+            )
+
+    with projection_tabs[4]:
+        if projection_tabs[4].open:
+            # Saved scenarios live in the session; each run projects only the ones
+            # whose inputs changed, together in one batched call
+            if 'scenarios' not in st.session_state:
+                st.session_state.scenarios = ScenarioWorkspace()
+            workspace = st.session_state.scenarios
+
+            save_cols = st.columns([3, 1], vertical_alignment="bottom")
+            with save_cols[0]:
+                scenario_name = st.text_input(
+                    "Scenario Name", value=f"Scenario {len(workspace) + 1}",
+                    help="Saving under an existing name replaces that scenario"
+                )
+            with save_cols[1]:
+                if st.button("Save Current Inputs", use_container_width=True):
+                    try:
+                        workspace.save(scenario_name, projection_inputs)
+                    except ValueError as e:
+                        st.error(str(e))
+
+            if len(workspace) == 0:
+                st.info("Save the current inputs as a scenario, change them in the sidebar and save again to compare plans side by side.")
+            else:
+                with span("main.scenarios"):
+                    scenario_results = workspace.evaluate()
+                scenario_names = list(scenario_results)
+                compare_cols = st.columns(2)
+                with compare_cols[0]:
+                    baseline = st.selectbox("Baseline Scenario", scenario_names, key="scenario_baseline")
+                with compare_cols[1]:
+                    comparison_field = st.selectbox("Compare", COMPARISON_FIELDS, key="scenario_field")
+
+                with span("main.figure.scenario_comparison"):
+                    figure = cached_figure(
+                        'scenario_comparison',
+                        dict(scenarios=workspace.scenarios, baseline=baseline, field=comparison_field),
+                        lambda: create_scenario_comparison_chart(
+                            scenario_curves(scenario_results, comparison_field), baseline, comparison_field
+                        )
+                    )
+                with span("main.render.scenario_comparison"):
+                    st.plotly_chart(figure, use_container_width=True)
+
+                dollars = st.column_config.NumberColumn(format="$%.0f")
+                st.dataframe(
+                    scenario_summary(scenario_results),
+                    column_config={
+                        'Retirement Age': st.column_config.NumberColumn(format="%d"),
+                        'Balance at Retirement': dollars,
+                        'Final Balance': dollars,
+                        'Lifetime Tax': dollars,
+                        'Total Shortfall': dollars,
+                        'Depletion Age': st.column_config.NumberColumn(format="%d")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+                st.subheader("Year-by-Year Differences")
+                differences = scenario_differences(scenario_results, baseline, comparison_field).reset_index()
+                st.dataframe(
+                    differences,
+                    column_config={
+                        name: st.column_config.NumberColumn(format="%d" if name == 'Year' else "$%.0f")
+                        for name in differences.columns
+                    },
+                    hide_index=True
+                )
+                st.caption(
+                    f"Differences are each scenario's {comparison_field.lower()} minus {baseline}'s. "
+                    f"{len(workspace.last_computed)} of {len(workspace)} scenarios were projected on this run; "
+                    "the rest had unchanged inputs."
+                )
+
+                remove_cols = st.columns([3, 1], vertical_alignment="bottom")
+                with remove_cols[0]:
+                    to_remove = st.multiselect("Remove Scenarios", scenario_names)
+                with remove_cols[1]:
+                    if st.button("Remove", disabled=not to_remove, use_container_width=True):
+                        for name in to_remove:
+                            workspace.remove(name)
+                        st.rerun()
+
+    # Current allocation
+    st.subheader("Current Retirement Allocation")
+    current_allocation = {
+        "High-Yield Savings": current_savings,
+        "Traditional IRA": current_trad_ira,
+        "Traditional 401k": current_trad_401k
+    }
+    with span("main.figure.allocation"):
+        figure = cached_figure(
+            'allocation', current_allocation,
+            lambda: create_allocation_pie_chart(current_allocation)
+        )
+    with span("main.render.allocation"):
+        st.plotly_chart(figure, use_container_width=True)
+
+    # Detailed projections table
+    st.header("Detailed Projection Table")
+
+    # Show the numeric data directly; dollar formatting is declared per column
+    with span("main.render.table"):
+        st.dataframe(
+            projection_data.to_frame(),
+            column_config=projection_table_column_config(projection_data.columns)
+        )
+
+    # Insights and recommendations
+    st.header("Insights & Recommendations")
+
+    # Calculate some basic insights
+    current_year = datetime.now().year
+    retirement_year = current_year + years_to_retirement
+    final_balance = projection_data['Total Balance'][-1]
+    monthly_retirement_income = final_balance * 0.04 / 12  # 4% withdrawal rate
+
+    insights_col1, insights_col2 = st.columns(2)
+
+    with insights_col1:
+        st.subheader("Retirement Summary")
+        st.markdown(f"* **Retirement Year:** {retirement_year}")
+
+        # Get both inflation-adjusted and nominal values for comparison
+        years_in_projection = len(projection_data) - 1
+        inflation_adjusted_balance = final_balance / ((1 + INFLATION_RATE) ** years_in_projection)
+
+        st.markdown(f"* **Projected Final Balance (Future Value):** ${final_balance:,.0f}")
+        st.markdown(f"* **Projected Final Balance (Present Value):** ${inflation_adjusted_balance:,.0f}")
+        st.markdown(f"* **Estimated Monthly Income:** ${monthly_retirement_income:,.0f}")
+
+        # Calculate inflation-adjusted monthly income
+        inflation_adjusted_monthly_income = inflation_adjusted_balance * 0.04 / 12
+        st.markdown(f"* **Present Value of Monthly Income:** ${inflation_adjusted_monthly_income:,.0f}")
+
+        # Calculate income ratio for use in the other column
+        income_ratio = monthly_retirement_income / projection_data['Monthly Expenses'][-1]
+
+    with insights_col2:
+        st.subheader("Optimization Opportunities")
+
+        # Contribution gap analysis
+        total_401k_percent = roth_401k_percent + trad_401k_percent
+        if total_401k_percent < employer_401k_match:
+            st.warning(f"You're not maximizing your employer match. Consider increasing your 401k contribution by at least {(employer_401k_match - total_401k_percent):.1f}%")
+
+        # IRA recommendation
+        if annual_ira_contribution < CURRENT_IRA_LIMIT:
+            st.info(f"You can contribute up to ${CURRENT_IRA_LIMIT - annual_ira_contribution:,.0f} more to your IRA this year")
+
+        # Savings rate analysis
+        annual_savings = (annual_salary * (roth_401k_percent + trad_401k_percent) / 100) + annual_ira_contribution
+        savings_rate = annual_savings / annual_salary * 100
+        if savings_rate < 15:
+            st.warning(f"Your current savings rate is {savings_rate:.1f}%. Financial experts often recommend saving at least 15% of income for retirement.")
+        else:
+            st.success(f"Your current savings rate is {savings_rate:.1f}%, which meets or exceeds expert recommendations.")
+
+        # Tax efficiency analysis
+        if trad_401k_percent < roth_401k_percent and annual_salary > 100000:
+            st.info("Given your income level, you might benefit from increasing pre-tax (Traditional) contributions to reduce current tax burden.")
+        elif trad_401k_percent > roth_401k_percent and annual_salary < 80000:
+            st.info("At your income level, you might benefit from more Roth contributions for tax-free growth.")
+
+        # Expense inflation awareness
+        retirement_year_expenses = projection_data.value_at_age('Annual Expenses', retirement_age)
+        st.info(f"Your current monthly expenses will grow to approximately ${retirement_year_expenses/12:,.0f} per month by retirement due to inflation.")
+
+        # Show expense coverage ratio
+        if income_ratio >= 1:
+            st.success(f"Projected monthly income covers {income_ratio:.1f}x your future expenses")
+        else:
+            st.warning(f"Projected monthly income covers only {income_ratio:.1f}x your future expenses")
+
+    # Footer
+    st.markdown("---")
+    st.markdown("""
 **Note:** This calculator provides estimates based on the information you provide and general assumptions.
 Actual results may vary due to market fluctuations, tax law changes, and other factors.
 Consider consulting a financial advisor for personalized advice.
 """)
+
+if record_timings:
+    with debug_panel:
+        st.dataframe(
+            profile.summary(),
+            column_config={
+                'total_ms': st.column_config.NumberColumn("Total (ms)", format="%.2f"),
+                'per_call_ms': st.column_config.NumberColumn("Per Call (ms)", format="%.3f")
+            },
+            hide_index=True
+        )
+        st.caption("Figures and results served from the cache skip their calculation spans.")
+        cache_stats = {'In-process cache': get_app_cache().stats()}
+        result_store = get_result_store()
+        if result_store is not None:
+            cache_stats['Result store (all processes)'] = result_store.stats()
+        st.dataframe(
+            pd.DataFrame(cache_stats).T[['entries', 'bytes', 'hits', 'misses', 'evictions', 'hit_rate']],
+            column_config={'hit_rate': st.column_config.NumberColumn("Hit Rate", format="percent")}
+        )
+        st.download_button("Download JSON", profile.to_json(), file_name="timings.json", mime="application/json")
+        st.download_button("Download Chrome Trace", profile.to_chrome_trace(), file_name="trace.json", mime="application/json")
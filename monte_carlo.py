@@ -0,0 +1,274 @@
+import numpy as np
+from calculations import calculate_retirement_projections_batch
+from constants import CURRENT_YEAR, INFLATION_RATE
+from glide_path import DEFAULT_BOND_RETURN
+from historical import DEFAULT_BLOCK_YEARS, DEFAULT_STOCK_ALLOCATION, bootstrap_rates, load_historical_returns
+from profiling import timed
+
+# Percentile bands reported for 'Total Balance'
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Default spread of annual returns around the expected values
+DEFAULT_RETURN_VOLATILITY = 0.15  # Broad stock-heavy portfolio
+DEFAULT_APY_VOLATILITY = 0.01  # Savings rates move slowly
+DEFAULT_BOND_VOLATILITY = 0.06  # Intermediate-term bonds, drawn only with a glide path
+
+class MonteCarloResult:
+    """Summary statistics of a Monte Carlo projection run"""
+    def __init__(self, ages, years, percentiles, probability_of_shortfall,
+                 depletion_ages, total_balance=None):
+        self.ages = ages
+        self.years = years
+        self.percentiles = percentiles
+        self.probability_of_shortfall = probability_of_shortfall
+        self.depletion_ages = depletion_ages
+        self.total_balance = total_balance
+
+    @property
+    def nbytes(self):
+        arrays = [self.ages, self.years, self.depletion_ages, *self.percentiles.values()]
+        if self.total_balance is not None:
+            arrays.append(self.total_balance)
+        return sum(array.nbytes for array in arrays)
+
+    @property
+    def median_depletion_age(self):
+        """Median age at which savings run out, among paths that run out"""
+        depleted = self.depletion_ages[~np.isnan(self.depletion_ages)]
+        if len(depleted) == 0:
+            return None
+        return float(np.median(depleted))
+
+def simulate_annual_rates(rng, n_paths, n_years, mean, volatility, floor=-1.0):
+    """
+    Draw normally distributed annual rates for each path and year, floored so a
+    balance can never lose more than everything. Returns a (path x year) view
+    of year-major storage so the engine reads each year contiguously.
+    """
+    # Single-precision standard normals are about twice as fast to draw and
+    # far finer than any return assumption
+    shocks = rng.standard_normal(size=(n_years, n_paths), dtype=np.float32)
+    rates = mean + volatility * shocks.astype(float)
+    return np.maximum(rates, floor, out=rates).T
+
+@timed()
+def simulate_paths(
+    current_age,
+    retirement_age,
+    current_savings,
+    current_trad_ira,
+    current_trad_401k,
+    annual_salary,
+    annual_merit_increase,
+    investment_return,
+    savings_apy,
+    roth_401k_percent,
+    trad_401k_percent,
+    employer_401k_match,
+    annual_ira_contribution,
+    monthly_expenses=0.0,
+    filing_status="single",
+    retirement_monthly_expenses=None,
+    withdrawal_share=0.0,
+    fill_income=0.0,
+    glide_path=None,
+    bond_return=DEFAULT_BOND_RETURN,
+    n_paths=10000,
+    return_volatility=DEFAULT_RETURN_VOLATILITY,
+    apy_volatility=DEFAULT_APY_VOLATILITY,
+    bond_volatility=DEFAULT_BOND_VOLATILITY,
+    seed=None,
+    historical=None,
+    stock_allocation=DEFAULT_STOCK_ALLOCATION,
+    block_years=DEFAULT_BLOCK_YEARS
+):
+    """
+    Run the projection engine over n_paths random return paths at once.
+
+    Each path draws its own investment return and savings APY for every year;
+    the draws replace the fixed base rates, and the usual glide-down toward
+    retirement is applied on top. Returns (path x year) arrays of
+    'Total Balance' and 'Retirement Shortfall'.
+
+    historical, a dataset directory or HistoricalReturns, switches to
+    resampling blocks of history instead: returns of a stock_allocation
+    stock/bond mix replace the adjusted investment return, savings earn the
+    cash rate and expenses grow with resampled inflation. investment_return,
+    savings_apy and the volatilities are then unused.
+
+    With a glide_path, stocks (investment_return), bonds (bond_return) and
+    cash (the savings APY) are drawn separately, or resampled from history,
+    and each path earns the glide path's mix of them; stock_allocation is
+    then unused.
+    """
+    n_years = max(retirement_age - current_age + 30, 0)
+    rng = np.random.default_rng(seed)
+
+    if historical is not None:
+        if isinstance(historical, str):
+            historical = load_historical_returns(historical)
+        if glide_path is None:
+            returns, apys, inflation = bootstrap_rates(
+                historical, rng, n_paths, n_years, stock_allocation, block_years
+            )
+        else:
+            returns, bond_return, apys, inflation = bootstrap_rates(
+                historical, rng, n_paths, n_years, None, block_years
+            )
+    else:
+        returns = simulate_annual_rates(rng, n_paths, n_years, investment_return, return_volatility)
+        apys = simulate_annual_rates(rng, n_paths, n_years, savings_apy, apy_volatility, floor=0.0)
+        if glide_path is not None:
+            bond_return = simulate_annual_rates(rng, n_paths, n_years, bond_return, bond_volatility)
+        inflation = INFLATION_RATE
+
+    batch = calculate_retirement_projections_batch(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase,
+        investment_return=returns,
+        savings_apy=apys,
+        roth_401k_percent=roth_401k_percent,
+        trad_401k_percent=trad_401k_percent,
+        employer_401k_match=employer_401k_match,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        filing_status=filing_status,
+        retirement_monthly_expenses=retirement_monthly_expenses,
+        withdrawal_share=withdrawal_share,
+        fill_income=fill_income,
+        glide_path=glide_path,
+        bond_return=bond_return,
+        inflation_rate=inflation,
+        fields=['Total Balance', 'Retirement Shortfall'],
+        round_values=False,
+        adjust_returns=historical is None
+    )
+    return batch.field('Total Balance'), batch.field('Retirement Shortfall')
+
+def depletion_ages(current_age, shortfall):
+    """
+    Age at which each path first cannot cover expenses, NaN for paths that
+    never run short. shortfall is a (path x year) array.
+    """
+    ages = current_age + np.arange(shortfall.shape[1])
+    short = shortfall > 0
+    ever_short = short.any(axis=1)
+    first_short = np.argmax(short, axis=1)
+    return np.where(ever_short, ages[first_short], np.nan)
+
+def percentile_bands(values_by_year, percentiles=DEFAULT_PERCENTILES):
+    """
+    Linearly interpolated percentiles of each row of a (year x path) array.
+    Sorting each year once is several times faster than np.percentile for
+    many paths and a handful of percentiles.
+    """
+    ordered = np.sort(values_by_year, axis=1)
+    n_paths = ordered.shape[1]
+    position = np.asarray(percentiles, dtype=float) / 100 * (n_paths - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, n_paths - 1)
+    fraction = position - lower
+    return ordered[:, lower] + (ordered[:, upper] - ordered[:, lower]) * fraction
+
+@timed()
+def summarize_paths(current_age, total_balance, shortfall=None,
+                    percentiles=DEFAULT_PERCENTILES, keep_paths=False, path_depletion_ages=None):
+    """
+    Reduce simulated (path x year) arrays to a MonteCarloResult. Depletion
+    ages are taken from path_depletion_ages when already known, otherwise
+    derived from shortfall.
+    """
+    n_years = total_balance.shape[1]
+    ages = current_age + np.arange(n_years)
+    years = ages - current_age + CURRENT_YEAR
+
+    # Balances are stored year-major, so work on contiguous years
+    bands = percentile_bands(total_balance.T, percentiles)
+
+    if path_depletion_ages is None:
+        path_depletion_ages = depletion_ages(current_age, shortfall)
+    ever_short = ~np.isnan(path_depletion_ages)
+
+    return MonteCarloResult(
+        ages=ages,
+        years=years,
+        percentiles={p: bands[:, i] for i, p in enumerate(percentiles)},
+        probability_of_shortfall=float(ever_short.mean()) if len(ever_short) else 0.0,
+        depletion_ages=path_depletion_ages,
+        total_balance=total_balance if keep_paths else None
+    )
+
+@timed()
+def run_monte_carlo_simulation(
+    current_age,
+    retirement_age,
+    current_savings,
+    current_trad_ira,
+    current_trad_401k,
+    annual_salary,
+    annual_merit_increase,
+    investment_return,
+    savings_apy,
+    roth_401k_percent,
+    trad_401k_percent,
+    employer_401k_match,
+    annual_ira_contribution,
+    monthly_expenses=0.0,
+    filing_status="single",
+    retirement_monthly_expenses=None,
+    withdrawal_share=0.0,
+    fill_income=0.0,
+    glide_path=None,
+    bond_return=DEFAULT_BOND_RETURN,
+    n_paths=10000,
+    return_volatility=DEFAULT_RETURN_VOLATILITY,
+    apy_volatility=DEFAULT_APY_VOLATILITY,
+    bond_volatility=DEFAULT_BOND_VOLATILITY,
+    percentiles=DEFAULT_PERCENTILES,
+    seed=None,
+    keep_paths=False,
+    historical=None,
+    stock_allocation=DEFAULT_STOCK_ALLOCATION,
+    block_years=DEFAULT_BLOCK_YEARS
+):
+    """
+    Simulate n_paths random return paths and summarize them as percentile bands
+    of 'Total Balance', the probability of a retirement shortfall and the age
+    at which savings run out. See simulate_paths for resampling history.
+    """
+    total_balance, shortfall = simulate_paths(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase,
+        investment_return=investment_return,
+        savings_apy=savings_apy,
+        roth_401k_percent=roth_401k_percent,
+        trad_401k_percent=trad_401k_percent,
+        employer_401k_match=employer_401k_match,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        filing_status=filing_status,
+        retirement_monthly_expenses=retirement_monthly_expenses,
+        withdrawal_share=withdrawal_share,
+        fill_income=fill_income,
+        glide_path=glide_path,
+        bond_return=bond_return,
+        n_paths=n_paths,
+        return_volatility=return_volatility,
+        apy_volatility=apy_volatility,
+        bond_volatility=bond_volatility,
+        seed=seed,
+        historical=historical,
+        stock_allocation=stock_allocation,
+        block_years=block_years
+    )
+    return summarize_paths(current_age, total_balance, shortfall, percentiles, keep_paths)
@@ -0,0 +1,234 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from calculations import (
+    BatchProjections,
+    PROJECTION_COLUMNS,
+    calculate_retirement_projections_batch
+)
+from glide_path import DEFAULT_BOND_RETURN, GlidePath
+from historical import DEFAULT_BLOCK_YEARS, DEFAULT_STOCK_ALLOCATION
+from monte_carlo import (
+    DEFAULT_APY_VOLATILITY,
+    DEFAULT_BOND_VOLATILITY,
+    DEFAULT_PERCENTILES,
+    DEFAULT_RETURN_VOLATILITY,
+    depletion_ages,
+    simulate_paths,
+    summarize_paths
+)
+
+# Paths per Monte Carlo chunk and scenarios per batch chunk. Results depend on
+# the chunk size (it fixes which random stream each path uses) but never on
+# the number of workers.
+DEFAULT_PATH_CHUNK_SIZE = 10000
+DEFAULT_SCENARIO_CHUNK_SIZE = 1000
+
+class _SharedArray:
+    """A NumPy array backed by a named shared memory block"""
+    def __init__(self, shape, name=None):
+        self.shape = tuple(shape)
+        size = max(int(np.prod(self.shape)) * 8, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        del self.array
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+def default_workers():
+    """Number of worker processes to use when none is given"""
+    return os.cpu_count() or 1
+
+def _chunks(total, chunk_size):
+    """(start, stop) bounds splitting range(total) into chunks"""
+    return [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+def _run_tasks(worker, tasks, workers):
+    """Run worker over tasks, in-process for a single worker"""
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            worker(task)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        # Consume results so worker exceptions are raised here
+        for _ in pool.map(worker, tasks):
+            pass
+
+def _monte_carlo_chunk(task):
+    """Simulate one chunk of paths and write it into the shared result arrays"""
+    inputs, seed, start, stop, balance_name, depletion_name, shape = task
+    total_balance, shortfall = simulate_paths(**inputs, n_paths=stop - start, seed=seed)
+
+    balances = _SharedArray(shape, name=balance_name)
+    ages = _SharedArray((shape[1],), name=depletion_name)
+    try:
+        balances.array[:, start:stop] = total_balance.T
+        ages.array[start:stop] = depletion_ages(inputs['current_age'], shortfall)
+    finally:
+        balances.close()
+        ages.close()
+
+def run_monte_carlo_parallel(
+    current_age,
+    retirement_age,
+    current_savings,
+    current_trad_ira,
+    current_trad_401k,
+    annual_salary,
+    annual_merit_increase,
+    investment_return,
+    savings_apy,
+    roth_401k_percent,
+    trad_401k_percent,
+    employer_401k_match,
+    annual_ira_contribution,
+    monthly_expenses=0.0,
+    filing_status="single",
+    retirement_monthly_expenses=None,
+    withdrawal_share=0.0,
+    fill_income=0.0,
+    glide_path=None,
+    bond_return=DEFAULT_BOND_RETURN,
+    n_paths=10000,
+    return_volatility=DEFAULT_RETURN_VOLATILITY,
+    apy_volatility=DEFAULT_APY_VOLATILITY,
+    bond_volatility=DEFAULT_BOND_VOLATILITY,
+    percentiles=DEFAULT_PERCENTILES,
+    seed=None,
+    keep_paths=False,
+    historical=None,
+    stock_allocation=DEFAULT_STOCK_ALLOCATION,
+    block_years=DEFAULT_BLOCK_YEARS,
+    workers=None,
+    chunk_size=DEFAULT_PATH_CHUNK_SIZE
+):
+    """
+    Monte Carlo simulation split into chunks of paths run on a process pool.
+
+    Each chunk draws from its own child of np.random.SeedSequence(seed), so a
+    given seed and chunk_size give the same result for any number of workers.
+    Workers write balances and depletion ages straight into shared memory,
+    so no projection data is pickled back to the parent. A historical
+    dataset is memory-mapped by each worker rather than sent to it.
+    """
+    workers = default_workers() if workers is None else workers
+    inputs = dict(
+        current_age=current_age,
+        retirement_age=retirement_age,
+        current_savings=current_savings,
+        current_trad_ira=current_trad_ira,
+        current_trad_401k=current_trad_401k,
+        annual_salary=annual_salary,
+        annual_merit_increase=annual_merit_increase,
+        investment_return=investment_return,
+        savings_apy=savings_apy,
+        roth_401k_percent=roth_401k_percent,
+        trad_401k_percent=trad_401k_percent,
+        employer_401k_match=employer_401k_match,
+        annual_ira_contribution=annual_ira_contribution,
+        monthly_expenses=monthly_expenses,
+        filing_status=filing_status,
+        retirement_monthly_expenses=retirement_monthly_expenses,
+        withdrawal_share=withdrawal_share,
+        fill_income=fill_income,
+        glide_path=glide_path,
+        bond_return=bond_return,
+        return_volatility=return_volatility,
+        apy_volatility=apy_volatility,
+        bond_volatility=bond_volatility,
+        historical=historical,
+        stock_allocation=stock_allocation,
+        block_years=block_years
+    )
+    n_years = max(retirement_age - current_age + 30, 0)
+    chunks = _chunks(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    # Year-major storage, matching what summarize_paths works on
+    balances = _SharedArray((n_years, n_paths))
+    ages = _SharedArray((n_paths,))
+    try:
+        tasks = [
+            (inputs, chunk_seed, start, stop, balances.name, ages.name, (n_years, n_paths))
+            for chunk_seed, (start, stop) in zip(seeds, chunks)
+        ]
+        _run_tasks(_monte_carlo_chunk, tasks, workers)
+        return summarize_paths(
+            current_age,
+            balances.array.T.copy() if keep_paths else balances.array.T,
+            percentiles=percentiles,
+            keep_paths=keep_paths,
+            path_depletion_ages=ages.array.copy()
+        )
+    finally:
+        balances.close(unlink=True)
+        ages.close(unlink=True)
+
+def _batch_chunk(task):
+    """Project one chunk of scenarios and write it into the shared result array"""
+    inputs, fields, start, stop, values_name, shape = task
+    chunk_inputs = {
+        name: value[start:stop] if np.ndim(value) >= 1 and np.shape(value)[0] == shape[2] else value
+        for name, value in inputs.items()
+    }
+    batch = calculate_retirement_projections_batch(**chunk_inputs, fields=fields)
+
+    values = _SharedArray(shape, name=values_name)
+    try:
+        chunk = values.array[:, :batch.data.shape[1], start:stop]
+        chunk[:] = batch.data
+        # Years past a scenario's own horizon would depend on the rest of its chunk
+        chunk[:, np.arange(chunk.shape[1])[:, None] >= batch.n_years] = np.nan
+    finally:
+        values.close()
+
+def calculate_retirement_projections_batch_parallel(
+    workers=None,
+    chunk_size=DEFAULT_SCENARIO_CHUNK_SIZE,
+    fields=None,
+    **inputs
+):
+    """
+    calculate_retirement_projections_batch split into chunks of scenarios run
+    on a process pool. Takes the same inputs and returns the same
+    BatchProjections, except that years past a scenario's own horizon are
+    NaN; workers write into one shared memory block.
+    """
+    workers = default_workers() if workers is None else workers
+    fields = list(PROJECTION_COLUMNS if fields is None else fields)
+    inputs = {
+        name: value if isinstance(value, (str, GlidePath)) or value is None else np.asarray(value)
+        for name, value in inputs.items()
+    }
+
+    sized = [value for value in inputs.values() if isinstance(value, np.ndarray) and value.ndim >= 1]
+    n_scenarios = max((len(value) for value in sized), default=1)
+    n_years = np.broadcast_to(
+        np.maximum(np.asarray(inputs['retirement_age']) - np.asarray(inputs['current_age']) + 30, 0).astype(int),
+        (n_scenarios,)
+    )
+    shape = (len(fields), int(n_years.max()), n_scenarios)
+
+    values = _SharedArray(shape)
+    try:
+        values.array[:] = np.nan
+        tasks = [
+            (inputs, fields, start, stop, values.name, shape)
+            for start, stop in _chunks(n_scenarios, chunk_size)
+        ]
+        _run_tasks(_batch_chunk, tasks, workers)
+        return BatchProjections(values.array.copy(), fields, n_years.copy())
+    finally:
+        values.close(unlink=True)
@@ -0,0 +1,181 @@
+"""
+Lightweight timing spans for finding where a rerun spends its time.
+
+    profile = profiling.start()        # record spans on this thread
+    with profiling.span("charts"):
+        ...
+    profiling.stop()                   # or: with profiling.recording() as profile:
+    profile.summary()                  # calls, total and per-call time per span name
+    profile.to_chrome_trace()          # load in chrome://tracing or ui.perfetto.dev
+
+Functions decorated with @timed record a span named after the function. Spans
+are recorded only on threads that called start(), so Streamlit sessions do not
+see each other's timings; while nothing is recording, a span costs one global
+lookup.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Events kept per profile for export; call counts and totals keep counting past it
+MAX_EVENTS = 100_000
+
+_active = 0  # threads currently recording
+_active_lock = threading.Lock()
+_local = threading.local()
+
+class Profile:
+    """Spans recorded on one thread"""
+    def __init__(self, max_events=MAX_EVENTS):
+        self.max_events = max_events
+        self.events = []  # (name, start_ns, duration_ns)
+        self.totals = {}  # name -> [calls, total_ns]
+        self.dropped = 0
+        self.origin = time.perf_counter_ns()
+        self.thread_id = threading.get_ident()
+
+    def add(self, name, start, duration):
+        totals = self.totals.get(name)
+        if totals is None:
+            self.totals[name] = [1, duration]
+        else:
+            totals[0] += 1
+            totals[1] += duration
+        if len(self.events) < self.max_events:
+            self.events.append((name, start, duration))
+        else:
+            self.dropped += 1
+
+    def summary(self):
+        """One row per span name, slowest total first"""
+        rows = [
+            {
+                'span': name,
+                'calls': calls,
+                'total_ms': total / 1e6,
+                'per_call_ms': total / calls / 1e6
+            }
+            for name, (calls, total) in self.totals.items()
+        ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+    def to_json(self):
+        """Summary and individual spans, times in milliseconds from the start of recording"""
+        return json.dumps({
+            'summary': self.summary(),
+            'spans': [
+                {'name': name, 'start_ms': (start - self.origin) / 1e6, 'duration_ms': duration / 1e6}
+                for name, start, duration in self.events
+            ],
+            'dropped_spans': self.dropped
+        }, indent=2)
+
+    def to_chrome_trace(self):
+        """Spans in the Chrome trace event format (complete events, times in microseconds)"""
+        pid = os.getpid()
+        return json.dumps({
+            'traceEvents': [
+                {
+                    'name': name,
+                    'ph': 'X',
+                    'ts': (start - self.origin) / 1e3,
+                    'dur': duration / 1e3,
+                    'pid': pid,
+                    'tid': self.thread_id
+                }
+                for name, start, duration in self.events
+            ],
+            'displayTimeUnit': 'ms'
+        })
+
+def start(profile=None):
+    """Record spans on the current thread into profile (a new Profile by default) and return it"""
+    global _active
+    profile = Profile() if profile is None else profile
+    with _active_lock:
+        if getattr(_local, 'profile', None) is None:
+            _active += 1
+        _local.profile = profile
+    return profile
+
+def stop():
+    """Stop recording on the current thread and return its Profile, or None"""
+    global _active
+    with _active_lock:
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            _local.profile = None
+            _active -= 1
+    return profile
+
+@contextmanager
+def recording(profile=None):
+    """Record spans on the current thread for the duration of the block, even if it raises"""
+    profile = start(profile)
+    try:
+        yield profile
+    finally:
+        stop()
+
+def current():
+    """The Profile recording on the current thread, or None"""
+    return getattr(_local, 'profile', None) if _active else None
+
+class _Span:
+    __slots__ = ('profile', 'name', 'start')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name):
+    """Context manager timing its block as name when the current thread is recording"""
+    if not _active:
+        return _NULL_SPAN
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, name)
+
+def timed(name=None):
+    """Decorator recording each call of a function as a span, named module.function by default"""
+    def decorate(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return func(*args, **kwargs)
+            profile = getattr(_local, 'profile', None)
+            if profile is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add(span_name, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
@@ -0,0 +1,220 @@
+"""
+Roth conversion planning: choose how much of the traditional 401k/IRA
+balance to convert to Roth each year so lifetime tax is as low as possible.
+
+The plan is found by dynamic programming over a grid of traditional
+balances for each year. Working backwards from the end of the horizon, the
+value of every grid balance is the least tax still to come from it, so each
+year compares every conversion amount from every balance at once (the bracket
+math runs on the whole grid x grid array) instead of searching over whole
+conversion schedules.
+
+The model takes its income, contributions, growth and spending from the
+projection without conversions:
+- Converted amounts are taxed as income in the year they are converted, and
+  the tax is paid from outside the traditional accounts.
+- In retirement, the traditional accounts are drawn as in the projection
+  for as long as conversions leave enough in them; the Roth bucket covers
+  the spending they no longer can, and any shortfall of the projection.
+- Whatever traditional balance is left at the end of the horizon is taxed
+  at terminal_tax_rate.
+"""
+import numpy as np
+from calculations import (
+    PROJECTION_INPUT_DEFAULTS,
+    calculate_retirement_projections,
+    projection_investment_returns,
+    year_tables
+)
+from constants import INFLATION_RATE
+from profiling import timed
+
+# Traditional balances per year the value function is evaluated at
+DEFAULT_GRID_SIZE = 201
+
+# Rate the traditional balance left at the end of the horizon is assumed to
+# be taxed at (e.g. when withdrawn by heirs)
+DEFAULT_TERMINAL_TAX_RATE = 0.24
+
+class RothConversionPlan:
+    """Yearly conversions and the taxes with and without them"""
+    def __init__(self, ages, years, conversions, taxes, baseline_taxes,
+                 traditional_balance, roth_balance, terminal_tax, baseline_terminal_tax,
+                 discount_rate=0.0):
+        self.ages = ages
+        self.years = years
+        self.conversions = conversions
+        self.taxes = taxes
+        self.baseline_taxes = baseline_taxes
+        self.traditional_balance = traditional_balance
+        self.roth_balance = roth_balance
+        self.terminal_tax = terminal_tax
+        self.baseline_terminal_tax = baseline_terminal_tax
+        self.discount_rate = discount_rate
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (
+            self.ages, self.years, self.conversions, self.taxes, self.baseline_taxes,
+            self.traditional_balance, self.roth_balance))
+
+    def _lifetime(self, taxes, terminal_tax):
+        discount = (1 + self.discount_rate) ** -np.arange(len(taxes))
+        return float(taxes @ discount + terminal_tax * (discount[-1] if len(discount) else 1.0))
+
+    @property
+    def lifetime_tax(self):
+        """Tax over the horizon with the conversions, including the terminal tax"""
+        return self._lifetime(self.taxes, self.terminal_tax)
+
+    @property
+    def baseline_lifetime_tax(self):
+        """Tax over the horizon without conversions, including the terminal tax"""
+        return self._lifetime(self.baseline_taxes, self.baseline_terminal_tax)
+
+    @property
+    def tax_savings(self):
+        return self.baseline_lifetime_tax - self.lifetime_tax
+
+    @property
+    def total_converted(self):
+        return float(self.conversions.sum())
+
+    def to_frame(self):
+        """One row per year"""
+        import pandas as pd
+        return pd.DataFrame({
+            'Age': self.ages,
+            'Year': self.years,
+            'Roth Conversion': self.conversions,
+            'Taxes Paid': self.taxes,
+            'Taxes Paid (No Conversions)': self.baseline_taxes,
+            'Traditional Balance': self.traditional_balance,
+            'Roth Balance': self.roth_balance
+        })
+
+def _plan_inputs(projection, inputs):
+    """
+    Per-year inputs of the conversion model from a projection without
+    conversions: other taxable income, traditional contributions, return on
+    traditional balances, traditional withdrawals and shortfall
+    """
+    ages = projection['Age']
+    working = ages < projection.retirement_age
+
+    # Pre-tax income and the traditional 401k contributions (employee and
+    # employer) that kept it below salary
+    income = np.where(working, projection['After-Tax Income'] + projection['Taxes Paid'], 0.0)
+    contributions = np.where(working, projection['Salary'] - income + projection['Employer 401k Match'], 0.0)
+
+    # Same returns as the engine, glide path or step-down
+    returns = projection_investment_returns(inputs, projection.retirement_age - ages)
+
+    # Retirement withdrawals are whatever growth does not account for
+    traditional = projection['Traditional IRA'] + projection['Traditional 401k']
+    draws = np.zeros(len(ages))
+    draws[1:] = traditional[:-1] * (1 + returns[1:]) - traditional[1:]
+    draws = np.where(working, 0.0, np.maximum(draws, 0.0))
+    shortfall = np.nan_to_num(projection['Retirement Shortfall'])
+    return np.nan_to_num(income), np.nan_to_num(contributions), returns, draws, shortfall
+
+def _year_outcomes(start_balance, converted, growth, baseline_draw, contribution):
+    """
+    Traditional withdrawal and end-of-year balance for conversions made at
+    the start of the year from start_balance
+    """
+    grown = (start_balance - converted) * (1 + growth)
+    draw = np.minimum(baseline_draw, grown)
+    return draw, grown - draw + contribution
+
+@timed()
+def optimize_roth_conversions(n_grid=DEFAULT_GRID_SIZE, discount_rate=None,
+                              terminal_tax_rate=DEFAULT_TERMINAL_TAX_RATE, **inputs):
+    """
+    Find the yearly Roth conversions that minimize lifetime tax for the plan
+    described by the projection inputs. Taxes are discounted at
+    discount_rate, by default the savings APY: conversion taxes come out of
+    savings, so paying them early costs the interest they would have earned.
+
+    Returns a RothConversionPlan alongside the same model without
+    conversions. Conversions are amounts that move the traditional balance
+    onto a grid of n_grid balances between zero and its size without
+    conversions; a finer grid finds finer amounts at quadratic cost per year.
+    """
+    # The model draws savings first, once a year
+    inputs = dict(PROJECTION_INPUT_DEFAULTS, **inputs)
+    inputs.update(steps_per_year=1, withdrawal_share=0.0, fill_income=0.0)
+    if discount_rate is None:
+        discount_rate = inputs['savings_apy']
+    projection = calculate_retirement_projections(**inputs)
+    n_years = len(projection)
+    tables = year_tables(INFLATION_RATE, inputs['filing_status'], n_years)
+    discount = (1 + discount_rate) ** -np.arange(n_years)
+    income, contributions, returns, draws, shortfall = _plan_inputs(projection, inputs)
+
+    # Traditional balances without conversions bound every year's grid:
+    # converting never leaves more in them
+    ceiling = np.maximum(projection['Traditional IRA'] + projection['Traditional 401k'], 1.0)
+    grids = np.linspace(0.0, 1.0, n_grid) * ceiling[:, None]
+    feasible = np.tril(np.ones((n_grid, n_grid), dtype=bool))  # row i may move to balance k <= i
+
+    # values[t] is the least discounted tax still to come after year t,
+    # for each balance in grids[t]
+    values = np.empty((n_years, n_grid))
+    if n_years:
+        values[-1] = terminal_tax_rate * grids[-1] * discount[-1]
+    for year in range(n_years - 1, 0, -1):
+        start = grids[year - 1]
+        draw, end_balance = _year_outcomes(start, 0.0, returns[year], draws[year], contributions[year])
+        # Keeping balance start[k] after converting: the draw and what follows depend only on k
+        future = np.interp(end_balance, grids[year], values[year])
+        converted = start[:, None] - start[None, :]
+        taxable = income[year] + draw[None, :] + np.maximum(converted, 0.0)
+        cost = discount[year] * tables.tax_array(year, taxable) + future[None, :]
+        values[year - 1] = np.where(feasible, cost, np.inf).min(axis=1)
+
+    def follow(choose):
+        conversions = np.zeros(n_years)
+        taxes = np.zeros(n_years)
+        traditional = np.zeros(n_years)
+        roth = np.zeros(n_years)
+        if n_years:
+            traditional[0] = projection['Traditional IRA'][0] + projection['Traditional 401k'][0]
+        for year in range(1, n_years):
+            balance = traditional[year - 1]
+            converted = choose(year, balance)
+            draw, traditional[year] = _year_outcomes(
+                balance, converted, returns[year], draws[year], contributions[year]
+            )
+            conversions[year] = converted
+            taxes[year] = tables.tax(year, income[year] + draw + converted)
+            roth_balance = (roth[year - 1] + converted) * (1 + returns[year])
+            # Withdrawals the traditional accounts could not make are covered net of
+            # the tax estimate they were grossed up by
+            uncovered = (draws[year] - draw) / 1.25 + shortfall[year]
+            roth[year] = roth_balance - min(uncovered, roth_balance)
+        return conversions, taxes, traditional, roth
+
+    def best_conversion(year, balance):
+        # Every grid balance at or below this one, or keeping it all
+        kept = np.append(grids[year - 1][grids[year - 1] < balance], balance)
+        draw, end_balance = _year_outcomes(kept, 0.0, returns[year], draws[year], contributions[year])
+        cost = (discount[year] * tables.tax_array(year, income[year] + draw + (balance - kept))
+                + np.interp(end_balance, grids[year], values[year]))
+        return float(balance - kept[np.argmin(cost)])
+
+    conversions, taxes, traditional, roth = follow(best_conversion)
+    _, baseline_taxes, baseline_traditional, _ = follow(lambda year, balance: 0.0)
+    final = n_years - 1
+    return RothConversionPlan(
+        ages=projection['Age'].copy(),
+        years=projection['Year'].copy(),
+        conversions=conversions,
+        taxes=taxes,
+        baseline_taxes=baseline_taxes,
+        traditional_balance=traditional,
+        roth_balance=roth,
+        terminal_tax=terminal_tax_rate * traditional[final] if n_years else 0.0,
+        baseline_terminal_tax=terminal_tax_rate * baseline_traditional[final] if n_years else 0.0,
+        discount_rate=discount_rate
+    )
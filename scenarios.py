@@ -0,0 +1,120 @@
+"""
+Named scenarios saved side by side and compared year by year.
+
+A ScenarioWorkspace lives in a session and keeps the inputs of each saved
+scenario with the projection last computed for them. evaluate() projects
+every scenario whose inputs are new or changed in one batched call and
+reuses the rest, so saving one more scenario next to dozens costs a single
+projection.
+"""
+import numpy as np
+import pandas as pd
+from calculations import calculate_scenario_projections
+from monte_carlo import depletion_ages
+from profiling import timed
+
+# Scenarios one workspace holds
+MAX_SCENARIOS = 50
+
+# Fields the comparison can be drawn for
+COMPARISON_FIELDS = [
+    'Total Balance',
+    'High-Yield Savings',
+    'Traditional IRA',
+    'Traditional 401k',
+    'Taxes Paid',
+    'Retirement Shortfall'
+]
+
+class ScenarioWorkspace:
+    """Saved scenarios, by name in the order they were saved, and their projections"""
+    def __init__(self, max_scenarios=MAX_SCENARIOS):
+        self.max_scenarios = max_scenarios
+        self.scenarios = {}
+        self._results = {}  # name -> (inputs it was projected for, ProjectionResult)
+        self.last_computed = []  # names the most recent evaluate() projected
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __contains__(self, name):
+        return name in self.scenarios
+
+    def __iter__(self):
+        return iter(self.scenarios)
+
+    def save(self, name, inputs):
+        """Save inputs under name, replacing a scenario of the same name"""
+        name = name.strip()
+        if not name:
+            raise ValueError("a scenario needs a name")
+        if name not in self.scenarios and len(self.scenarios) >= self.max_scenarios:
+            raise ValueError(f"at most {self.max_scenarios} scenarios can be saved")
+        self.scenarios[name] = dict(inputs)
+
+    def remove(self, name):
+        self.scenarios.pop(name, None)
+        self._results.pop(name, None)
+
+    def clear(self):
+        self.scenarios.clear()
+        self._results.clear()
+
+    def stale(self):
+        """Names of scenarios whose inputs changed since they were last projected"""
+        return [
+            name for name, inputs in self.scenarios.items()
+            if name not in self._results or self._results[name][0] != inputs
+        ]
+
+    @timed()
+    def evaluate(self):
+        """
+        Projections of every saved scenario by name, projecting only the stale
+        ones, all in one batched call
+        """
+        self.last_computed = self.stale()
+        projected = calculate_scenario_projections([self.scenarios[name] for name in self.last_computed])
+        for name, result in zip(self.last_computed, projected):
+            self._results[name] = (dict(self.scenarios[name]), result)
+        return {name: self._results[name][1] for name in self.scenarios}
+
+def scenario_curves(results, field='Total Balance'):
+    """
+    One column of field per scenario, indexed by year; years past a
+    scenario's horizon are NaN
+    """
+    curves = {
+        name: pd.Series(result[field], index=result['Year'].astype(int))
+        for name, result in results.items()
+    }
+    frame = pd.DataFrame(curves)
+    frame.index.name = 'Year'
+    return frame
+
+def scenario_differences(results, baseline, field='Total Balance'):
+    """
+    Per-year table of the baseline scenario's field and every other
+    scenario's difference from it
+    """
+    curves = scenario_curves(results, field)
+    differences = curves.drop(columns=baseline).sub(curves[baseline], axis=0)
+    differences.columns = [f"{name} vs {baseline}" for name in differences.columns]
+    return pd.concat([curves[[baseline]], differences], axis=1)
+
+def scenario_summary(results):
+    """One row per scenario with its headline numbers"""
+    rows = []
+    for name, result in results.items():
+        retirement_index = result.retirement_index
+        balance = result['Total Balance']
+        rows.append({
+            'Scenario': name,
+            'Retirement Age': result.retirement_age,
+            'Balance at Retirement': np.nan if retirement_index is None else balance[retirement_index],
+            'Final Balance': balance[-1],
+            'Lifetime Tax': result.total('Taxes Paid'),
+            'Total Shortfall': result.total('Retirement Shortfall'),
+            'Depletion Age': depletion_ages(result.current_age, result['Retirement Shortfall'][None, :])[0]
+        })
+    return pd.DataFrame(rows)
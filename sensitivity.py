@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from calculations import calculate_retirement_projections_batch
+from constants import INFLATION_RATE
+from profiling import timed
+from solver import total_shortfall
+
+# How far each input is moved down and up: ('absolute', step) shifts the value
+# by step, ('relative', fraction) scales it by 1 -/+ fraction
+DEFAULT_PERTURBATIONS = {
+    'investment_return': ('absolute', 0.01),
+    'savings_apy': ('absolute', 0.005),
+    'annual_merit_increase': ('absolute', 0.005),
+    'roth_401k_percent': ('absolute', 0.02),
+    'trad_401k_percent': ('absolute', 0.02),
+    'employer_401k_match': ('absolute', 0.01),
+    'monthly_expenses': ('relative', 0.10),
+    'inflation_rate': ('absolute', 0.005)
+}
+
+# Display names for the inputs above
+INPUT_LABELS = {
+    'investment_return': 'Investment Return',
+    'savings_apy': 'Savings APY',
+    'annual_merit_increase': 'Merit Increase',
+    'roth_401k_percent': 'Roth 401k %',
+    'trad_401k_percent': 'Traditional 401k %',
+    'employer_401k_match': 'Employer Match',
+    'monthly_expenses': 'Monthly Expenses',
+    'inflation_rate': 'Inflation Rate'
+}
+
+def perturbed_values(value, perturbation):
+    """Return the (low, high) values of an input for a perturbation"""
+    kind, amount = perturbation
+    if kind == 'relative':
+        low, high = value * (1 - amount), value * (1 + amount)
+    else:
+        low, high = value - amount, value + amount
+    # Rates, percents and expenses cannot go negative
+    return max(low, 0.0), high
+
+@timed()
+def run_sensitivity_analysis(perturbations=None, **inputs):
+    """
+    Move each input in perturbations down and up, one at a time, and report the
+    effect on the final 'Total Balance' and on total retirement shortfall.
+
+    All 2 x inputs + 1 scenarios (the base case included) are evaluated in a
+    single batched projection. Returns one row per input, sorted by how much
+    it moves the final balance, with the base case in DataFrame.attrs.
+    """
+    perturbations = DEFAULT_PERTURBATIONS if perturbations is None else perturbations
+    inputs.setdefault('inflation_rate', INFLATION_RATE)
+    names = list(perturbations)
+
+    # Scenario 0 is the base case; scenarios 2i+1 and 2i+2 move input i down and up
+    n_scenarios = 2 * len(names) + 1
+    scenario_inputs = {
+        name: np.full(n_scenarios, float(inputs[name])) for name in names
+    }
+    rows = []
+    for i, name in enumerate(names):
+        low, high = perturbed_values(float(inputs[name]), perturbations[name])
+        scenario_inputs[name][2 * i + 1] = low
+        scenario_inputs[name][2 * i + 2] = high
+        rows.append({'Input': INPUT_LABELS.get(name, name), 'Low Value': low, 'High Value': high})
+
+    batch_inputs = dict(inputs)
+    batch_inputs.update(scenario_inputs)
+    batch = calculate_retirement_projections_batch(
+        **batch_inputs, fields=['Total Balance', 'Retirement Shortfall']
+    )
+    final_index = batch.n_years - 1
+    final_balance = batch.field('Total Balance')[np.arange(n_scenarios), final_index]
+    shortfall = total_shortfall(batch)
+
+    for i, row in enumerate(rows):
+        row['Final Balance (Low)'] = final_balance[2 * i + 1]
+        row['Final Balance (High)'] = final_balance[2 * i + 2]
+        row['Total Shortfall (Low)'] = shortfall[2 * i + 1]
+        row['Total Shortfall (High)'] = shortfall[2 * i + 2]
+
+    result = pd.DataFrame(rows)
+    result['Balance Swing'] = (result['Final Balance (High)'] - result['Final Balance (Low)']).abs()
+    result = result.sort_values('Balance Swing', ascending=False, ignore_index=True)
+    result.attrs['base_final_balance'] = float(final_balance[0])
+    result.attrs['base_total_shortfall'] = float(shortfall[0])
+    return result
@@ -0,0 +1,449 @@
+"""
+Local HTTP service running projections and tax estimates for other tools.
+
+    python service.py                                  # http://127.0.0.1:8600
+    python service.py --port 9000 --workers 4 --batch-window-ms 5
+
+    POST /projections  JSON object of calculate_retirement_projections inputs
+                       (glide_path as [[years to retirement, [stocks, bonds, cash]], ...])
+    POST /tax          {"income": 85000 or [85000, ...], "filing_status": "single"}
+    GET  /stats        p50/p99 latency, throughput and batch sizes
+
+Requests arriving within --batch-window-ms of each other are evaluated
+together: projections in one calculate_retirement_projections_batch call per
+filing status and glide path, tax estimates in one estimate_tax_impact_array
+call per filing status. Batches run on a pool of worker processes (one
+worker evaluates them on the batching thread). The service only listens on
+localhost.
+"""
+import argparse
+import ipaddress
+import json
+import math
+import queue
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from calculations import (
+    FILING_STATUSES,
+    PROJECTION_COLUMNS,
+    PROJECTION_INPUT_DEFAULTS,
+    PROJECTION_REQUIRED_INPUTS,
+    calculate_scenario_projections,
+    estimate_tax_impact_array
+)
+from glide_path import GlidePath
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+# Batches are evaluated in-process unless more workers are asked for: on one
+# core the pool only adds pickling, with several it overlaps large batches
+DEFAULT_WORKERS = 1
+DEFAULT_BATCH_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH_SIZE = 256
+
+# Seconds a request waits for its batch before failing
+REQUEST_TIMEOUT = 60.0
+
+# Latencies kept per endpoint for the percentiles in /stats
+LATENCY_WINDOW = 10000
+
+# Whole-number inputs
+INTEGER_INPUTS = ('current_age', 'retirement_age', 'steps_per_year')
+
+# Optional inputs that may be null
+NULLABLE_INPUTS = ('retirement_monthly_expenses', 'withdrawal_share', 'cash_return', 'glide_path')
+
+def _number(name, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"'{name}' must be a number")
+    return float(value)
+
+def parse_projection_request(body):
+    """Validated projection inputs from a decoded JSON request, raising ValueError on bad data"""
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    unknown = sorted(set(body) - set(PROJECTION_REQUIRED_INPUTS) - set(PROJECTION_INPUT_DEFAULTS))
+    if unknown:
+        raise ValueError(f"unknown inputs: {', '.join(unknown)}")
+    missing = [name for name in PROJECTION_REQUIRED_INPUTS if name not in body]
+    if missing:
+        raise ValueError(f"missing inputs: {', '.join(missing)}")
+
+    inputs = dict(PROJECTION_INPUT_DEFAULTS, **body)
+    for name, value in inputs.items():
+        if name == 'filing_status':
+            if value not in FILING_STATUSES:
+                raise ValueError(f"'filing_status' must be one of {', '.join(FILING_STATUSES)}")
+        elif name == 'glide_path':
+            if value is not None:
+                try:
+                    inputs[name] = GlidePath([(years, mix) for years, mix in value])
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"'glide_path': {e}") from None
+        elif value is None and name in NULLABLE_INPUTS:
+            continue
+        else:
+            inputs[name] = _number(name, value)
+            if name in INTEGER_INPUTS:
+                if not inputs[name].is_integer():
+                    raise ValueError(f"'{name}' must be a whole number")
+                inputs[name] = int(inputs[name])
+    if inputs['steps_per_year'] < 1:
+        raise ValueError("'steps_per_year' must be at least 1")
+    return inputs
+
+def parse_tax_request(body):
+    """(incomes, filing status, whether a single income was sent) from a decoded JSON request"""
+    if not isinstance(body, dict) or 'income' not in body:
+        raise ValueError("request body must be a JSON object with an 'income'")
+    filing_status = body.get('filing_status', "single")
+    if filing_status not in FILING_STATUSES:
+        raise ValueError(f"'filing_status' must be one of {', '.join(FILING_STATUSES)}")
+    income = body['income']
+    single = not isinstance(income, list)
+    incomes = [_number('income', value) for value in ([income] if single else income)]
+    return incomes, filing_status, single
+
+def _projection_response(values, current_age, retirement_age):
+    """JSON-ready projection: one row per year, NaN fields as null"""
+    rows = values.tolist()
+    for row in rows:
+        row[0] = int(row[0])
+        row[1] = int(row[1])
+        for k, value in enumerate(row):
+            if value != value:
+                row[k] = None
+    index = int(retirement_age - current_age)
+    return {
+        'columns': PROJECTION_COLUMNS,
+        'rows': rows,
+        'retirement_index': index if 0 <= index < len(rows) else None
+    }
+
+def evaluate_projections(requests):
+    """
+    Results for a list of parsed projection requests, in order: one batched
+    projection per filing status and glide path; per-paycheck or monthly
+    steps are projected one at a time
+    """
+    return [
+        _projection_response(result.values, result.current_age, result.retirement_age)
+        for result in calculate_scenario_projections(requests)
+    ]
+
+def evaluate_taxes(requests):
+    """Results for a list of parsed tax requests, in order: one tax evaluation per filing status"""
+    results = [None] * len(requests)
+    for filing_status in FILING_STATUSES:
+        positions = [i for i, (_, status, _) in enumerate(requests) if status == filing_status]
+        if not positions:
+            continue
+        incomes = [requests[i][0] for i in positions]
+        taxes = estimate_tax_impact_array(np.concatenate(incomes), filing_status).tolist()
+        start = 0
+        for i, request_incomes in zip(positions, incomes):
+            request_taxes = taxes[start:start + len(request_incomes)]
+            start += len(request_incomes)
+            results[i] = {'tax': request_taxes[0] if requests[i][2] else request_taxes}
+    return results
+
+def _evaluate_encoded(evaluate, items):
+    """evaluate(items) with each result encoded as a JSON response body, so workers send back bytes"""
+    return [json.dumps(result).encode() for result in evaluate(items)]
+
+def _warm_up():
+    """Runs once in each worker so the first batches do not pay for starting it"""
+    return None
+
+class MicroBatcher:
+    """
+    Collects items submitted within window seconds of the first (at most
+    max_batch_size) and evaluates them with one evaluate(items) call, on
+    executor when given, otherwise on the batching thread. At most
+    max_in_flight batches are evaluated at once; while they are, new items
+    wait and join the next batch. When a batch fails its items are evaluated
+    one by one, so only the ones that fail on their own get the error.
+    """
+    def __init__(self, evaluate, window, max_batch_size=DEFAULT_MAX_BATCH_SIZE, executor=None,
+                 max_in_flight=1, stats=None, name=None):
+        self.evaluate = evaluate
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.stats = stats
+        self.name = name or getattr(evaluate, '__name__', 'batch')
+        self._slots = threading.Semaphore(max_in_flight)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Future for the result of item"""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            self._slots.acquire()
+            # Past the window (e.g. after waiting for a slot) only what is queued joins
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        if self.stats is not None:
+            self.stats.record_batch(self.name, len(items))
+        if self.executor is None:
+            try:
+                self._evaluate_here(items, futures)
+            finally:
+                self._slots.release()
+        else:
+            self._evaluate_on_executor(items, futures, self._slots.release)
+
+    def _evaluate_here(self, items, futures):
+        try:
+            results = self.evaluate(items)
+        except Exception as e:
+            if len(items) == 1:
+                _fail(futures, e)
+                return
+            # One bad item must not fail the rest of its batch
+            for item, future in zip(items, futures):
+                self._evaluate_here([item], [future])
+            return
+        _resolve(futures, results)
+
+    def _evaluate_on_executor(self, items, futures, done):
+        """Evaluate items on the executor, calling done() once the batch has its results or failed"""
+        try:
+            evaluation = self.executor.submit(self.evaluate, items)
+        except Exception as e:
+            _fail(futures, e)
+            done()
+            return
+
+        def finished(evaluation):
+            error = evaluation.exception()
+            if error is None:
+                _resolve(futures, evaluation.result())
+            elif len(items) == 1:
+                _fail(futures, error)
+            else:
+                # One bad item must not fail the rest of its batch
+                for item, future in zip(items, futures):
+                    self._evaluate_on_executor([item], [future], lambda: None)
+            done()
+        evaluation.add_done_callback(finished)
+
+def _resolve(futures, results):
+    for future, result in zip(futures, results):
+        future.set_result(result)
+
+def _fail(futures, error):
+    for future in futures:
+        future.set_exception(error)
+
+class ServiceStats:
+    """Thread-safe request latencies, counts and batch sizes per endpoint"""
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._requests = {}
+        self._errors = {}
+        self._batches = {}
+
+    def record_request(self, endpoint, seconds, ok=True):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+            if not ok:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def record_batch(self, name, size):
+        with self._lock:
+            count, total, largest = self._batches.get(name, (0, 0, 0))
+            self._batches[name] = (count + 1, total + size, max(largest, size))
+
+    def snapshot(self):
+        """Latency percentiles (ms) over the last window requests, throughput since start and batch sizes"""
+        with self._lock:
+            latencies = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            requests = dict(self._requests)
+            errors = dict(self._errors)
+            batches = dict(self._batches)
+        uptime = time.perf_counter() - self.started
+        endpoints = {}
+        for endpoint, values in latencies.items():
+            p50, p99 = np.percentile(values, [50, 99]) * 1000
+            endpoints[endpoint] = {
+                'requests': requests[endpoint],
+                'errors': errors.get(endpoint, 0),
+                'p50_ms': round(float(p50), 3),
+                'p99_ms': round(float(p99), 3),
+                'throughput_per_s': round(requests[endpoint] / uptime, 3) if uptime > 0 else 0.0
+            }
+        return {
+            'uptime_s': round(uptime, 3),
+            'endpoints': endpoints,
+            'batches': {
+                name: {'batches': count, 'mean_size': round(total / count, 3), 'max_size': largest}
+                for name, (count, total, largest) in batches.items()
+            }
+        }
+
+class ProjectionService(ThreadingHTTPServer):
+    """HTTP server feeding requests to one MicroBatcher per endpoint"""
+    daemon_threads = True
+    request_queue_size = 128  # bursts of clients connecting at once
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                 batch_window_ms=DEFAULT_BATCH_WINDOW_MS, max_batch_size=DEFAULT_MAX_BATCH_SIZE, verbose=False):
+        if not _is_loopback(host):
+            raise ValueError(f"the service only listens on localhost, got {host}")
+        super().__init__((host, port), ServiceHandler)
+        self.verbose = verbose
+        self.stats = ServiceStats()
+        self.executor = None
+        if workers > 1:
+            # Started before any other thread, and warmed up so the first
+            # requests are not slowed by worker start-up
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            for future in [self.executor.submit(_warm_up) for _ in range(workers)]:
+                future.result()
+        window = batch_window_ms / 1000
+        in_flight = max(workers, 1)
+        self.batchers = {
+            path: MicroBatcher(
+                partial(_evaluate_encoded, evaluate), window, max_batch_size, self.executor,
+                in_flight, self.stats, name
+            )
+            for path, evaluate, name in [
+                ('/projections', evaluate_projections, 'projections'),
+                ('/tax', evaluate_taxes, 'tax')
+            ]
+        }
+        self.parsers = {'/projections': parse_projection_request, '/tax': parse_tax_request}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+def _is_loopback(host):
+    try:
+        return all(
+            ipaddress.ip_address(info[4][0]).is_loopback
+            for info in socket.getaddrinfo(host, None)
+        )
+    except (socket.gaierror, ValueError):
+        return False
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send(200, self.server.stats.snapshot())
+        else:
+            self._send(404, {'error': f"no such endpoint: {self.path}"})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        batcher = self.server.batchers.get(self.path)
+        if batcher is None:
+            self._send(404, {'error': f"no such endpoint: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            item = self.server.parsers[self.path](json.loads(self.rfile.read(length) or b'null'))
+        except ValueError as e:  # includes malformed JSON
+            status, response = 400, {'error': str(e)}
+        else:
+            try:
+                status, response = 200, batcher.submit(item).result(timeout=REQUEST_TIMEOUT)
+            except Exception as e:
+                status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+        self._send(status, response)
+        self.server.stats.record_request(self.path, time.perf_counter() - started, ok=status == 200)
+
+    def _send(self, status, payload):
+        """Send payload, a JSON-ready object or an already encoded body"""
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve projections and tax estimates over HTTP on localhost")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="loopback address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="worker processes evaluating batches (1 evaluates on the batching thread)")
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help="how long a batch waits for more requests after its first")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    try:
+        server = ProjectionService(
+            args.host, args.port, args.workers, args.batch_window_ms, args.max_batch_size, args.verbose
+        )
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"serving on {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import numpy as np
+from calculations import calculate_retirement_projections_batch
+
+# Candidates evaluated together in the first batched pass
+DEFAULT_GRID_SIZE = 41
+# Points evaluated together in each refining pass
+DEFAULT_REFINE_SIZE = 15
+
+def total_shortfall(batch):
+    """Total 'Retirement Shortfall' of each scenario over its own horizon"""
+    shortfall = np.nan_to_num(batch.field('Retirement Shortfall'))
+    in_horizon = np.arange(shortfall.shape[1]) < batch.n_years[:, None]
+    return (shortfall * in_horizon).sum(axis=1)
+
+def evaluate_solvency(inputs, name, candidates):
+    """
+    Run one batched projection with input name set to each candidate and
+    return whether each candidate leaves the plan without a shortfall
+    """
+    scenario_inputs = dict(inputs)
+    scenario_inputs[name] = np.asarray(candidates, dtype=float)
+    batch = calculate_retirement_projections_batch(
+        **scenario_inputs, fields=['Retirement Shortfall']
+    )
+    return total_shortfall(batch) <= 0
+
+def solve_for_input(inputs, name, low, high, solvent_above=True, grid_size=DEFAULT_GRID_SIZE,
+                    refine_size=DEFAULT_REFINE_SIZE, tolerance=1e-4, max_iterations=60):
+    """
+    Find the boundary value of input name between low and high where the plan
+    becomes solvent.
+
+    With solvent_above=True (more of the input helps, e.g. contributions) the
+    smallest solvent value is returned; otherwise (more of the input hurts,
+    e.g. expenses) the largest. A grid of candidates is evaluated in one batch
+    to bracket the boundary; each further batch evaluates refine_size points
+    inside the bracket, narrowing it refine_size + 1 times, until it is within
+    tolerance. Returns None when no candidate in the range is solvent.
+    """
+    candidates = np.linspace(low, high, grid_size)
+    solvent = evaluate_solvency(inputs, name, candidates)
+    if not solvent.any():
+        return None
+
+    if solvent_above:
+        first = int(np.argmax(solvent))
+        if first == 0:
+            return float(candidates[0])
+        failing, passing = candidates[first - 1], candidates[first]
+    else:
+        last = len(solvent) - 1 - int(np.argmax(solvent[::-1]))
+        if last == len(solvent) - 1:
+            return float(candidates[-1])
+        passing, failing = candidates[last], candidates[last + 1]
+
+    for _ in range(max_iterations):
+        if abs(passing - failing) <= tolerance:
+            break
+        # Points run from the failing end to the passing one; the first
+        # solvent point and the one before it are the new bracket
+        points = np.linspace(failing, passing, refine_size + 2)[1:-1]
+        solvent = evaluate_solvency(inputs, name, points)
+        if solvent.any():
+            first = int(np.argmax(solvent))
+            passing = points[first]
+            if first > 0:
+                failing = points[first - 1]
+        else:
+            failing = points[-1]
+    return float(passing)
+
+def find_minimum_contribution_percent(inputs, contribution='trad_401k_percent',
+                                      max_percent=1.0, tolerance=1e-4):
+    """
+    Smallest 401k contribution rate (as a fraction of salary) that keeps the
+    plan free of retirement shortfalls, or None if even max_percent falls short
+    """
+    return solve_for_input(inputs, contribution, 0.0, max_percent,
+                           solvent_above=True, tolerance=tolerance)
+
+def find_earliest_retirement_age(inputs, max_age=100):
+    """
+    Earliest whole retirement age that keeps the plan free of retirement
+    shortfalls, or None if no age up to max_age does. Every candidate age is
+    evaluated in a single batch.
+    """
+    ages = np.arange(int(inputs['current_age']) + 1, max_age + 1)
+    if len(ages) == 0:
+        return None
+    solvent = evaluate_solvency(inputs, 'retirement_age', ages)
+    if not solvent.any():
+        return None
+    return int(ages[np.argmax(solvent)])
+
+def find_maximum_monthly_expenses(inputs, max_expenses=None, tolerance=1.0):
+    """
+    Largest current monthly expenses that keep the plan free of retirement
+    shortfalls, to within tolerance dollars. The search range defaults to
+    zero up to the monthly salary.
+    """
+    if max_expenses is None:
+        max_expenses = max(inputs['annual_salary'] / 12, 1.0)
+    return solve_for_input(inputs, 'monthly_expenses', 0.0, max_expenses,
+                           solvent_above=False, tolerance=tolerance)
@@ -239,3 +239,15 @@ def apply_custom_styles():
         }
         </style>
     """, unsafe_allow_html=True)
+
+def projection_table_column_config(columns):
+    """
+    Column settings for showing a projection table in st.dataframe. Dollar
+    formatting is applied by the browser, so the data stays numeric and
+    columns sort by value.
+    """
+    return {
+        col: st.column_config.NumberColumn(col, format="dollar")
+        for col in columns
+        if col not in ('Age', 'Year')
+    }
@@ -0,0 +1,23 @@
+"""Fixtures shared by the tests"""
+import pytest
+
+@pytest.fixture
+def base_inputs():
+    """Projection inputs of a mid-career saver with all three accounts"""
+    return dict(
+        current_age=35,
+        retirement_age=65,
+        current_savings=50000.0,
+        current_trad_ira=50000.0,
+        current_trad_401k=50000.0,
+        annual_salary=100000.0,
+        annual_merit_increase=0.0325,
+        investment_return=0.06,
+        savings_apy=0.038,
+        roth_401k_percent=0.0,
+        trad_401k_percent=0.08,
+        employer_401k_match=0.06,
+        annual_ira_contribution=0.0,
+        monthly_expenses=4000.0,
+        filing_status="single"
+    )
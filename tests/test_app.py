@@ -0,0 +1,38 @@
+"""
+Closed tabs and expanders must not do their work: the Roth optimizer runs
+only once its expander is opened on the tax tab.
+"""
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import cache
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+def metric_labels(at):
+    return [metric.label for metric in at.metric]
+
+@pytest.fixture
+def app(monkeypatch):
+    # Keep the app off the on-disk result store
+    monkeypatch.setattr(cache, '_result_store', False)
+    at = AppTest.from_file(APP_FILE, default_timeout=120)
+    at.run()
+    assert not at.exception
+    return at
+
+def test_closed_tabs_are_not_drawn(app):
+    assert 'Lifetime Tax Estimate' not in metric_labels(app)
+    app.session_state['projection_tab'] = "Tax & Expense Impact"
+    app.run()
+    assert 'Lifetime Tax Estimate' in metric_labels(app)
+    assert 'Total Converted' not in metric_labels(app)
+
+def test_roth_plan_runs_when_its_expander_opens(app):
+    app.session_state['projection_tab'] = "Tax & Expense Impact"
+    app.session_state['roth_plan'] = True
+    app.run()
+    assert not app.exception
+    assert {'Total Converted', 'Lifetime Tax with Conversions', 'Tax Saved'} <= set(metric_labels(app))
@@ -0,0 +1,68 @@
+"""
+Cached results must never outlive what they were computed from: a new
+engine version, other inputs or another dataset give a new key, and the
+in-memory cache keeps within its byte budget.
+"""
+import numpy as np
+import pytest
+
+import cache
+from cache import LRUCache, ResultStore, cached_projection, content_key, engine_version, estimate_size
+from calculations import calculate_retirement_projections
+from monte_carlo import run_monte_carlo_simulation
+from roth_conversion import optimize_roth_conversions
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    yield store
+    store.close()
+
+def test_engine_version_follows_engine_source(tmp_path, monkeypatch):
+    module = tmp_path / 'engine_under_test.py'
+    module.write_text("RATE = 0.05\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(cache, 'ENGINE_MODULES', ('engine_under_test',))
+    engine_version.cache_clear()
+    try:
+        before = engine_version()
+        assert engine_version() == before
+        module.write_text("RATE = 0.06\n")
+        engine_version.cache_clear()
+        assert engine_version() != before
+    finally:
+        engine_version.cache_clear()
+
+def test_cache_budget_counts_result_arrays(base_inputs):
+    simulation = run_monte_carlo_simulation(**base_inputs, n_paths=2000, seed=1, keep_paths=True)
+    assert estimate_size(simulation) >= simulation.total_balance.nbytes
+    plan = optimize_roth_conversions(**base_inputs)
+    assert estimate_size(plan) >= plan.conversions.nbytes + plan.taxes.nbytes
+
+    lru = LRUCache(max_bytes=estimate_size(simulation) + 1000)
+    lru.put('first', simulation)
+    lru.put('second', simulation)
+    assert 'first' not in lru and 'second' in lru
+
+def test_content_key_hashes_arrays_by_content():
+    values = np.arange(2000.0)
+    changed = values.copy()
+    changed[-1] += 1
+    assert content_key(('x', values)) == content_key(('x', values.copy()))
+    assert content_key(('x', values)) != content_key(('x', changed))
+
+def test_cached_projection_shares_keys_between_memory_and_store(store, base_inputs):
+    calls = []
+    def project(**inputs):
+        calls.append(inputs)
+        return calculate_retirement_projections(**inputs)
+
+    first = cached_projection(project, base_inputs, cache=LRUCache(), store=store)
+    # A new process: empty memory, same store
+    second = cached_projection(project, base_inputs, cache=LRUCache(), store=store)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first.values, second.values)
+
+    cached_projection(project, dict(base_inputs, investment_return=0.07), cache=LRUCache(), store=store)
+    cached_projection(project, base_inputs, cache=LRUCache(), store=store, depends_on=('dataset', 2))
+    assert len(calls) == 3
@@ -0,0 +1,71 @@
+"""
+The CLI must write the same numbers as projecting each profile on its own,
+whatever the chunking and filing-status mix, and reject bad rows by line.
+"""
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+
+import cli
+from cache import ResultStore
+from calculations import PROJECTION_COLUMNS, calculate_retirement_projections
+
+def profiles_csv(profiles):
+    stream = io.StringIO()
+    writer = csv.DictWriter(stream, fieldnames=['id'] + list(profiles[0]))
+    writer.writeheader()
+    for i, profile in enumerate(profiles):
+        writer.writerow(dict(profile, id=f'p{i}'))
+    stream.seek(0)
+    return stream
+
+@pytest.fixture
+def profiles(base_inputs):
+    return [
+        base_inputs,
+        dict(base_inputs, filing_status="married", annual_salary=180000.0),
+        dict(base_inputs, retirement_age=60, monthly_expenses=6000.0),
+        dict(base_inputs, current_age=50, investment_return=0.04)
+    ]
+
+def test_summary_matches_scalar_projections(profiles):
+    output = io.StringIO()
+    assert cli.run(profiles_csv(profiles), output, chunk_size=3) == len(profiles)
+    rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert [row['id'] for row in rows] == ['p0', 'p1', 'p2', 'p3']
+    for row, inputs in zip(rows, profiles):
+        projection = calculate_retirement_projections(**inputs)
+        assert row['filing_status'] == inputs['filing_status']
+        assert float(row['final_balance']) == pytest.approx(projection['Total Balance'][-1], abs=0.01)
+        assert float(row['total_taxes_paid']) == pytest.approx(np.nansum(projection['Taxes Paid']), abs=0.01)
+        assert float(row['total_shortfall']) == pytest.approx(np.nansum(projection['Retirement Shortfall']), abs=0.01)
+        assert int(row['retirement_year']) == projection.value_at_age('Year', inputs['retirement_age'])
+
+def test_per_year_rows_match_scalar_projections(profiles):
+    output = io.StringIO()
+    cli.run(profiles_csv(profiles), output, fmt='jsonl', per_year=True, chunk_size=2)
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    for profile_id, inputs in zip(['p0', 'p1', 'p2', 'p3'], profiles):
+        values = np.array([[np.nan if row[name] is None else row[name] for name in PROJECTION_COLUMNS]
+                           for row in rows if row['id'] == profile_id])
+        np.testing.assert_array_equal(values, calculate_retirement_projections(**inputs).values)
+
+def test_bad_rows_are_reported_by_line(profiles):
+    bad = dict(profiles[0], filing_status="widowed")
+    with pytest.raises(ValueError, match="line 3: unknown filing_status"):
+        cli.run(profiles_csv([profiles[0], bad]), io.StringIO())
+    stream = profiles_csv(profiles)
+    with pytest.raises(ValueError, match="missing columns: annual_salary"):
+        cli.run(io.StringIO(stream.getvalue().replace('annual_salary', 'salary')), io.StringIO())
+
+def test_store_reuses_chunks_of_earlier_runs(profiles, tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    first, second = io.StringIO(), io.StringIO()
+    cli.run(profiles_csv(profiles), first, store=store)
+    monkeypatch.setattr(cli, 'project_chunk', lambda *args: pytest.fail("chunk projected again"))
+    cli.run(profiles_csv(profiles), second, store=store)
+    assert first.getvalue() == second.getvalue()
+    store.close()
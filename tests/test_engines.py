@@ -0,0 +1,104 @@
+"""
+The projection engines must agree: every batched scenario equals the scalar
+projection of the same inputs, whatever else is in its batch. The default
+savings-first strategy must keep producing its recorded results.
+"""
+import json
+import os
+
+import numpy as np
+
+from calculations import (
+    INFLATION_RATE,
+    PROJECTION_INPUT_DEFAULTS,
+    PROJECTION_COLUMNS,
+    calculate_retirement_projections,
+    calculate_retirement_projections_batch,
+    calculate_scenario_projections,
+    projection_investment_returns
+)
+from constants import CURRENT_YEAR
+from glide_path import target_date_glide_path
+
+# Savings-first projections recorded before the other withdrawal strategies were added
+SAVINGS_FIRST_BASELINE = os.path.join(os.path.dirname(__file__), 'data', 'savings_first_baseline.json')
+
+def batch_scenario(batch, scenario):
+    """One scenario of a BatchProjections as a (year x field) array"""
+    return batch.data[:, :int(batch.n_years[scenario]), scenario].T
+
+def assert_same(actual, expected):
+    np.testing.assert_array_equal(actual, expected)
+
+def test_mixed_inflation_batch_matches_each_rate_alone(base_inputs):
+    rates = np.array([INFLATION_RATE, 0.025, 0.03])
+    mixed = calculate_retirement_projections_batch(**base_inputs, inflation_rate=rates)
+    for scenario, rate in enumerate(rates):
+        alone = calculate_retirement_projections_batch(**base_inputs, inflation_rate=rate)
+        assert_same(batch_scenario(mixed, scenario), batch_scenario(alone, 0))
+    assert_same(batch_scenario(mixed, 0), calculate_retirement_projections(**base_inputs).values)
+
+def test_unadjusted_batch_returns_match_scalar(base_inputs):
+    # Given the scalar engine's own yearly returns, the batch engine must not step them down or cut them again
+    inputs = dict(PROJECTION_INPUT_DEFAULTS, **base_inputs)
+    expected = calculate_retirement_projections(**base_inputs).values
+    years_to_retirement = base_inputs['retirement_age'] - base_inputs['current_age'] - np.arange(len(expected))
+    returns = projection_investment_returns(inputs, years_to_retirement)
+    batch = calculate_retirement_projections_batch(
+        **dict(base_inputs, investment_return=returns[np.newaxis]), adjust_returns=False)
+    assert_same(batch_scenario(batch, 0), expected)
+
+def test_mixed_strategy_batch_matches_scalar(base_inputs):
+    # Savings first next to the other strategies in one batch
+    strategies = [
+        dict(withdrawal_share=0.0, fill_income=0.0),
+        dict(withdrawal_share=0.5, fill_income=0.0),
+        dict(withdrawal_share=None, fill_income=0.0),
+        dict(withdrawal_share=0.0, fill_income=60000.0)
+    ]
+    inputs = dict(base_inputs, current_trad_401k=400000.0)
+    batch = calculate_retirement_projections_batch(
+        **inputs,
+        withdrawal_share=np.array([np.nan if s['withdrawal_share'] is None else s['withdrawal_share'] for s in strategies]),
+        fill_income=np.array([s['fill_income'] for s in strategies])
+    )
+    for scenario, strategy in enumerate(strategies):
+        assert_same(batch_scenario(batch, scenario), calculate_retirement_projections(**inputs, **strategy).values)
+
+def test_batch_sweep_matches_scalar(base_inputs):
+    ages = np.array([55, 60, 62, 65, 67, 70])
+    returns = np.array([0.03, 0.045, 0.06, 0.07, 0.08, 0.1])
+    for filing_status in ('single', 'married'):
+        inputs = dict(base_inputs, filing_status=filing_status, retirement_monthly_expenses=5000.0)
+        batch = calculate_retirement_projections_batch(**dict(inputs, retirement_age=ages, investment_return=returns))
+        for scenario, (age, rate) in enumerate(zip(ages, returns)):
+            expected = calculate_retirement_projections(**dict(inputs, retirement_age=int(age), investment_return=float(rate)))
+            assert_same(batch_scenario(batch, scenario), expected.values)
+
+def test_scenario_projections_match_scalar(base_inputs):
+    glide_path = target_date_glide_path()
+    scenarios = [
+        base_inputs,
+        dict(base_inputs, filing_status="married", annual_salary=150000.0),
+        dict(base_inputs, glide_path=glide_path),
+        dict(base_inputs, steps_per_year=12),
+        dict(base_inputs, retirement_age=60, steps_per_year=26, glide_path=glide_path),
+        dict(base_inputs, withdrawal_share=None, current_trad_401k=300000.0)
+    ]
+    for inputs, result in zip(scenarios, calculate_scenario_projections(scenarios)):
+        assert_same(result.values, calculate_retirement_projections(**inputs).values)
+
+def test_savings_first_matches_baseline(base_inputs):
+    with open(SAVINGS_FIRST_BASELINE) as f:
+        baseline = json.load(f)
+    assert baseline['columns'] == list(PROJECTION_COLUMNS)
+    for case in baseline['cases']:
+        inputs = dict(base_inputs, **case['inputs'])
+        expected = np.array(case['values'], dtype=float)
+        # The baseline was recorded in one calendar year; projections start in the current one
+        expected[:, PROJECTION_COLUMNS.index('Year')] = CURRENT_YEAR + np.arange(len(expected))
+        assert_same(calculate_retirement_projections(**inputs).values, expected)
+        assert_same(calculate_retirement_projections(**inputs, withdrawal_share=0.0, fill_income=0.0).values, expected)
+        if inputs.get('steps_per_year', 1) == 1:
+            batch = calculate_retirement_projections_batch(**inputs)
+            assert_same(batch_scenario(batch, 0), expected)
@@ -0,0 +1,49 @@
+"""
+A glide path's mix must interpolate between its breakpoints and hold flat
+outside them, and a single-asset path must earn exactly that asset.
+"""
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections, calculate_retirement_projections_batch
+from glide_path import GlidePath, investment_returns, portfolio_returns, target_date_glide_path
+from monte_carlo import simulate_paths
+
+def test_mix_interpolates_and_holds_flat():
+    path = GlidePath([(20, (80, 20, 0)), (0, (0.4, 0.5, 0.1))])
+    np.testing.assert_allclose(path.weights(30), [0.8, 0.2, 0.0])
+    np.testing.assert_allclose(path.weights(10), [0.6, 0.35, 0.05])
+    np.testing.assert_allclose(path.weights(-5), [0.4, 0.5, 0.1])
+    np.testing.assert_allclose(path.weights(np.arange(-10, 40)).sum(axis=0), 1.0)
+
+def test_paths_are_compared_by_normalized_breakpoints():
+    assert GlidePath([(0, (1, 1, 0))]) == GlidePath([(0, (0.5, 0.5, 0.0))])
+    assert hash(target_date_glide_path()) == hash(target_date_glide_path())
+    assert target_date_glide_path() != target_date_glide_path(stocks_early=0.8)
+
+@pytest.mark.parametrize('breakpoints', [[], [(0, (1, 0))], [(0, (-1, 1, 1))], [(5, (1, 0, 0)), (5, (0, 1, 0))]])
+def test_invalid_breakpoints_are_rejected(breakpoints):
+    with pytest.raises(ValueError):
+        GlidePath(breakpoints)
+
+def test_portfolio_returns_weight_each_path():
+    weights = np.array([[0.6], [0.3], [0.1]])  # (asset x year)
+    returns = np.random.default_rng(0).normal(0.05, 0.1, (3, 1, 100))  # (asset x year x path)
+    np.testing.assert_allclose(portfolio_returns(weights[..., None], returns), np.einsum('a,ayp->yp', weights[:, 0], returns))
+
+def test_all_stock_path_earns_the_stock_return_without_step_down(base_inputs):
+    stocks_only = GlidePath([(0, (1, 0, 0))])
+    np.testing.assert_allclose(investment_returns(np.arange(-5, 30), 0.07, 0.03, 0.02, stocks_only), 0.07)
+    flat = calculate_retirement_projections(**base_inputs, glide_path=stocks_only)
+    batch = calculate_retirement_projections_batch(
+        **dict(base_inputs, investment_return=np.full((1, len(flat)), 0.06)), adjust_returns=False)
+    np.testing.assert_array_equal(flat.values, batch.data[:, :len(flat), 0].T)
+
+def test_monte_carlo_draws_each_asset_for_a_glide_path(base_inputs):
+    glide = target_date_glide_path()
+    with_glide, _ = simulate_paths(**base_inputs, glide_path=glide, n_paths=200, seed=3)
+    without, _ = simulate_paths(**base_inputs, n_paths=200, seed=3)
+    assert with_glide.shape == without.shape
+    assert not np.array_equal(with_glide, without)
+    # Same seed, same draws
+    np.testing.assert_array_equal(with_glide, simulate_paths(**base_inputs, glide_path=glide, n_paths=200, seed=3)[0])
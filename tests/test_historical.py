@@ -0,0 +1,65 @@
+"""
+Historical resampling must keep blocks of consecutive history together,
+compound monthly data into years, and feed the engine the rates it drew.
+"""
+import numpy as np
+import pytest
+
+import historical
+from calculations import calculate_retirement_projections_batch
+from constants import INFLATION_RATE
+from historical import bootstrap_rates, dataset_fingerprint, load_historical_returns, write_dataset
+from monte_carlo import simulate_paths
+
+def write_marked_dataset(path, n_rows, periods_per_year=1):
+    """Rates that identify the row they came from"""
+    rows = np.arange(n_rows, dtype=float)
+    write_dataset(str(path), year=1900 + rows // periods_per_year, stocks=rows / 1e4, bonds=rows / 1e5,
+                  cash=rows / 1e6, inflation=np.full(n_rows, 0.02), periods_per_year=periods_per_year)
+    return load_historical_returns(str(path))
+
+def test_blocks_are_consecutive_years_of_history(tmp_path):
+    dataset = write_marked_dataset(tmp_path, 50)
+    sampled = dataset.block_bootstrap(np.random.default_rng(0), n_paths=200, n_years=23, block_years=5)
+    rows = np.rint(sampled['stocks'] * 1e4).astype(int)
+    assert rows.shape == (200, 23)
+    within_block = (np.arange(1, 23) % 5) != 0
+    assert ((rows[:, 1:] - rows[:, :-1]) % 50 == 1)[:, within_block].all()
+    np.testing.assert_allclose(sampled['bonds'], rows / 1e5)
+
+def test_monthly_rows_compound_to_years(tmp_path):
+    dataset = write_marked_dataset(tmp_path, 36, periods_per_year=12)
+    annual = dataset.annual_rates('stocks')
+    months = np.arange(36) / 1e4
+    assert annual[0] == pytest.approx(np.prod(1 + months[:12]) - 1)
+    assert annual[30] == pytest.approx(np.prod(1 + months[np.arange(30, 42) % 36]) - 1)
+
+def test_constant_history_projects_like_constant_rates(tmp_path, base_inputs):
+    n_rows = 40
+    write_dataset(str(tmp_path), year=np.arange(n_rows), stocks=np.full(n_rows, 0.07), bonds=np.full(n_rows, 0.03),
+                  cash=np.full(n_rows, 0.02), inflation=np.full(n_rows, INFLATION_RATE))
+    balances, shortfall = simulate_paths(**base_inputs, n_paths=3, seed=1, historical=str(tmp_path),
+                                         stock_allocation=0.5)
+    n_years = balances.shape[1]
+    expected = calculate_retirement_projections_batch(
+        **dict(base_inputs, investment_return=np.full((1, n_years), 0.05), savings_apy=np.full((1, n_years), 0.02)),
+        fields=['Total Balance'], round_values=False, adjust_returns=False
+    )
+    for path in balances:
+        np.testing.assert_allclose(path, expected.field('Total Balance')[0])
+
+def test_fingerprint_follows_the_files(tmp_path):
+    assert dataset_fingerprint(str(tmp_path / 'missing')) is None
+    write_marked_dataset(tmp_path, 10)
+    before = dataset_fingerprint(str(tmp_path))
+    write_marked_dataset(tmp_path, 11)
+    assert dataset_fingerprint(str(tmp_path)) != before
+
+def test_convert_reads_percent_csv(tmp_path):
+    source = tmp_path / 'returns.csv'
+    source.write_text("year,stocks,bonds,cash,inflation\n2000,-9.1,11.6,5.8,3.4\n2001,-11.9,8.4,3.4,1.6\n")
+    assert historical.main(['convert', str(source), str(tmp_path / 'data'), '--percent']) == 0
+    dataset = load_historical_returns(str(tmp_path / 'data'))
+    np.testing.assert_allclose(dataset['stocks'], [-0.091, -0.119])
+    stocks, bonds, cash, inflation = bootstrap_rates(dataset, np.random.default_rng(0), 4, 3, stock_allocation=None)
+    assert stocks.shape == (4, 3) and (cash >= 0).all()
@@ -0,0 +1,27 @@
+"""
+The calculation core must import without pandas or plotly, so the CLI,
+the service and worker processes start quickly.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_MODULES = [
+    'calculations', 'cache', 'cli', 'glide_path', 'historical', 'monte_carlo',
+    'parallel', 'roth_conversion', 'service', 'solver', 'withdrawals'
+]
+
+@pytest.mark.parametrize('module', CORE_MODULES)
+def test_core_imports_without_pandas_or_plotly(module):
+    code = f"import sys, {module}; print(sorted(m for m in ('pandas', 'plotly') if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+def test_dataframes_are_still_available(base_inputs):
+    from calculations import calculate_retirement_projections
+    frame = calculate_retirement_projections(**base_inputs).to_frame()
+    assert frame['Age'].iloc[0] == base_inputs['current_age']
@@ -0,0 +1,48 @@
+"""
+An incremental rerun must equal projecting from scratch, and replay only the
+years an edit can affect.
+"""
+import numpy as np
+import pytest
+
+from calculations import IncrementalProjection, calculate_retirement_projections
+from glide_path import target_date_glide_path
+
+def assert_same(actual, expected):
+    np.testing.assert_array_equal(actual, expected)
+
+@pytest.mark.parametrize('steps_per_year', [1, 12, 26])
+def test_incremental_matches_full_recompute(steps_per_year, base_inputs):
+    base = dict(base_inputs, steps_per_year=steps_per_year)
+    edits = [
+        ('retirement_monthly_expenses', 3000.0),
+        ('retirement_monthly_expenses', 3500.0),
+        ('withdrawal_share', 0.5),
+        ('retirement_age', 62),
+        ('investment_return', 0.07),
+        ('glide_path', target_date_glide_path()),
+        ('current_savings', 80000.0),
+        ('current_age', 40),
+        ('retirement_age', 67)
+    ]
+    projector = IncrementalProjection()
+    inputs = dict(base)
+    assert_same(projector.project(**inputs).values, calculate_retirement_projections(**inputs).values)
+    for name, value in edits:
+        inputs[name] = value
+        assert_same(projector.project(**inputs).values, calculate_retirement_projections(**inputs).values)
+    # Rerunning unchanged inputs replays nothing
+    projector.project(**inputs)
+    assert projector.last_start_year == len(projector.values)
+
+def test_incremental_resumes_after_working_years(base_inputs):
+    projector = IncrementalProjection()
+    projector.project(**base_inputs)
+    projector.project(**dict(base_inputs, retirement_monthly_expenses=3000.0))
+    assert projector.last_start_year == base_inputs['retirement_age'] - base_inputs['current_age']
+
+def test_incremental_replays_everything_after_an_early_edit(base_inputs):
+    projector = IncrementalProjection()
+    projector.project(**base_inputs)
+    projector.project(**dict(base_inputs, current_savings=60000.0))
+    assert projector.last_start_year == 0
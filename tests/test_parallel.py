@@ -0,0 +1,29 @@
+"""
+Parallel runs must not depend on the number of workers, and a parallel batch
+must equal the single-process one.
+"""
+import numpy as np
+
+from calculations import calculate_retirement_projections_batch
+from parallel import calculate_retirement_projections_batch_parallel, run_monte_carlo_parallel
+
+def test_monte_carlo_is_the_same_for_any_number_of_workers(base_inputs):
+    runs = [
+        run_monte_carlo_parallel(**base_inputs, n_paths=600, seed=7, chunk_size=250, keep_paths=True, workers=workers)
+        for workers in (1, 3)
+    ]
+    np.testing.assert_array_equal(runs[0].total_balance, runs[1].total_balance)
+    np.testing.assert_array_equal(runs[0].depletion_ages, runs[1].depletion_ages)
+    for level in runs[0].percentiles:
+        np.testing.assert_array_equal(runs[0].percentiles[level], runs[1].percentiles[level])
+    # Chunks draw from different streams
+    assert not np.array_equal(runs[0].total_balance[:250], runs[0].total_balance[250:500])
+
+def test_parallel_batch_matches_single_process(base_inputs):
+    inputs = dict(base_inputs, retirement_age=np.arange(55, 70), investment_return=np.linspace(0.03, 0.09, 15))
+    expected = calculate_retirement_projections_batch(**inputs)
+    batch = calculate_retirement_projections_batch_parallel(**inputs, workers=2, chunk_size=4)
+    np.testing.assert_array_equal(batch.n_years, expected.n_years)
+    for scenario, n_years in enumerate(expected.n_years):
+        np.testing.assert_array_equal(batch.data[:, :n_years, scenario], expected.data[:, :n_years, scenario])
+        assert np.isnan(batch.data[:, n_years:, scenario]).all()
@@ -0,0 +1,52 @@
+"""
+Spans are recorded only on threads that are recording, and recording stops
+even when the block raises.
+"""
+import json
+import threading
+
+import pytest
+
+import profiling
+from calculations import calculate_retirement_projections
+
+def test_recording_collects_spans_and_timed_calls(base_inputs):
+    with profiling.recording() as profile:
+        with profiling.span("outer"):
+            calculate_retirement_projections(**base_inputs)
+            calculate_retirement_projections(**base_inputs)
+    calls = {row['span']: row['calls'] for row in profile.summary()}
+    assert calls['outer'] == 1
+    assert calls['calculations.calculate_retirement_projections'] == 2
+    trace = json.loads(profile.to_chrome_trace())['traceEvents']
+    assert {event['name'] for event in trace} == set(calls)
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace)
+    assert profiling.current() is None
+
+def test_other_threads_are_not_recorded():
+    seen = []
+    def work():
+        with profiling.span("other thread"):
+            seen.append(profiling.current())
+
+    with profiling.recording() as profile:
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    assert seen == [None]
+    assert profile.summary() == []
+
+def test_recording_stops_when_the_block_raises():
+    with pytest.raises(RuntimeError):
+        with profiling.recording():
+            raise RuntimeError
+    assert profiling.current() is None
+    assert profiling._active == 0
+
+def test_events_past_the_limit_are_counted_not_kept():
+    with profiling.recording(profiling.Profile(max_events=3)) as profile:
+        for _ in range(5):
+            with profiling.span("step"):
+                pass
+    assert len(profile.events) == 3 and profile.dropped == 2
+    assert profile.summary()[0]['calls'] == 5
@@ -0,0 +1,35 @@
+"""
+ProjectionResult lookups must agree with its table form, and views must not
+copy the underlying array.
+"""
+import numpy as np
+import pytest
+
+from calculations import PROJECTION_COLUMNS, calculate_retirement_projections
+from constants import CURRENT_YEAR
+
+def test_lookups_match_the_table(base_inputs):
+    result = calculate_retirement_projections(**base_inputs)
+    frame = result.to_frame()
+    assert list(frame.columns) == result.columns == list(PROJECTION_COLUMNS)
+    assert len(result) == len(frame) == base_inputs['retirement_age'] - base_inputs['current_age'] + 30
+    assert result.values.flags.f_contiguous and result.nbytes == result.values.nbytes
+
+    row = frame.set_index('Age').loc[70]
+    assert result.value_at_age('Total Balance', 70) == row['Total Balance']
+    assert result.value_at_year('Taxes Paid', CURRENT_YEAR + 35) == row['Taxes Paid']
+    assert result.retirement_index == 30
+    assert result.total('Retirement Shortfall') == np.nansum(frame['Retirement Shortfall'])
+    assert 'Total Balance' in result and 'Net Worth' not in result
+
+def test_fields_are_views(base_inputs):
+    result = calculate_retirement_projections(**base_inputs)
+    assert np.shares_memory(result['Total Balance'], result.values)
+    assert np.shares_memory(result.to_frame()['Total Balance'].to_numpy(), result.values)
+
+def test_lookups_outside_the_projection_raise(base_inputs):
+    result = calculate_retirement_projections(**base_inputs)
+    with pytest.raises(KeyError):
+        result.value_at_age('Total Balance', base_inputs['current_age'] - 1)
+    with pytest.raises(KeyError):
+        result.value_at_year('Total Balance', CURRENT_YEAR + len(result))
@@ -0,0 +1,73 @@
+"""
+The on-disk result store is shared by every process that opens it, keyed by
+engine version, keeps within its byte budget and never makes readers wait
+for a writer.
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from cache import ResultStore, content_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite'), max_bytes=100_000)
+    yield store
+    store.close()
+
+def test_store_entries_are_keyed_by_engine_version(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    old, new = ResultStore(path, version='old'), ResultStore(path, version='new')
+    old.put('key', 1)
+    assert old.get('key') == 1
+    assert new.get('key') is None
+    assert content_key('key', 'old') != content_key('key', 'new')
+    old.close()
+    new.close()
+
+def test_store_evicts_least_recently_used_within_budget(store):
+    blobs = {i: np.random.default_rng(i).bytes(9000) for i in range(30)}
+    for i, blob in blobs.items():
+        store.put(i, blob)
+        if i % 5 == 0:
+            assert store.get(0) is not None  # kept in use, so it outlives older entries
+    stats = store.stats()
+    stored = sqlite3.connect(store.path).execute("SELECT total(size) FROM entries").fetchone()[0]
+    assert stats['bytes'] == stored <= store.max_bytes
+    assert stats['evictions'] == 30 - stats['entries']
+    assert 0 in store and 29 in store and 1 not in store
+    # Replacing an entry counts only the change in size
+    store.put(29, b'x')
+    assert store.stats()['bytes'] == sqlite3.connect(store.path).execute("SELECT total(size) FROM entries").fetchone()[0]
+
+def test_store_reads_do_not_wait_for_writers(store):
+    store.put('key', 'value')
+    writer = sqlite3.connect(store.path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.perf_counter()
+        assert [store.get('key') for _ in range(300)] == ['value'] * 300
+        assert store.flush(wait=False) is False
+        assert time.perf_counter() - started < store.timeout
+    finally:
+        writer.execute("COMMIT")
+        writer.close()
+    assert store.stats()['hits'] == 300
+
+def test_store_is_shared_between_processes(store):
+    code = (
+        "import sys; from cache import ResultStore; "
+        "store = ResultStore(sys.argv[1], version=sys.argv[2]); store.put(('answer', 1), [42.0]); store.close()"
+    )
+    subprocess.run([sys.executable, '-c', code, store.path, store.version], check=True, cwd=ROOT)
+    assert store.get(('answer', 1)) == [42.0]
+    calls = []
+    assert store.get_or_compute(('answer', 1), lambda: calls.append(1)) == [42.0]
+    assert calls == []
@@ -0,0 +1,41 @@
+"""
+A Roth conversion plan must never cost more lifetime tax than converting
+nothing, and only ever convert what the traditional accounts hold.
+"""
+import numpy as np
+import pytest
+
+from roth_conversion import optimize_roth_conversions
+
+@pytest.mark.parametrize('options', [
+    {},
+    dict(terminal_tax_rate=0.0, discount_rate=0.0),
+    dict(terminal_tax_rate=0.5, n_grid=11),
+    dict(filing_status="married", retirement_monthly_expenses=6000.0)
+])
+def test_plan_never_costs_more_than_no_conversions(base_inputs, options):
+    plan = optimize_roth_conversions(**dict(base_inputs, **options))
+    assert plan.tax_savings >= 0
+    assert (plan.conversions >= 0).all() and (plan.traditional_balance >= 0).all()
+    assert (plan.roth_balance >= 0).all()
+    assert plan.conversions[0] == 0
+
+def test_lifetime_tax_adds_up(base_inputs):
+    plan = optimize_roth_conversions(**base_inputs, discount_rate=0.0)
+    assert plan.lifetime_tax == pytest.approx(plan.taxes.sum() + plan.terminal_tax)
+    assert plan.baseline_lifetime_tax == pytest.approx(plan.baseline_taxes.sum() + plan.baseline_terminal_tax)
+    assert plan.total_converted == pytest.approx(plan.conversions.sum())
+
+def test_nothing_to_convert(base_inputs):
+    plan = optimize_roth_conversions(**dict(base_inputs, current_trad_ira=0.0, current_trad_401k=0.0,
+                                            trad_401k_percent=0.0, employer_401k_match=0.0))
+    # Contributions are inferred from fields rounded to cents
+    assert plan.total_converted == pytest.approx(0, abs=0.05)
+    assert plan.tax_savings == pytest.approx(0, abs=0.05)
+    np.testing.assert_allclose(plan.taxes, plan.baseline_taxes, rtol=0, atol=0.05)
+
+def test_table_has_a_row_per_year(base_inputs):
+    plan = optimize_roth_conversions(**base_inputs)
+    frame = plan.to_frame()
+    assert len(frame) == len(plan.years)
+    np.testing.assert_array_equal(frame['Roth Conversion'], plan.conversions)
@@ -0,0 +1,58 @@
+"""
+A scenario workspace must project only scenarios whose inputs changed, and
+its comparisons must line scenarios up by year.
+"""
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections
+from scenarios import ScenarioWorkspace, scenario_curves, scenario_differences, scenario_summary
+
+@pytest.fixture
+def workspace(base_inputs):
+    workspace = ScenarioWorkspace(max_scenarios=3)
+    workspace.save("Current plan", base_inputs)
+    workspace.save("Retire early", dict(base_inputs, retirement_age=60))
+    return workspace
+
+def test_only_changed_scenarios_are_projected(workspace, base_inputs):
+    results = workspace.evaluate()
+    assert workspace.last_computed == ["Current plan", "Retire early"]
+    np.testing.assert_array_equal(results["Retire early"].values,
+                                  calculate_retirement_projections(**dict(base_inputs, retirement_age=60)).values)
+
+    workspace.save("Save more", dict(base_inputs, trad_401k_percent=0.15))
+    workspace.evaluate()
+    assert workspace.last_computed == ["Save more"]
+    workspace.save("Current plan", dict(base_inputs, monthly_expenses=3500.0))
+    assert workspace.stale() == ["Current plan"]
+    workspace.evaluate()
+    assert workspace.evaluate() and workspace.last_computed == []
+
+def test_names_and_limits(workspace, base_inputs):
+    with pytest.raises(ValueError, match="needs a name"):
+        workspace.save("  ", base_inputs)
+    workspace.save("Third", base_inputs)
+    with pytest.raises(ValueError, match="at most 3"):
+        workspace.save("Fourth", base_inputs)
+    workspace.save("Third", dict(base_inputs, investment_return=0.05))  # replacing is allowed
+    workspace.remove("Third")
+    assert list(workspace) == ["Current plan", "Retire early"]
+
+def test_comparisons_line_up_by_year(workspace, base_inputs):
+    workspace.save("Start later", dict(base_inputs, current_age=40))
+    results = workspace.evaluate()
+    curves = scenario_curves(results)
+    assert curves.index[0] == results["Current plan"]['Year'][0]
+    # A shorter horizon ends earlier
+    assert np.isnan(curves["Start later"].iloc[-1]) and not np.isnan(curves["Current plan"].iloc[-1])
+
+    differences = scenario_differences(results, "Current plan")
+    early, current = results["Retire early"]['Total Balance'], results["Current plan"]['Total Balance']
+    comparison = differences["Retire early vs Current plan"].to_numpy()
+    np.testing.assert_allclose(comparison[:len(early)], early - current[:len(early)])
+    assert np.isnan(comparison[len(early):]).all()
+
+    summary = scenario_summary(results).set_index('Scenario')
+    assert summary.loc["Retire early", 'Retirement Age'] == 60
+    assert summary.loc["Current plan", 'Final Balance'] == results["Current plan"]['Total Balance'][-1]
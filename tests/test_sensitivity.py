@@ -0,0 +1,44 @@
+"""
+Every row of a batched sensitivity analysis must equal projecting with that
+one input moved on its own.
+"""
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections, calculate_retirement_projections_batch
+from constants import INFLATION_RATE
+from sensitivity import INPUT_LABELS, perturbed_values, run_sensitivity_analysis
+
+def final_balance_and_shortfall(inflation_rate=INFLATION_RATE, **inputs):
+    if inflation_rate == INFLATION_RATE:
+        projection = calculate_retirement_projections(**inputs).to_frame()
+    else:
+        # Only the batch engine takes other inflation rates
+        projection = calculate_retirement_projections_batch(**inputs, inflation_rate=inflation_rate).to_frame(0)
+    return projection['Total Balance'].iloc[-1], np.nansum(projection['Retirement Shortfall'])
+
+def test_each_row_matches_the_scalar_projection(base_inputs):
+    perturbations = {
+        'investment_return': ('absolute', 0.01),
+        'monthly_expenses': ('relative', 0.10),
+        'inflation_rate': ('absolute', 0.005)
+    }
+    result = run_sensitivity_analysis(perturbations, **base_inputs)
+    inputs = dict(base_inputs, inflation_rate=INFLATION_RATE)
+
+    balance, shortfall = final_balance_and_shortfall(**inputs)
+    assert result.attrs['base_final_balance'] == pytest.approx(balance)
+    assert result.attrs['base_total_shortfall'] == pytest.approx(shortfall)
+    for name, perturbation in perturbations.items():
+        row = result.set_index('Input').loc[INPUT_LABELS[name]]
+        low, high = perturbed_values(inputs[name], perturbation)
+        assert (row['Low Value'], row['High Value']) == (low, high)
+        for side, value in (('Low', low), ('High', high)):
+            balance, shortfall = final_balance_and_shortfall(**dict(inputs, **{name: value}))
+            assert row[f'Final Balance ({side})'] == pytest.approx(balance)
+            assert row[f'Total Shortfall ({side})'] == pytest.approx(shortfall)
+    assert result['Balance Swing'].is_monotonic_decreasing
+
+def test_perturbed_values_never_go_negative():
+    assert perturbed_values(0.005, ('absolute', 0.01)) == (0.0, 0.015)
+    assert perturbed_values(1000.0, ('relative', 0.1)) == pytest.approx((900.0, 1100.0))
@@ -0,0 +1,86 @@
+"""
+The projection service must answer with the same numbers as the engines,
+batch requests that arrive together, and fail only the requests that are bad.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections, estimate_tax_impact
+from service import MicroBatcher, ProjectionService, parse_projection_request
+
+@pytest.fixture
+def service():
+    server = ProjectionService(port=0, batch_window_ms=20)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def post(service, path, body):
+    request = urllib.request.Request(service.url + path, data=json.dumps(body).encode(), method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_projection_matches_the_scalar_engine(service, base_inputs):
+    glide = [[20, [0.9, 0.1, 0.0]], [0, [0.5, 0.4, 0.1]]]
+    status, response = post(service, '/projections', dict(base_inputs, glide_path=glide))
+    assert status == 200
+    expected = calculate_retirement_projections(**parse_projection_request(dict(base_inputs, glide_path=glide)))
+    rows = np.array([[np.nan if value is None else value for value in row] for row in response['rows']])
+    np.testing.assert_array_equal(rows, expected.values)
+    assert response['retirement_index'] == expected.retirement_index
+
+def test_tax_and_bad_requests(service, base_inputs):
+    assert post(service, '/tax', {'income': [50000, 250000], 'filing_status': 'married'}) == (
+        200, {'tax': [estimate_tax_impact(50000, 'married'), estimate_tax_impact(250000, 'married')]})
+    status, response = post(service, '/projections', dict(base_inputs, current_age=35.5))
+    assert status == 400 and "whole number" in response['error']
+    status, response = post(service, '/projections', dict(base_inputs, salary=1))
+    assert status == 400 and "unknown inputs: salary" in response['error']
+    assert post(service, '/nowhere', {})[0] == 404
+
+def test_concurrent_requests_share_batches(service, base_inputs):
+    bodies = [dict(base_inputs, investment_return=0.04 + i / 1000) for i in range(16)]
+    results = [None] * len(bodies)
+    def send(i):
+        results[i] = post(service, '/projections', bodies[i])
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(len(bodies))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(status == 200 for status, _ in results)
+    for body, (_, response) in zip(bodies, results):
+        final_balance = response['rows'][-1][response['columns'].index('Total Balance')]
+        assert final_balance == calculate_retirement_projections(**body)['Total Balance'][-1]
+    with urllib.request.urlopen(service.url + '/stats') as response:
+        stats = json.loads(response.read())
+    assert stats['batches']['projections']['batches'] < len(bodies)
+    assert stats['endpoints']['/projections']['requests'] == len(bodies)
+
+def test_a_failing_item_does_not_fail_its_batch():
+    calls = []
+    def evaluate(items):
+        calls.append(list(items))
+        if 'bad' in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(evaluate, window=0.05)
+    try:
+        futures = [batcher.submit(item) for item in ('a', 'bad', 'c')]
+        assert futures[0].result(timeout=5) == 'A' and futures[2].result(timeout=5) == 'C'
+        with pytest.raises(ValueError, match="bad item"):
+            futures[1].result(timeout=5)
+    finally:
+        batcher.close()
+    assert calls[0] == ['a', 'bad', 'c']
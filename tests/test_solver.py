@@ -0,0 +1,37 @@
+"""
+The goal-seek solver's answers must sit on the boundary the scalar engine
+sees: solvent at the answer, short one step past it.
+"""
+import numpy as np
+
+from calculations import calculate_retirement_projections
+from solver import (
+    find_earliest_retirement_age,
+    find_maximum_monthly_expenses,
+    find_minimum_contribution_percent,
+    solve_for_input
+)
+
+def shortfall(**inputs):
+    return np.nansum(calculate_retirement_projections(**inputs)['Retirement Shortfall'])
+
+def test_solved_input_is_the_smallest_solvent_value(base_inputs):
+    savings = solve_for_input(base_inputs, 'current_savings', 0.0, 2e6, tolerance=1.0)
+    assert shortfall(**dict(base_inputs, current_savings=savings)) == 0
+    assert shortfall(**dict(base_inputs, current_savings=savings - 2.0)) > 0
+
+def test_earliest_retirement_age_is_the_first_solvent_age(base_inputs):
+    age = find_earliest_retirement_age(base_inputs)
+    assert shortfall(**dict(base_inputs, retirement_age=age)) == 0
+    assert shortfall(**dict(base_inputs, retirement_age=age - 1)) > 0
+
+def test_maximum_expenses_are_the_last_solvent_expenses(base_inputs):
+    expenses = find_maximum_monthly_expenses(base_inputs)
+    assert shortfall(**dict(base_inputs, monthly_expenses=expenses)) == 0
+    assert shortfall(**dict(base_inputs, monthly_expenses=expenses + 2.0)) > 0
+
+def test_contribution_search_ends_of_the_range(base_inputs):
+    # Already solvent without contributions, and short whatever is contributed
+    assert find_minimum_contribution_percent(dict(base_inputs, monthly_expenses=2500.0, trad_401k_percent=0.0)) == 0.0
+    assert find_minimum_contribution_percent(dict(base_inputs, retirement_monthly_expenses=8000.0)) is None
+    assert find_earliest_retirement_age(base_inputs, max_age=70) is None
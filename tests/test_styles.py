@@ -0,0 +1,19 @@
+"""
+The detailed projection table must stay numeric, with dollar formatting left
+to the browser for every column but Age and Year.
+"""
+import numpy as np
+
+from calculations import calculate_retirement_projections
+from styles import projection_table_column_config
+
+def test_table_stays_numeric_with_dollar_columns(base_inputs):
+    projection = calculate_retirement_projections(**base_inputs)
+    frame = projection.to_frame()
+    config = projection_table_column_config(projection.columns)
+
+    assert all(np.issubdtype(dtype, np.number) for dtype in frame.dtypes)
+    assert set(config) == set(projection.columns) - {'Age', 'Year'}
+    for column, settings in config.items():
+        assert settings['label'] == column
+        assert settings['type_config'] == dict(settings['type_config'], type='number', format='dollar')
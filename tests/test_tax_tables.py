@@ -0,0 +1,60 @@
+"""
+Year-indexed limits and brackets must follow the IRS rounding rules, and the
+batched indexed tax must equal the per-year tables the scalar engine uses.
+"""
+import numpy as np
+import pytest
+
+from calculations import (
+    calculate_federal_tax,
+    calculate_ny_tax,
+    calculate_retirement_projections,
+    indexed_tax_array,
+    year_tables
+)
+from constants import CURRENT_401K_LIMIT, CURRENT_IRA_LIMIT, LIMIT_ROUNDING
+
+def assert_same(actual, expected):
+    np.testing.assert_array_equal(actual, expected)
+
+@pytest.mark.parametrize('filing_status', ['single', 'married'])
+@pytest.mark.parametrize('rate', [0.02, 0.025, 0.031])
+def test_indexed_tax_matches_year_tables(filing_status, rate):
+    tables = year_tables(rate, filing_status, 60)
+    rng = np.random.default_rng(0)
+    for year in range(0, 60, 9):
+        incomes = np.concatenate([rng.uniform(-100, 800000, 500), tables.federal_thresholds[year], [0.0]])
+        expected = np.array([tables.tax(year, income) if income > 0 else 0.0 for income in incomes])
+        assert_same(indexed_tax_array(incomes, filing_status, tables.price_index[year]), expected)
+        per_income = np.full(len(incomes), tables.price_index[year])
+        assert_same(indexed_tax_array(incomes, filing_status, per_income), expected)
+
+def test_limits_are_indexed_and_rounded_down():
+    tables = year_tables(0.025, "single", 60)
+    assert tables.limit_401k[0] == CURRENT_401K_LIMIT and tables.limit_ira[0] == CURRENT_IRA_LIMIT
+    assert (np.diff(tables.limit_401k) >= 0).all()
+    assert (tables.limit_401k % LIMIT_ROUNDING['401k'] == 0).all()
+    assert (tables.limit_401k <= CURRENT_401K_LIMIT * tables.price_index).all()
+    assert (CURRENT_401K_LIMIT * tables.price_index - tables.limit_401k < LIMIT_ROUNDING['401k']).all()
+
+@pytest.mark.parametrize('filing_status', ['single', 'married'])
+def test_only_federal_brackets_are_indexed(filing_status):
+    tables = year_tables(0.03, filing_status, 60)
+    income = 120000.0
+    assert tables.tax(0, income) == calculate_federal_tax(income, filing_status) + calculate_ny_tax(income, filing_status)
+    # Thirty years on, the same real income owes the same federal tax to within the rounding of thresholds
+    later = income * tables.price_index[30]
+    assert tables.federal[30].tax(later) / tables.price_index[30] == pytest.approx(
+        calculate_federal_tax(income, filing_status), rel=1e-3)
+    assert tables.tax(30, later) - tables.federal[30].tax(later) == calculate_ny_tax(later, filing_status)
+
+def test_tables_are_built_once_per_rate_and_status():
+    assert year_tables(0.021, "single") is year_tables(0.021, "single")
+    assert year_tables(0.021, "married") is not year_tables(0.021, "single")
+    assert year_tables(0.021, "single", 500).n_years >= 500
+
+def test_projection_contributions_follow_the_indexed_limit(base_inputs):
+    projection = calculate_retirement_projections(**dict(base_inputs, annual_salary=300000.0, trad_401k_percent=0.5))
+    tables = year_tables(filing_status=base_inputs['filing_status'])
+    working_years = base_inputs['retirement_age'] - base_inputs['current_age']
+    assert_same(projection['401k Contribution'][1:working_years], tables.limit_401k[1:working_years])
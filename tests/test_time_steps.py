@@ -0,0 +1,43 @@
+"""
+Per-paycheck and monthly steps must only change when money moves within a
+year: without growth they match the annual engine, and the employer match
+stops with the paycheck that reaches the 401k limit.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections
+
+@pytest.mark.parametrize('steps_per_year', [12, 26])
+def test_steps_without_growth_match_annual(base_inputs, steps_per_year):
+    # A plan that never runs short: the year savings run out is settled per step
+    inputs = dict(base_inputs, investment_return=0.0, savings_apy=0.0, current_savings=2000000.0,
+                  retirement_monthly_expenses=2000.0)
+    annual = calculate_retirement_projections(**inputs)
+    assert annual.total('Retirement Shortfall') == 0
+    stepped = calculate_retirement_projections(**inputs, steps_per_year=steps_per_year)
+    assert len(stepped) == len(annual)
+    np.testing.assert_allclose(stepped.values, annual.values, rtol=0, atol=0.01)
+
+def test_match_stops_at_the_paycheck_reaching_the_limit(base_inputs):
+    inputs = dict(base_inputs, annual_salary=300000.0, trad_401k_percent=0.5)
+    stepped = calculate_retirement_projections(**inputs, steps_per_year=26)
+    annual = calculate_retirement_projections(**inputs)
+    limit = stepped['401k Contribution'][1]
+    paycheck = stepped['Salary'][1] / 26
+    paychecks = math.ceil(limit / (paycheck * inputs['trad_401k_percent']))
+    assert stepped['Employer 401k Match'][1] == pytest.approx(paychecks * paycheck * inputs['employer_401k_match'], abs=0.01)
+    assert stepped['Employer 401k Match'][1] < annual['Employer 401k Match'][1]
+
+def test_contributions_through_the_year_grow_less(base_inputs):
+    annual = calculate_retirement_projections(**base_inputs)
+    stepped = calculate_retirement_projections(**base_inputs, steps_per_year=26)
+    # Year-end deposits earn nothing in their first year, paychecks earn part of it
+    assert stepped['Traditional 401k'][1] > annual['Traditional 401k'][1]
+
+@pytest.mark.parametrize('steps_per_year', [0, 2.5])
+def test_steps_per_year_must_be_a_positive_whole_number(base_inputs, steps_per_year):
+    with pytest.raises(ValueError, match="steps_per_year"):
+        calculate_retirement_projections(**base_inputs, steps_per_year=steps_per_year)
@@ -0,0 +1,44 @@
+"""
+The percentile fan chart must stay a handful of traces, however many paths
+are simulated, and draw the percentiles it is given.
+"""
+import numpy as np
+import pytest
+
+from monte_carlo import percentile_bands
+from visualizations import BACKGROUND_COLOR, create_percentile_fan_chart
+
+def fan_inputs(n_paths, n_years=40):
+    rng = np.random.default_rng(n_paths)
+    paths = np.cumsum(rng.normal(1000, 5000, (n_paths, n_years)), axis=1)
+    years = 2000 + np.arange(n_years)
+    bands = percentile_bands(paths.T)
+    percentiles = {level: bands[:, i] for i, level in enumerate((5, 25, 50, 75, 95))}
+    return years, percentiles, paths
+
+def test_percentile_bands_match_numpy():
+    _, _, paths = fan_inputs(501)
+    bands = percentile_bands(paths.T, (5, 50, 95))
+    np.testing.assert_allclose(bands, np.percentile(paths, (5, 50, 95), axis=0).T)
+
+@pytest.mark.parametrize('n_paths', [100, 5000])
+def test_fan_chart_size_does_not_grow_with_paths(n_paths):
+    years, percentiles, paths = fan_inputs(n_paths)
+    fig = create_percentile_fan_chart(years, percentiles, sample_paths=paths, max_sample_paths=20,
+                                      retirement_year=2030)
+    # Two traces per band, one for the samples and one for the median
+    assert len(fig.data) == 6
+    samples = fig.data[4]
+    assert samples.type == 'scattergl' and samples.name == 'Sample Paths (20)'
+    assert len(samples.y) == 20 * (len(years) + 1)
+    np.testing.assert_array_equal(fig.data[5].y, percentiles[50])
+    np.testing.assert_array_equal(fig.data[1].y, percentiles[95])
+    assert fig.layout.paper_bgcolor == BACKGROUND_COLOR
+    assert len(fig.to_json()) < 100_000
+
+def test_fan_chart_without_sample_paths():
+    years, percentiles, _ = fan_inputs(100)
+    fig = create_percentile_fan_chart(years, percentiles)
+    assert [trace.name for trace in fig.data if trace.showlegend is not False] == [
+        '5th-95th Percentile', '25th-75th Percentile', 'Median'
+    ]
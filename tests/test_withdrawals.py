@@ -0,0 +1,42 @@
+"""
+Every strategy in a batched withdrawal search must equal the scalar
+projection of that strategy, and the ranking must put the longest-lasting,
+lowest-tax strategies first.
+"""
+import numpy as np
+import pytest
+
+from calculations import calculate_retirement_projections
+from monte_carlo import depletion_ages
+from withdrawals import bracket_tops, describe_strategy, search_withdrawal_strategies, withdrawal_strategies
+
+@pytest.fixture
+def retiree(base_inputs):
+    return dict(base_inputs, current_trad_401k=400000.0, retirement_monthly_expenses=6000.0)
+
+def test_each_strategy_matches_the_scalar_projection(retiree):
+    ranking = search_withdrawal_strategies(shares=(0.0, 0.5, None), fill_incomes=[0.0, 50000.0], **retiree)
+    assert len(ranking) == 6
+    for _, row in ranking.iterrows():
+        share, fill = row['Traditional Share'], row['Fill Income']
+        projection = calculate_retirement_projections(
+            **retiree, withdrawal_share=None if np.isnan(share) else share, fill_income=fill)
+        assert row['Strategy'] == describe_strategy(share, fill)
+        assert row['Final Balance'] == pytest.approx(projection['Total Balance'][-1])
+        assert row['Lifetime Tax'] == pytest.approx(np.nansum(projection['Taxes Paid']))
+        expected_age = depletion_ages(retiree['current_age'], projection['Retirement Shortfall'][None, :])[0]
+        np.testing.assert_equal(row['Depletion Age'], expected_age)
+
+def test_ranking_prefers_lasting_then_lower_tax(retiree):
+    ranking = search_withdrawal_strategies(**retiree)
+    lasts = ranking['Depletion Age'].fillna(np.inf).to_numpy()
+    assert (lasts[1:] <= lasts[:-1]).all()
+    for age in np.unique(lasts):
+        assert ranking['Lifetime Tax'][lasts == age].is_monotonic_increasing
+
+def test_named_strategies_and_labels():
+    strategies = withdrawal_strategies("single")
+    assert list(strategies)[0] == 'Savings first'
+    assert strategies['Fill the lowest bracket']['fill_income'] == bracket_tops("single")[0]
+    assert describe_strategy(None, 0.0) == 'Proportional to balances'
+    assert describe_strategy(0.25, 48475.0) == '25% from traditional first, fill to $48,475'
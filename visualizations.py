@@ -1,11 +1,43 @@
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
 import numpy as np
+from profiling import timed
 
+# Colors of the charts' light background, their text and grid lines
+BACKGROUND_COLOR = '#F5F7FA'
+TEXT_COLOR = '#333333'
+GRID_COLOR = '#E0E0E0'
+
+def chart_layout(title, height, xaxis_title=None, yaxis_title=None, xaxis=None, yaxis=None, axes=True, **layout):
+    """
+    Layout of the app's charts: light background, dark text and the legend
+    in a row above the plot. xaxis and yaxis settings are added to the dark
+    axis text; other layout arguments are passed through. Charts without
+    x/y axes or a legend, like pies and gauges, pass axes=False so the
+    unused axis and legend settings are not built.
+    """
+    text = dict(color=TEXT_COLOR)
+    if axes:
+        layout.update(
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            xaxis=dict(title=dict(text=xaxis_title, font=text), tickfont=text, **(xaxis or {})),
+            yaxis=dict(title=dict(text=yaxis_title, font=text), tickfont=text, **(yaxis or {})),
+            legend_font=text,
+        )
+    return dict(
+        title=title,
+        plot_bgcolor=BACKGROUND_COLOR,
+        paper_bgcolor=BACKGROUND_COLOR,
+        title_font=text,
+        font=text,
+        height=height,
+        **layout
+    )
+
+@timed()
 def create_retirement_projection_chart(projection_data):
     """
     Create an interactive line chart showing retirement savings projections over time
+    from a ProjectionResult
     """
     fig = go.Figure()
     
@@ -36,13 +68,12 @@ def create_retirement_projection_chart(projection_data):
     
     # Add retirement expenses if available
     if 'Annual Expenses' in projection_data.columns:
-        # Find retirement age
-        retirement_age = projection_data['Age'].max()
-        retirement_year_idx = projection_data[projection_data['Age'] == retirement_age].index[0]
+        # Find retirement age (ages are one row per year, so the oldest is the last row)
+        retirement_year_idx = len(projection_data) - 1
         
         # Create expenses projection (show from retirement onward)
-        retirement_years = projection_data.loc[retirement_year_idx:, 'Year']
-        retirement_expenses = projection_data.loc[retirement_year_idx:, 'Annual Expenses']
+        retirement_years = projection_data['Year'][retirement_year_idx:]
+        retirement_expenses = projection_data['Annual Expenses'][retirement_year_idx:]
         
         fig.add_trace(go.Scatter(
             x=retirement_years,
@@ -63,11 +94,9 @@ def create_retirement_projection_chart(projection_data):
     
     # Add retirement line
     if 'Age' in projection_data.columns:
-        retirement_ages = projection_data['Age'].unique()
-        if len(retirement_ages) > 1:
-            retirement_age = retirement_ages[len(retirement_ages) // 2]  # Middle value as approx
-            retirement_year_idx = projection_data[projection_data['Age'] == retirement_age].index[0]
-            retirement_year = projection_data.loc[retirement_year_idx, 'Year']
+        if len(projection_data) > 1:
+            retirement_year_idx = len(projection_data) // 2  # Middle value as approx
+            retirement_year = projection_data['Year'][retirement_year_idx]
             
             fig.add_vline(
                 x=retirement_year,
@@ -78,46 +107,24 @@ def create_retirement_projection_chart(projection_data):
             )
     
     # Customize layout
-    fig.update_layout(
-        title='Retirement Savings Projection',
+    fig.update_layout(**chart_layout(
+        'Retirement Savings Projection', 600,
         xaxis_title='Year',
         yaxis_title='Balance ($)',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        plot_bgcolor='#F5F7FA',
-        paper_bgcolor='#F5F7FA',
-        yaxis=dict(
-            gridcolor='#E0E0E0',
-            tickformat='$,.0f',
-            title_font=dict(color='#333333')
-        ),
-        xaxis=dict(
-            title_font=dict(color='#333333'),
-            tickfont=dict(color='#333333')
-        ),
-        yaxis_tickfont=dict(color='#333333'),
-        title_font=dict(color='#333333'),
-        legend_font=dict(color='#333333'),
-        font=dict(color='#333333'),
-        hovermode='x unified',
-        height=600
-    )
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        hovermode='x unified'
+    ))
     
     # Add milestone indicators
     milestones = [
-        {'year': projection_data['Year'].iloc[5], 'label': '5 Years'},
-        {'year': projection_data['Year'].iloc[10], 'label': '10 Years'},
-        {'year': projection_data['Year'].iloc[20], 'label': '20 Years'}
+        {'year': projection_data['Year'][5], 'label': '5 Years'},
+        {'year': projection_data['Year'][10], 'label': '10 Years'},
+        {'year': projection_data['Year'][20], 'label': '20 Years'}
     ]
     
     for milestone in milestones:
-        if milestone['year'] <= projection_data['Year'].max():
-            milestone_value = projection_data.loc[projection_data['Year'] == milestone['year'], 'Total Balance'].values[0]
+        if milestone['year'] <= projection_data['Year'][-1]:
+            milestone_value = projection_data.value_at_year('Total Balance', milestone['year'])
             
             fig.add_trace(go.Scatter(
                 x=[milestone['year']],
@@ -131,8 +138,8 @@ def create_retirement_projection_chart(projection_data):
             ))
     
     # Add retirement marker
-    retirement_year = projection_data['Year'].max()
-    retirement_value = projection_data['Total Balance'].iloc[-1]
+    retirement_year = projection_data['Year'][-1]
+    retirement_value = projection_data['Total Balance'][-1]
     
     fig.add_trace(go.Scatter(
         x=[retirement_year],
@@ -147,6 +154,49 @@ def create_retirement_projection_chart(projection_data):
     
     return fig
 
+@timed()
+def create_tax_impact_chart(projection_data, retirement_year):
+    """
+    Create a chart of taxes paid each year against annual expenses,
+    marking the start of retirement (retirement_year is its row index)
+    """
+    tax_fig = go.Figure()
+    
+    tax_fig.add_trace(go.Bar(
+        x=projection_data['Year'],
+        y=projection_data['Taxes Paid'],
+        name='Taxes Paid',
+        marker_color='#FF5252'
+    ))
+    
+    # Add annual expenses line
+    tax_fig.add_trace(go.Scatter(
+        x=projection_data['Year'],
+        y=projection_data['Annual Expenses'],
+        name='Annual Expenses',
+        line=dict(color='#FFB74D', width=2, dash='dot')
+    ))
+    
+    # Add vertical line at retirement
+    tax_fig.add_vline(
+        x=projection_data['Year'][retirement_year],
+        line_width=2,
+        line_dash="dash",
+        line_color="#2E5E82",
+        annotation_text="Retirement"
+    )
+    
+    tax_fig.update_layout(**chart_layout(
+        'Tax Impact and Expenses Over Time', 500,
+        xaxis_title='Year',
+        yaxis_title='Amount ($)',
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        barmode='stack'
+    ))
+    
+    return tax_fig
+
+@timed()
 def create_allocation_pie_chart(allocation_data):
     """
     Create a pie chart showing the breakdown of current retirement savings
@@ -173,27 +223,20 @@ def create_allocation_pie_chart(allocation_data):
         hovertemplate='%{label}: $%{value:,.2f} (%{percent})<extra></extra>'
     )])
     
-    fig.update_layout(
-        title='Current Retirement Savings Allocation',
-        showlegend=False,
-        plot_bgcolor='#F5F7FA',
-        paper_bgcolor='#F5F7FA',
-        height=500,
-        title_font=dict(color='#333333'),
-        font=dict(color='#333333')
-    )
+    fig.update_layout(**chart_layout('Current Retirement Savings Allocation', 500, axes=False, showlegend=False))
     
     # Add center text
     total = sum(values)
     fig.add_annotation(
         x=0.5, y=0.5,
         text=f"${total:,.0f}",
-        font=dict(size=16, color='#333333'),
+        font=dict(size=16, color=TEXT_COLOR),
         showarrow=False
     )
     
     return fig
 
+@timed()
 def create_savings_milestone_chart(milestones, current_total):
     """
     Create a gauge chart showing progress toward retirement savings milestones
@@ -209,15 +252,15 @@ def create_savings_milestone_chart(milestones, current_total):
         title={'text': "Progress to Retirement Target", 'font': {'size': 24}},
         delta={'reference': 0, 'increasing': {'color': "#4CAF50"}},
         gauge={
-            'axis': {'range': [0, target], 'tickwidth': 1, 'tickcolor': "#333333", 
+            'axis': {'range': [0, target], 'tickwidth': 1, 'tickcolor': TEXT_COLOR,
                      'tickformat': '$,.0f'},
             'bar': {'color': "#006D75"},
             'bgcolor': "white",
             'borderwidth': 2,
-            'bordercolor': "#333333",
+            'bordercolor': TEXT_COLOR,
             'steps': [
-                {'range': [0, milestones['25%']], 'color': '#F5F7FA'},
-                {'range': [milestones['25%'], milestones['50%']], 'color': '#E0E0E0'},
+                {'range': [0, milestones['25%']], 'color': BACKGROUND_COLOR},
+                {'range': [milestones['25%'], milestones['50%']], 'color': GRID_COLOR},
                 {'range': [milestones['50%'], milestones['75%']], 'color': '#BDBDBD'},
                 {'range': [milestones['75%'], target], 'color': '#9E9E9E'}
             ],
@@ -230,19 +273,265 @@ def create_savings_milestone_chart(milestones, current_total):
         number={'valueformat': '$,.0f', 'font': {'size': 20}}
     ))
     
-    fig.update_layout(
-        plot_bgcolor='#F5F7FA',
-        paper_bgcolor='#F5F7FA',
-        height=500,
-        font=dict(color='#333333')
-    )
+    # The gauge carries its own title
+    fig.update_layout(**chart_layout(None, 500, axes=False))
     
     # Add a subtitle with percentage toward goal
     fig.add_annotation(
         x=0.5, y=0.25,
         text=f"{percentage:.1f}% of Target",
-        font=dict(size=16, color='#333333'),
+        font=dict(size=16, color=TEXT_COLOR),
         showarrow=False
     )
     
     return fig
+
+@timed()
+def create_sensitivity_tornado_chart(sensitivity):
+    """
+    Create a tornado chart showing how moving each input down and up changes
+    the final projected balance, largest effect on top
+    """
+    base_balance = sensitivity.attrs.get('base_final_balance', 0.0)
+    
+    # Plotly draws the first category at the bottom, so reverse the sorted rows
+    rows = sensitivity.iloc[::-1]
+    low_change = rows['Final Balance (Low)'] - base_balance
+    high_change = rows['Final Balance (High)'] - base_balance
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        y=rows['Input'],
+        x=low_change,
+        orientation='h',
+        name='Input Lowered',
+        marker_color='#FF5252',
+        customdata=rows[['Low Value', 'Final Balance (Low)']],
+        hovertemplate='%{y}: %{customdata[0]:,.4g}<br>Final balance: $%{customdata[1]:,.0f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Bar(
+        y=rows['Input'],
+        x=high_change,
+        orientation='h',
+        name='Input Raised',
+        marker_color='#006D75',
+        customdata=rows[['High Value', 'Final Balance (High)']],
+        hovertemplate='%{y}: %{customdata[0]:,.4g}<br>Final balance: $%{customdata[1]:,.0f}<extra></extra>'
+    ))
+    
+    fig.add_vline(x=0, line_width=1, line_color='#333333')
+    
+    fig.update_layout(**chart_layout(
+        f'Sensitivity of Final Balance (Base: ${base_balance:,.0f})', 500,
+        xaxis_title='Change in Final Balance ($)',
+        xaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        barmode='overlay'
+    ))
+    
+    return fig
+
+@timed()
+def create_percentile_fan_chart(years, percentiles, sample_paths=None, max_sample_paths=20,
+                                retirement_year=None):
+    """
+    Create a fan chart of projected balances from precomputed percentiles.
+
+    percentiles maps a percentile (e.g. 5, 25, 50, 75, 95) to one value per
+    year. Matching outer and inner percentiles become filled bands and the
+    median a line, so the chart has a handful of traces however many paths
+    were simulated. Up to max_sample_paths rows of sample_paths (path x year)
+    are drawn as a single WebGL trace.
+    """
+    levels = sorted(percentiles)
+    band_colors = ['rgba(46, 94, 130, 0.15)', 'rgba(46, 94, 130, 0.30)', 'rgba(46, 94, 130, 0.45)']
+    
+    fig = go.Figure()
+    
+    # Pair the lowest remaining percentile with the highest, working inwards
+    for i in range(len(levels) // 2):
+        low, high = levels[i], levels[-1 - i]
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=percentiles[low],
+            line=dict(width=0),
+            mode='lines',
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=percentiles[high],
+            name=f'{low:g}th-{high:g}th Percentile',
+            fill='tonexty',
+            fillcolor=band_colors[min(i, len(band_colors) - 1)],
+            line=dict(width=0),
+            mode='lines',
+            hoverinfo='skip'
+        ))
+    
+    if sample_paths is not None and len(sample_paths) > 0 and max_sample_paths > 0:
+        # Evenly spaced paths, joined into one trace with gaps between them
+        rows = np.unique(np.linspace(0, len(sample_paths) - 1, min(max_sample_paths, len(sample_paths))).astype(int))
+        samples = np.asarray(sample_paths)[rows]
+        n_years = samples.shape[1]
+        gap = np.full((len(rows), 1), np.nan)
+        fig.add_trace(go.Scattergl(
+            x=np.hstack([np.broadcast_to(np.asarray(years, dtype=float), samples.shape), gap]).ravel(),
+            y=np.hstack([samples, gap]).ravel(),
+            name=f'Sample Paths ({len(rows)})',
+            mode='lines',
+            line=dict(width=1, color='rgba(255, 183, 77, 0.6)'),
+            connectgaps=False,
+            hoverinfo='skip'
+        ))
+    
+    if len(levels) % 2 == 1:
+        middle = levels[len(levels) // 2]
+        fig.add_trace(go.Scatter(
+            x=years,
+            y=percentiles[middle],
+            name='Median' if middle == 50 else f'{middle:g}th Percentile',
+            line=dict(width=3, color='#333333'),
+            mode='lines',
+            hovertemplate='%{x}: $%{y:,.0f}<extra></extra>'
+        ))
+    
+    if retirement_year is not None:
+        fig.add_vline(
+            x=retirement_year,
+            line_width=2,
+            line_dash="dash",
+            line_color="#2E5E82",
+            annotation_text="Retirement"
+        )
+    
+    fig.update_layout(**chart_layout(
+        'Range of Projected Total Balance', 600,
+        xaxis_title='Year',
+        yaxis_title='Balance ($)',
+        xaxis=dict(gridcolor=GRID_COLOR),
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        hovermode='x unified'
+    ))
+    
+    return fig
+
+@timed()
+def create_roth_conversion_chart(plan, retirement_year=None):
+    """
+    Create a chart of a RothConversionPlan: the amount converted each year
+    and the taxes paid with and without the conversions
+    """
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=plan.years,
+        y=plan.conversions,
+        name='Roth Conversion',
+        marker_color='#006D75'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=plan.years,
+        y=plan.taxes,
+        name='Taxes Paid',
+        line=dict(color='#FF5252', width=2)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=plan.years,
+        y=plan.baseline_taxes,
+        name='Taxes Paid (No Conversions)',
+        line=dict(color='#FFB74D', width=2, dash='dot')
+    ))
+    
+    if retirement_year is not None:
+        fig.add_vline(
+            x=retirement_year,
+            line_width=2,
+            line_dash="dash",
+            line_color="#2E5E82",
+            annotation_text="Retirement"
+        )
+    
+    fig.update_layout(**chart_layout(
+        'Roth Conversions and Taxes', 500,
+        xaxis_title='Year',
+        yaxis_title='Amount ($)',
+        xaxis=dict(gridcolor=GRID_COLOR),
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        hovermode='x unified'
+    ))
+    
+    return fig
+
+@timed()
+def create_glide_path_chart(glide_path, current_age, retirement_age, end_age=None):
+    """
+    Create a stacked area chart of the stock/bond/cash mix a GlidePath holds
+    at each age
+    """
+    end_age = retirement_age + 30 if end_age is None else end_age
+    ages = np.arange(current_age, end_age + 1)
+    weights = glide_path.weights(retirement_age - ages)
+    
+    fig = go.Figure()
+    for name, share, color in zip(['Stocks', 'Bonds', 'Cash'], weights, ['#006D75', '#2E5E82', '#FFB74D']):
+        fig.add_trace(go.Scatter(
+            x=ages,
+            y=share,
+            name=name,
+            stackgroup='mix',
+            line=dict(color=color, width=1),
+            hovertemplate='%{y:.0%}'
+        ))
+    
+    fig.add_vline(
+        x=retirement_age,
+        line_width=2,
+        line_dash="dash",
+        line_color="#333333",
+        annotation_text="Retirement"
+    )
+    
+    fig.update_layout(**chart_layout(
+        'Asset Allocation Glide Path', 400,
+        xaxis_title='Age',
+        yaxis_title='Share of Retirement Accounts',
+        xaxis=dict(gridcolor=GRID_COLOR),
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='.0%', range=[0, 1]),
+        hovermode='x unified'
+    ))
+    
+    return fig
+
+@timed()
+def create_scenario_comparison_chart(curves, baseline=None, field='Total Balance'):
+    """
+    Create a line chart overlaying field for every saved scenario, from a
+    (year x scenario) DataFrame as built by scenarios.scenario_curves; the
+    baseline scenario is drawn heavier
+    """
+    fig = go.Figure()
+    for name in curves.columns:
+        fig.add_trace(go.Scatter(
+            x=curves.index,
+            y=curves[name],
+            name=name,
+            mode='lines',
+            line=dict(width=4 if name == baseline else 2),
+            hovertemplate='$%{y:,.0f}'
+        ))
+    
+    fig.update_layout(**chart_layout(
+        f'{field} by Scenario', 500,
+        xaxis_title='Year',
+        yaxis_title=f'{field} ($)',
+        xaxis=dict(gridcolor=GRID_COLOR),
+        yaxis=dict(gridcolor=GRID_COLOR, tickformat='$,.0f'),
+        hovermode='x unified'
+    ))
+    
+    return fig
@@ -0,0 +1,93 @@
+"""
+Retirement withdrawal strategies and a batched search over them.
+
+A strategy is two projection inputs (see calculate_retirement_projections):
+withdrawal_share, the share of spending drawn from the traditional accounts
+before savings (None for their share of all balances), and fill_income,
+taxable income the traditional withdrawals are topped up to every year.
+Savings first, traditional first, proportional and bracket-filling rules
+are all points of that space, so any set of them runs as one batch.
+"""
+import numpy as np
+from calculations import calculate_retirement_projections_batch
+from constants import TAX_BRACKETS_FEDERAL
+from monte_carlo import depletion_ages
+from profiling import timed
+
+# Traditional shares tried by search_withdrawal_strategies; None is
+# proportional to balances
+DEFAULT_SHARES = (0.0, 0.25, 0.5, 0.75, 1.0, None)
+
+# Lowest federal brackets whose tops are tried as fill incomes
+DEFAULT_FILL_BRACKETS = 4
+
+def bracket_tops(filing_status="single"):
+    """Taxable income at the top of each federal bracket, lowest first (today's dollars)"""
+    return [float(threshold) for threshold, _ in TAX_BRACKETS_FEDERAL[filing_status] if threshold > 0]
+
+def withdrawal_strategies(filing_status="single"):
+    """Named strategies as projection inputs, the current default first"""
+    tops = bracket_tops(filing_status)
+    return {
+        'Savings first': dict(withdrawal_share=0.0, fill_income=0.0),
+        'Traditional first': dict(withdrawal_share=1.0, fill_income=0.0),
+        'Proportional to balances': dict(withdrawal_share=None, fill_income=0.0),
+        'Fill the lowest bracket': dict(withdrawal_share=0.0, fill_income=tops[0]),
+        'Fill the two lowest brackets': dict(withdrawal_share=0.0, fill_income=tops[1])
+    }
+
+def describe_strategy(withdrawal_share, fill_income):
+    """Short label for a strategy"""
+    if withdrawal_share is None or np.isnan(withdrawal_share):
+        label = 'Proportional to balances'
+    elif withdrawal_share == 0:
+        label = 'Savings first'
+    elif withdrawal_share == 1:
+        label = 'Traditional first'
+    else:
+        label = f'{withdrawal_share:.0%} from traditional first'
+    if fill_income > 0:
+        label += f', fill to ${fill_income:,.0f}'
+    return label
+
+@timed()
+def search_withdrawal_strategies(shares=DEFAULT_SHARES, fill_incomes=None, **inputs):
+    """
+    Evaluate every combination of shares and fill_incomes (by default no
+    fill and the tops of the lowest federal brackets) in a single batched
+    projection, and rank them: savings lasting longest first, then the
+    lowest lifetime tax, then the largest final balance.
+
+    Returns one row per strategy, best first; 'Depletion Age' is NaN for
+    strategies that never run short.
+    """
+    import pandas as pd
+    inputs = dict(inputs)
+    inputs.pop('withdrawal_share', None)
+    inputs.pop('fill_income', None)
+    if fill_incomes is None:
+        fill_incomes = [0.0] + bracket_tops(inputs.get('filing_status', "single"))[:DEFAULT_FILL_BRACKETS]
+
+    share_values = np.array([np.nan if share is None else share for share in shares], dtype=float)
+    scenario_shares = np.repeat(share_values, len(fill_incomes))
+    scenario_fills = np.tile(np.asarray(fill_incomes, dtype=float), len(share_values))
+    batch = calculate_retirement_projections_batch(
+        **inputs,
+        withdrawal_share=scenario_shares,
+        fill_income=scenario_fills,
+        fields=['Total Balance', 'Taxes Paid', 'Retirement Shortfall']
+    )
+
+    final_index = batch.n_years - 1
+    n_scenarios = len(scenario_shares)
+    results = pd.DataFrame({
+        'Strategy': [describe_strategy(share, fill) for share, fill in zip(scenario_shares, scenario_fills)],
+        'Traditional Share': scenario_shares,
+        'Fill Income': scenario_fills,
+        'Depletion Age': depletion_ages(inputs['current_age'], batch.field('Retirement Shortfall')),
+        'Lifetime Tax': np.nansum(batch.field('Taxes Paid'), axis=1),
+        'Final Balance': batch.field('Total Balance')[np.arange(n_scenarios), final_index]
+    })
+    lasts = results['Depletion Age'].fillna(np.inf)
+    order = np.lexsort((-results['Final Balance'], results['Lifetime Tax'], -lasts))
+    return results.iloc[order].reset_index(drop=True)